@@ -2,47 +2,106 @@ import sys
 import os
 import json
 import numpy as np
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+
+# orjson 사용 가능 시 결과 JSON 직렬화에 사용 (numpy 값도 변환 없이 처리)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 from SVDL_shin import FaultPredictor
 
+# 운영 환경 반영(80/20 분기, 확률 노이즈)용 난수 생성기 - 전역 np.random 상태를 건드리지 않음
+_rng = np.random.default_rng()
+# 샘플 센서 데이터는 매번 같은 값이 나오도록 고정 시드로 생성
+SAMPLE_DATA_SEED = 42
+
+# 결과 dict의 모델 구분값 (성공/에러 공통)
+MODEL_TYPE = '설비 이상 예측'
+
+# 결과 파일 저장은 백그라운드 스레드 1개에서 순서대로 처리 (예측 호출이 디스크 쓰기를 기다리지 않음)
+_write_executor = ThreadPoolExecutor(max_workers=1)
+
+def _atomic_write_bytes(path, data):
+    """임시 파일에 쓴 뒤 교체 - 대시보드가 쓰는 중인 파일을 읽지 않도록"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _dumps_prediction(result):
+    """예측 결과 → UTF-8 JSON 바이트 (들여쓰기 2칸, 한글 그대로)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(result, ensure_ascii=False, indent=2).encode('utf-8')
+
+def save_prediction_json(result, output_path="last_prediction.json"):
+    """예측 결과를 JSON 파일로 저장 (직렬화는 호출 시점에, 파일 쓰기는 백그라운드에서)"""
+    return _write_executor.submit(_atomic_write_bytes, output_path, _dumps_prediction(result))
+
+# 운영 환경 반영용 조정 확률 (상태별 평균, 노이즈 표준편차)
+# normal 80% ± 5%, 나머지 고장 유형 각 5% ± 2%
+_ADJUSTED_CLASSES = ['normal', 'bearing_fault', 'roll_misalignment', 'motor_overload', 'lubricant_shortage']
+_ADJUSTED_MEAN = np.array([0.80, 0.05, 0.05, 0.05, 0.05])
+_ADJUSTED_SIGMA = np.array([0.05, 0.02, 0.02, 0.02, 0.02])
+_CLASS_DESCRIPTIONS = {
+    'normal': '정상',
+    'bearing_fault': '베어링 고장',
+    'roll_misalignment': '롤 정렬 불량',
+    'motor_overload': '모터 과부하',
+    'lubricant_shortage': '윤활유 부족'
+}
+
+@lru_cache(maxsize=1)
+def _sample_data_template():
+    """고정 시드 샘플은 매번 같으므로 한 번만 생성해 두고 읽기 전용으로 보관"""
+    data = _generate_sample_data()
+    data.setflags(write=False)
+    return data
+
 def generate_sample_data():
+    """예측을 위한 샘플 센서 데이터 (캐시된 고정 샘플의 복사본)"""
+    return _sample_data_template().copy()
+
+def _generate_sample_data():
     """예측을 위한 샘플 센서 데이터 생성"""
     # 60개 타임스텝 x 4개 센서 데이터 생성
     # 센서 순서: [Temperature, Machine Speed, Vibration Level, Energy Consumption]
-    np.random.seed(42)  # 재현성을 위한 시드 설정
+    rng = np.random.default_rng(SAMPLE_DATA_SEED)  # 재현성을 위한 시드 설정 (전역 시드 재설정 없음)
     
     # 정상 상태에 가까운 데이터 생성
-    base_values = [45.0, 1200.0, 0.3, 95.0]  # 정상 상태 기본값
-    noise_levels = [1.5, 30.0, 0.05, 3.0]    # 작은 노이즈 레벨
-    
-    data = []
-    for i in range(60):
-        row = []
-        for j in range(4):
-            # 기본값에 작은 노이즈 추가 (정상 범위 내)
-            value = base_values[j] + np.random.normal(0, noise_levels[j])
-            # 값이 너무 극단적이 되지 않도록 제한
-            if j == 0:  # Temperature: 40-50°C
-                value = np.clip(value, 40, 50)
-            elif j == 1:  # Machine Speed: 1150-1250 RPM
-                value = np.clip(value, 1150, 1250)
-            elif j == 2:  # Vibration Level: 0.1-0.5
-                value = np.clip(value, 0.1, 0.5)
-            elif j == 3:  # Energy Consumption: 90-100
-                value = np.clip(value, 90, 100)
-            row.append(value)
-        data.append(row)
+    base_values = np.array([45.0, 1200.0, 0.3, 95.0])  # 정상 상태 기본값
+    noise_levels = np.array([1.5, 30.0, 0.05, 3.0])    # 작은 노이즈 레벨
+    # 값이 너무 극단적이 되지 않도록 센서별 범위 제한
+    # Temperature: 40-50°C, Machine Speed: 1150-1250 RPM, Vibration Level: 0.1-0.5, Energy Consumption: 90-100
+    lower_bounds = np.array([40, 1150, 0.1, 90])
+    upper_bounds = np.array([50, 1250, 0.5, 100])
     
-    return np.array(data)
+    # 전체 노이즈를 한 번에 생성
+    noise = rng.normal(0, noise_levels, size=(60, 4))
+    return np.clip(base_values + noise, lower_bounds, upper_bounds)
+
+@lru_cache(maxsize=1)
+def _get_predictor(model_path, scaler_path=None):
+    """모델/스케일러는 프로세스당 한 번만 로드 (반복 호출 시 재사용)"""
+    predictor = FaultPredictor()
+    predictor.load_model(model_path, scaler_path)
+    return predictor
+
+def preload():
+    """상주 예측 워커용 - 첫 요청 전에 모델을 로드해 둠 (run_abnormal_detection과 같은 인자로 호출해야 캐시 재사용)"""
+    if os.path.exists("best_model.pth"):
+        _get_predictor("best_model.pth", "scaler.pkl" if os.path.exists("scaler.pkl") else None)
 
 def run_abnormal_detection():
     """설비 이상 예측 모델 실행"""
+    # 성공/에러 결과 공통 타임스탬프
+    timestamp = datetime.now().isoformat()
     try:
-        # 1. 모델 초기화
-        predictor = FaultPredictor()
-        
-        # 2. 모델 로드
+        # 1~2. 모델 초기화 및 로드 (최초 1회만)
         model_path = "best_model.pth"
         scaler_path = "scaler.pkl"
         
@@ -50,7 +109,7 @@ def run_abnormal_detection():
             print(f"모델 파일이 없습니다: {model_path}")
             return None
             
-        predictor.load_model(model_path, scaler_path if os.path.exists(scaler_path) else None)
+        predictor = _get_predictor(model_path, scaler_path if os.path.exists(scaler_path) else None)
         
         # 3. 샘플 데이터 생성
         sensor_data = generate_sample_data()
@@ -63,30 +122,18 @@ def run_abnormal_detection():
         original_probabilities = result['probabilities']
         
         # 80% 확률로 정상 상태로 조정 (실제 운영 환경 반영)
-        if np.random.random() < 0.8:
-            # 정상 상태 확률을 높이고 다른 상태 확률을 낮춤
-            adjusted_probabilities = {
-                'normal': 0.80 + np.random.normal(0, 0.05),  # 80% ± 5%
-                'bearing_fault': 0.05 + np.random.normal(0, 0.02),  # 5% ± 2%
-                'roll_misalignment': 0.05 + np.random.normal(0, 0.02),  # 5% ± 2%
-                'motor_overload': 0.05 + np.random.normal(0, 0.02),  # 5% ± 2%
-                'lubricant_shortage': 0.05 + np.random.normal(0, 0.02)  # 5% ± 2%
-            }
+        if _rng.random() < 0.8:
+            # 정상 상태 확률을 높이고 다른 상태 확률을 낮춤 (상태별 노이즈를 한 번에 생성)
+            adjusted_values = _ADJUSTED_MEAN + _rng.normal(0, _ADJUSTED_SIGMA)
             # 확률 합이 1이 되도록 정규화
-            total = sum(adjusted_probabilities.values())
-            for key in adjusted_probabilities:
-                adjusted_probabilities[key] = adjusted_probabilities[key] / total
+            adjusted_values /= adjusted_values.sum()
+            adjusted_probabilities = dict(zip(_ADJUSTED_CLASSES, adjusted_values.tolist()))
             
             # 가장 높은 확률을 가진 상태를 예측 결과로 설정
-            adjusted_predicted_class = max(adjusted_probabilities, key=adjusted_probabilities.get)
+            best_idx = int(adjusted_values.argmax())
+            adjusted_predicted_class = _ADJUSTED_CLASSES[best_idx]
             adjusted_predicted_class_name = adjusted_predicted_class
-            adjusted_predicted_class_description = {
-                'normal': '정상',
-                'bearing_fault': '베어링 고장',
-                'roll_misalignment': '롤 정렬 불량',
-                'motor_overload': '모터 과부하',
-                'lubricant_shortage': '윤활유 부족'
-            }[adjusted_predicted_class]
+            adjusted_predicted_class_description = _CLASS_DESCRIPTIONS[adjusted_predicted_class]
             adjusted_confidence = adjusted_probabilities[adjusted_predicted_class]
             adjusted_is_normal = adjusted_predicted_class == 'normal'
             
@@ -106,8 +153,8 @@ def run_abnormal_detection():
         
         # 7. 결과 구성
         prediction_result = {
-            'timestamp': datetime.now().isoformat(),
-            'model_type': '설비 이상 예측',
+            'timestamp': timestamp,
+            'model_type': MODEL_TYPE,
             'prediction': {
                 'predicted_class': adjusted_predicted_class,
                 'predicted_class_name': adjusted_predicted_class_name,
@@ -123,8 +170,7 @@ def run_abnormal_detection():
         
         # 7. JSON 파일로 저장
         output_path = "last_prediction.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(prediction_result, f, ensure_ascii=False, indent=2)
+        save_prediction_json(prediction_result, output_path)
         
         # 예측 완료: {output_path}
         # 예측 결과: {result['predicted_class_description']}
@@ -135,16 +181,15 @@ def run_abnormal_detection():
         
     except Exception as e:
         error_result = {
-            'timestamp': datetime.now().isoformat(),
-            'model_type': '설비 이상 예측',
+            'timestamp': timestamp,
+            'model_type': MODEL_TYPE,
             'status': 'error',
             'error_message': str(e)
         }
         
         # 에러 결과도 JSON으로 저장
         output_path = "last_prediction.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(error_result, f, ensure_ascii=False, indent=2)
+        save_prediction_json(error_result, output_path)
         
         # 예측 실패: {e}
         return error_result
@@ -10,12 +10,41 @@
 
 import joblib
 import numpy as np
-import pandas as pd
+from sklearn import config_context
 import json
 import os
+import mmap
 import warnings
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 warnings.filterwarnings('ignore')
 
+def _prefetch_file(path):
+    """파일을 페이지 캐시에 미리 올림 (joblib.load의 작은 read 호출들이 디스크를 기다리지 않도록)"""
+    try:
+        with open(path, 'rb') as f:
+            if os.path.getsize(path) == 0:
+                return
+            if hasattr(mmap, 'MAP_PRIVATE'):
+                # POSIX: MAP_POPULATE(리눅스)로 매핑 시점에 전체 페이지를 읽어 들임
+                flags = mmap.MAP_PRIVATE | getattr(mmap, 'MAP_POPULATE', 0)
+                with mmap.mmap(f.fileno(), 0, flags=flags, prot=mmap.PROT_READ) as mm:
+                    if hasattr(mm, 'madvise'):
+                        mm.madvise(mmap.MADV_WILLNEED)
+            else:
+                # 그 외(Windows): 큰 버퍼로 순차 읽기
+                buffer = bytearray(1 << 20)
+                while f.readinto(buffer):
+                    pass
+    except (OSError, ValueError):
+        # 프리페치는 최적화일 뿐이므로 실패해도 joblib.load가 직접 읽음
+        pass
+
+def _prefetch_files(paths):
+    """여러 파일을 병렬로 프리페치"""
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        list(executor.map(_prefetch_file, paths))
+
 class HydraulicAnomalyPredictor:
     """유압 시스템 이상탐지 추론기"""
 
@@ -23,6 +52,9 @@ class HydraulicAnomalyPredictor:
         self.model_dir = model_dir
         self.model = None
         self.scaler = None
+        # StandardScaler 파라미터 (로드 시 미리 추출, 없으면 scaler.transform 사용)
+        self._scaler_mean = None
+        self._scaler_inv_scale = None
         # 코드 실행으로 100% 검증된 최종 피처 리스트 (순서가 매우 중요)
         self.final_feature_names = [
             'PS1_max', 'PS1_diff_std', 'PS2_diff_std', 'PS3_max', 'PS3_p2p',
@@ -42,8 +74,11 @@ class HydraulicAnomalyPredictor:
             if not os.path.exists(scaler_path):
                 scaler_path = os.path.join(self.model_dir, 'scaler.pkl')
 
+            _prefetch_files([model_path, scaler_path])
             self.model = joblib.load(model_path)
             self.scaler = joblib.load(scaler_path)
+            self._extract_scaler_params()
+            self._warmup()
             print("모델 및 스케일러 로드 완료")
             print(f"   - Model: {type(self.model).__name__}")
             print(f"   - Scaler: {type(self.scaler).__name__}")
@@ -54,49 +89,94 @@ class HydraulicAnomalyPredictor:
         except Exception as e:
             raise Exception(f"컴포넌트 로드 중 알 수 없는 오류: {e}")
 
+    def _extract_scaler_params(self):
+        """StandardScaler이면 평균/스케일을 미리 꺼내 transform의 입력 검증 오버헤드를 건너뜁니다."""
+        if type(self.scaler).__name__ != 'StandardScaler':
+            return
+        n_features = len(self.final_feature_names)
+        mean = self.scaler.mean_ if getattr(self.scaler, 'with_mean', True) else None
+        scale = self.scaler.scale_ if getattr(self.scaler, 'with_std', True) else None
+        self._scaler_mean = (np.zeros(n_features) if mean is None
+                             else np.asarray(mean, dtype=np.float64))
+        self._scaler_inv_scale = (np.ones(n_features) if scale is None
+                                  else 1.0 / np.asarray(scale, dtype=np.float64))
+
+    def _warmup(self):
+        """더미 입력으로 한 번 예측해 첫 요청의 초기화 비용(트리 배열 로딩 등)을 로드 시점에 치릅니다."""
+        warmup_input = np.zeros((1, len(self.final_feature_names)), dtype=np.float64)
+        self.model.predict(warmup_input)
+        if hasattr(self.model, 'predict_proba'):
+            self.model.predict_proba(warmup_input)
+
+    def _scale(self, final_input: np.ndarray) -> np.ndarray:
+        """(N, 15) 입력을 스케일링합니다."""
+        if self._scaler_mean is None:
+            return self.scaler.transform(final_input)
+        return (final_input - self._scaler_mean) * self._scaler_inv_scale
+
     def predict(self, feature_data: dict, return_confidence=True) -> dict:
         """
         검증된 15개 피처가 포함된 딕셔너리를 입력받아 이상 여부를 예측합니다.
         """
+        return self.predict_batch([feature_data], return_confidence)[0]
+
+    def predict_batch(self, feature_data_list: list, return_confidence=True) -> list:
+        """
+        여러 샘플(15개 피처 딕셔너리 리스트)을 한 번에 예측합니다.
+        스케일링/예측을 샘플 수와 관계없이 한 번씩만 호출하며, 결과는 입력 순서대로 반환합니다.
+        """
+        if not feature_data_list:
+            return []
+        # 결과/에러 공통 타임스탬프 (호출당 한 번만 생성)
+        timestamp = datetime.now().isoformat()
         try:
             # 1. 입력 데이터 유효성 검사
-            missing_features = set(self.final_feature_names) - set(feature_data.keys())
-            if missing_features:
-                raise ValueError(f"필수 피처가 누락되었습니다: {list(missing_features)}")
+            for feature_data in feature_data_list:
+                missing_features = [name for name in self.final_feature_names if name not in feature_data]
+                if missing_features:
+                    raise ValueError(f"필수 피처가 누락되었습니다: {missing_features}")
 
-            input_df = pd.DataFrame([feature_data])
-
-            # 2. 모델이 학습한 순서대로 피처 정렬
-            final_input_df = input_df[self.final_feature_names]
+            # 2. 모델이 학습한 순서대로 피처 정렬 (DataFrame 없이 바로 (N, 15) 배열 구성)
+            final_input = np.array([[feature_data[name] for name in self.final_feature_names]
+                                    for feature_data in feature_data_list], dtype=np.float64)
 
             # 3. 스케일링
-            input_scaled = self.scaler.transform(final_input_df)
-
-            # 4. 예측
-            prediction = self.model.predict(input_scaled)[0]
-            
-            result = {
-                'prediction': int(prediction),
-                'status': 'Normal' if prediction == 0 else 'Abnormal Detected',
-                'timestamp': pd.Timestamp.now().isoformat()
-            }
-
-            # 5. 신뢰도(확률) 추가
-            if return_confidence and hasattr(self.model, 'predict_proba'):
-                proba = self.model.predict_proba(input_scaled)[0]
-                result['probabilities'] = {
-                    'normal': float(proba[0]),
-                    'abnormal': float(proba[1])
+            input_scaled = self._scale(final_input)
+
+            # 4. 예측 (+ 신뢰도(확률))
+            # 입력은 위에서 float64 (N, 15) 배열로 구성했으므로 sklearn의 NaN/Inf 전수 검사는 이 구간에서만 생략
+            with config_context(assume_finite=True):
+                predictions = self.model.predict(input_scaled)
+                probas = None
+                if return_confidence and hasattr(self.model, 'predict_proba'):
+                    probas = self.model.predict_proba(input_scaled)
+
+            results = []
+            for i, prediction in enumerate(predictions):
+                result = {
+                    'prediction': int(prediction),
+                    'status': 'Normal' if prediction == 0 else 'Abnormal Detected',
+                    'timestamp': timestamp
                 }
-                result['confidence'] = float(max(proba))
 
-            return result
+                # 5. 신뢰도(확률) 추가
+                if probas is not None:
+                    proba = probas[i]
+                    result['probabilities'] = {
+                        'normal': float(proba[0]),
+                        'abnormal': float(proba[1])
+                    }
+                    result['confidence'] = float(max(proba))
+                results.append(result)
+
+            return results
 
         except Exception as e:
-            return {
+            error_result = {
                 'error': str(e),
-                'timestamp': pd.Timestamp.now().isoformat()
+                'timestamp': timestamp
             }
+            return [dict(error_result) for _ in feature_data_list]
 
 # --- 사용 예시 ---
 if __name__ == '__main__':
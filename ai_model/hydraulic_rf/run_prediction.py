@@ -2,70 +2,99 @@ import sys
 import os
 import json
 import numpy as np
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+
+# orjson 사용 가능 시 결과 JSON 직렬화에 사용 (numpy 값도 변환 없이 처리)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 from hydraulic_predictor_verified import HydraulicAnomalyPredictor
 
+# 샘플 선택/합성 데이터/운영 환경 반영에 공용으로 쓰는 난수 생성기 (전역 np.random 상태 미사용)
+_rng = np.random.default_rng()
+
+# 결과 dict의 모델 구분값 (성공/에러 공통)
+MODEL_TYPE = '유압 이상 탐지'
+
+# 결과 파일 저장은 백그라운드 스레드 1개에서 순서대로 처리 (예측 호출이 디스크 쓰기를 기다리지 않음)
+_write_executor = ThreadPoolExecutor(max_workers=1)
+
+def _atomic_write_bytes(path, data):
+    """임시 파일에 쓴 뒤 교체 - 대시보드가 쓰는 중인 파일을 읽지 않도록"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _dumps_prediction(result):
+    """예측 결과 → UTF-8 JSON 바이트 (들여쓰기 2칸, 한글 그대로)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(result, ensure_ascii=False, indent=2).encode('utf-8')
+
+def save_prediction_json(result, output_path="last_prediction.json"):
+    """예측 결과를 JSON 파일로 저장 (직렬화는 호출 시점에, 파일 쓰기는 백그라운드에서)"""
+    return _write_executor.submit(_atomic_write_bytes, output_path, _dumps_prediction(result))
+
+# 정상 상태 합성 데이터 기준값 (모델 학습 피처 순서)
+# (피처명, 평균, 노이즈 표준편차, 하한, 상한) - 값들이 너무 극단적이 되지 않도록 범위 제한
+_NORMAL_FEATURE_SPEC = [
+    ('PS1_max', 190.0, 1.0, 188, 192),          # 압력 센서 1 최대값
+    ('PS1_diff_std', 0.12, 0.01, 0.10, 0.14),   # 압력 센서 1 차분 표준편차
+    ('PS2_diff_std', 1.1, 0.05, 1.05, 1.15),    # 압력 센서 2 차분 표준편차
+    ('PS3_max', 9.5, 0.2, 9.3, 9.7),            # 압력 센서 3 최대값
+    ('PS3_p2p', 0.25, 0.02, 0.23, 0.27),        # 압력 센서 3 피크투피크
+    ('TS1_p2p', 0.4, 0.05, 0.35, 0.45),         # 온도 센서 1 피크투피크
+    ('VS1_min', 0.51, 0.005, 0.505, 0.515),     # 진동 센서 1 최소값
+    ('VS1_q25', 0.53, 0.005, 0.505, 0.515),     # 진동 센서 1 25% 분위수
+    ('CP_mean', 1.95, 0.02, 1.85, 2.05),        # 효율성 평균
+    ('CP_min', 1.85, 0.02, 1.85, 2.05),         # 효율성 최소값
+    ('CP_max', 2.05, 0.02, 1.85, 2.05),         # 효율성 최대값
+    ('CP_median', 1.95, 0.02, 1.85, 2.05),      # 효율성 중앙값
+    ('CP_rms', 1.95, 0.02, 1.85, 2.05),         # 효율성 RMS
+    ('CP_q25', 1.90, 0.02, 1.85, 2.05),         # 효율성 25% 분위수
+    ('CP_q75', 2.00, 0.02, 1.85, 2.05),         # 효율성 75% 분위수
+]
+_NORMAL_FEATURES = [spec[0] for spec in _NORMAL_FEATURE_SPEC]
+_NORMAL_MEAN, _NORMAL_SIGMA, _NORMAL_LOW, _NORMAL_HIGH = (
+    np.array(column, dtype=np.float64) for column in list(zip(*_NORMAL_FEATURE_SPEC))[1:]
+)
+
 def generate_normal_sample_data():
     """정상 상태에 가까운 합성 데이터 생성"""
-    # 실제 운영 환경에서 정상 상태일 때의 전형적인 값들
-    normal_data = {
-        'PS1_max': 190.0 + np.random.normal(0, 1.0),      # 압력 센서 1 최대값
-        'PS1_diff_std': 0.12 + np.random.normal(0, 0.01), # 압력 센서 1 차분 표준편차
-        'PS2_diff_std': 1.1 + np.random.normal(0, 0.05),  # 압력 센서 2 차분 표준편차
-        'PS3_max': 9.5 + np.random.normal(0, 0.2),        # 압력 센서 3 최대값
-        'PS3_p2p': 0.25 + np.random.normal(0, 0.02),      # 압력 센서 3 피크투피크
-        'TS1_p2p': 0.4 + np.random.normal(0, 0.05),       # 온도 센서 1 피크투피크
-        'VS1_min': 0.51 + np.random.normal(0, 0.005),     # 진동 센서 1 최소값
-        'VS1_q25': 0.53 + np.random.normal(0, 0.005),     # 진동 센서 1 25% 분위수
-        'CP_mean': 1.95 + np.random.normal(0, 0.02),      # 효율성 평균
-        'CP_min': 1.85 + np.random.normal(0, 0.02),       # 효율성 최소값
-        'CP_max': 2.05 + np.random.normal(0, 0.02),       # 효율성 최대값
-        'CP_median': 1.95 + np.random.normal(0, 0.02),    # 효율성 중앙값
-        'CP_rms': 1.95 + np.random.normal(0, 0.02),       # 효율성 RMS
-        'CP_q25': 1.90 + np.random.normal(0, 0.02),       # 효율성 25% 분위수
-        'CP_q75': 2.00 + np.random.normal(0, 0.02)        # 효율성 75% 분위수
-    }
-    
-    # 값들이 너무 극단적이 되지 않도록 제한
-    for key, value in normal_data.items():
-        if 'PS1' in key:
-            if 'max' in key:
-                normal_data[key] = np.clip(value, 188, 192)
-            elif 'diff_std' in key:
-                normal_data[key] = np.clip(value, 0.10, 0.14)
-        elif 'PS2' in key:
-            normal_data[key] = np.clip(value, 1.05, 1.15)
-        elif 'PS3' in key:
-            if 'max' in key:
-                normal_data[key] = np.clip(value, 9.3, 9.7)
-            elif 'p2p' in key:
-                normal_data[key] = np.clip(value, 0.23, 0.27)
-        elif 'TS1' in key:
-            normal_data[key] = np.clip(value, 0.35, 0.45)
-        elif 'VS1' in key:
-            normal_data[key] = np.clip(value, 0.505, 0.515)
-        elif 'CP' in key:
-            normal_data[key] = np.clip(value, 1.85, 2.05)
-    
-    return normal_data
+    # 실제 운영 환경에서 정상 상태일 때의 전형적인 값들 (15개 피처를 한 번에 생성 후 범위 제한)
+    values = _rng.normal(_NORMAL_MEAN, _NORMAL_SIGMA)
+    # 범위 제한은 ufunc 두 번으로 제자리 처리 (np.clip 래퍼/임시 배열 없음)
+    np.maximum(values, _NORMAL_LOW, out=values)
+    np.minimum(values, _NORMAL_HIGH, out=values)
+    return dict(zip(_NORMAL_FEATURES, values.tolist()))
+
+# 실제 데이터셋 15개 피처 (최초 사용 시 한 번만 읽어 보관)
+_real_samples = None
+
+def _load_real_samples():
+    """실제 데이터셋에서 필요한 15개 피처 열만 읽어 (행 수, 15) 배열로 캐시"""
+    global _real_samples
+    if _real_samples is None:
+        # pandas는 실제 데이터셋을 처음 읽을 때만 import (정상 합성 데이터 경로는 import 비용 없음)
+        import pandas as pd
+        df = pd.read_csv('hydraulic_processed_data.csv', usecols=_NORMAL_FEATURES)
+        _real_samples = df[_NORMAL_FEATURES].to_numpy(dtype=np.float64)
+    return _real_samples
 
 def get_real_sample_data():
     """실제 데이터셋에서 샘플 데이터 추출"""
     try:
-        # 실제 데이터셋 읽기
-        df = pd.read_csv('hydraulic_processed_data.csv')
-        
-        # 필요한 15개 피처만 선택
-        features = [
-            'PS1_max', 'PS1_diff_std', 'PS2_diff_std', 'PS3_max', 'PS3_p2p',
-            'TS1_p2p', 'VS1_min', 'VS1_q25', 'CP_mean', 'CP_min', 'CP_max',
-            'CP_median', 'CP_rms', 'CP_q25', 'CP_q75'
-        ]
+        # 실제 데이터셋 (필요한 15개 피처만)
+        samples = _load_real_samples()
         
         # 랜덤 샘플 추출
-        sample_idx = np.random.randint(0, len(df))
-        sample_data = df.iloc[sample_idx][features].to_dict()
+        sample_idx = int(_rng.integers(len(samples)))
+        sample_data = dict(zip(_NORMAL_FEATURES, samples[sample_idx].tolist()))
         
         # 실제 데이터에서 샘플 추출 (인덱스: {sample_idx})
         return sample_data
@@ -94,18 +123,33 @@ def get_real_sample_data():
 def get_sample_data():
     """샘플 데이터 선택 (정상 상태 우선)"""
     # 80% 확률로 정상 상태 데이터 생성
-    if np.random.random() < 0.8:
+    if _rng.random() < 0.8:
         # 정상 상태 합성 데이터 생성
         return generate_normal_sample_data()
     else:
         # 실제 데이터셋에서 샘플 추출
         return get_real_sample_data()
 
+@lru_cache(maxsize=1)
+def _get_predictor(model_dir='.'):
+    """모델/스케일러는 프로세스당 한 번만 로드 (반복 호출 시 재사용)"""
+    return HydraulicAnomalyPredictor(model_dir=model_dir)
+
+def preload():
+    """상주 예측 워커용 - 첫 요청 전에 모델 로드와 실제 데이터셋 캐시를 끝내 둠"""
+    _get_predictor('.')
+    try:
+        _load_real_samples()
+    except Exception:
+        pass
+
 def run_hydraulic_prediction():
     """유압 이상 탐지 모델 실행"""
+    # 성공/에러 결과 공통 타임스탬프
+    timestamp = datetime.now().isoformat()
     try:
         # 1. 모델 초기화
-        predictor = HydraulicAnomalyPredictor(model_dir='.')
+        predictor = _get_predictor('.')
         
         # 2. 실제 데이터에서 샘플 추출
         feature_data = get_sample_data()
@@ -119,16 +163,13 @@ def run_hydraulic_prediction():
         original_probabilities = result.get('probabilities', {})
         
         # 80% 확률로 정상 상태로 조정 (실제 운영 환경 반영)
-        if np.random.random() < 0.8:
+        if _rng.random() < 0.8:
             adjusted_prediction = 0  # 정상
-            adjusted_probabilities = {
-                'normal': 0.85 + np.random.normal(0, 0.05),  # 85% ± 5%
-                'abnormal': 0.15 + np.random.normal(0, 0.05)  # 15% ± 5%
-            }
+            # normal 85% ± 5%, abnormal 15% ± 5% (노이즈를 한 번에 생성)
+            adjusted_values = np.array([0.85, 0.15]) + _rng.normal(0, 0.05, size=2)
             # 확률 합이 1이 되도록 정규화
-            total = adjusted_probabilities['normal'] + adjusted_probabilities['abnormal']
-            adjusted_probabilities['normal'] = adjusted_probabilities['normal'] / total
-            adjusted_probabilities['abnormal'] = adjusted_probabilities['abnormal'] / total
+            adjusted_values /= adjusted_values.sum()
+            adjusted_probabilities = dict(zip(('normal', 'abnormal'), adjusted_values.tolist()))
             
             adjusted_confidence = adjusted_probabilities['normal']  # 정상일 때는 정상 확률을 신뢰도로
             adjusted_status = "Normal" if adjusted_prediction == 0 else "Abnormal Detected"
@@ -144,8 +185,8 @@ def run_hydraulic_prediction():
         
         # 5. 결과 구성
         prediction_result = {
-            'timestamp': datetime.now().isoformat(),
-            'model_type': '유압 이상 탐지',
+            'timestamp': timestamp,
+            'model_type': MODEL_TYPE,
             'prediction': {
                 'prediction': adjusted_prediction,
                 'status': adjusted_status,
@@ -158,8 +199,7 @@ def run_hydraulic_prediction():
         
         # 5. JSON 파일로 저장
         output_path = "last_prediction.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(prediction_result, f, ensure_ascii=False, indent=2)
+        save_prediction_json(prediction_result, output_path)
         
         # 예측 완료: {output_path}
         # 예측 결과: {adjusted_status}
@@ -171,16 +211,15 @@ def run_hydraulic_prediction():
         
     except Exception as e:
         error_result = {
-            'timestamp': datetime.now().isoformat(),
-            'model_type': '유압 이상 탐지',
+            'timestamp': timestamp,
+            'model_type': MODEL_TYPE,
             'status': 'error',
             'error_message': str(e)
         }
         
         # 에러 결과도 JSON으로 저장
         output_path = "last_prediction.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(error_result, f, ensure_ascii=False, indent=2)
+        save_prediction_json(error_result, output_path)
         
         # 예측 실패: {e}
         return error_result
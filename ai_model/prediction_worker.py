@@ -0,0 +1,115 @@
+"""
+AI 모델 상주 예측 워커 (유압 이상 탐지 / 설비 이상 예측 공용)
+
+매 예측마다 run_prediction.py를 새 프로세스로 띄우면 파이썬 기동 + numpy/pandas/sklearn/torch import
++ 모델 로드 비용(수 초)을 매번 치르므로, 모델별로 한 번 띄워 둔 프로세스가 요청을 받아 바로 예측합니다.
+
+[프로토콜]
+- multiprocessing.connection 소켓, 요청/응답 모두 UTF-8 JSON 바이트
+- 요청: {"action": "predict"} → 응답: 모델별 예측 함수(run_hydraulic_prediction 등) 결과
+- 요청: {"action": "ping"} → 응답: {"status": "ok"}
+
+[설정 (환경변수)]
+- PREDICTION_WORKER_AUTHKEY: 워커/클라이언트 공통 인증키 (필수, 기본값 없음)
+- HYDRAULIC_WORKER_HOST/PORT, ABNORMAL_WORKER_HOST/PORT: 모델별 워커 주소
+
+[사용 예시]
+    python -m ai_model.prediction_worker hydraulic    # 워커 실행 (모델별로 프로세스 1개)
+    python -m ai_model.prediction_worker abnormal
+    from ai_model.prediction_worker import request_prediction
+    result = request_prediction('hydraulic', timeout=2)  # 대시보드 등에서 호출
+"""
+
+import os
+import sys
+import json
+from multiprocessing.connection import Listener, Client
+
+# orjson 사용 가능 시 응답 직렬화에 사용 (numpy 값도 변환 없이 처리)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 모델별 워커 설정: (모델 폴더, 예측 함수 이름, 주소 환경변수 접두어, 기본 포트)
+PREDICTION_WORKERS = {
+    'hydraulic': ('hydraulic_rf', 'run_hydraulic_prediction', 'HYDRAULIC_WORKER', 6101),
+    'abnormal': ('abnormal_detec', 'run_abnormal_detection', 'ABNORMAL_WORKER', 6102),
+}
+
+def worker_address(model):
+    """모델별 워커 주소 (host, port)"""
+    _, _, env_prefix, default_port = PREDICTION_WORKERS[model]
+    return (os.getenv(f"{env_prefix}_HOST", "localhost"),
+            int(os.getenv(f"{env_prefix}_PORT", str(default_port))))
+
+def _authkey():
+    """워커 인증키 - 설정되지 않았으면 기본값으로 띄우지 않고 오류"""
+    authkey = os.getenv("PREDICTION_WORKER_AUTHKEY")
+    if not authkey:
+        raise RuntimeError("PREDICTION_WORKER_AUTHKEY 환경변수가 설정되지 않았습니다.")
+    return authkey.encode()
+
+def _dumps(obj):
+    """응답 dict → UTF-8 JSON 바이트"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def request_prediction(model, timeout=None):
+    """모델별 상주 워커에 예측을 요청하고 결과 dict를 반환"""
+    with Client(worker_address(model), authkey=_authkey()) as conn:
+        conn.send_bytes(_dumps({'action': 'predict'}))
+        if timeout is not None and not conn.poll(timeout):
+            raise TimeoutError(f"예측 워커 응답 시간 초과 ({timeout}초)")
+        return json.loads(conn.recv_bytes())
+
+def _handle(conn, predict):
+    """연결 하나의 요청들을 처리 (연결이 닫힐 때까지)"""
+    while True:
+        try:
+            request = json.loads(conn.recv_bytes())
+        except EOFError:
+            return
+        action = request.get('action', 'predict')
+        if action == 'ping':
+            reply = {'status': 'ok'}
+        elif action == 'predict':
+            reply = predict()
+        else:
+            reply = {'status': 'error', 'error_message': f"알 수 없는 action: {action}"}
+        conn.send_bytes(_dumps(reply))
+
+def serve_forever(model):
+    """모델을 미리 로드한 뒤 예측 요청을 순서대로 처리"""
+    folder, predict_name, _, _ = PREDICTION_WORKERS[model]
+    authkey = _authkey()
+    address = worker_address(model)
+
+    # 모델/데이터 파일은 모델 폴더 기준 상대 경로로 읽음
+    model_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), folder)
+    os.chdir(model_dir)
+    sys.path.insert(0, model_dir)
+    import run_prediction
+
+    # 첫 요청 전에 모델 로드(및 데이터 캐시)를 끝내 둠
+    run_prediction.preload()
+    predict = getattr(run_prediction, predict_name)
+
+    with Listener(address, authkey=authkey) as listener:
+        print(f"{model} 예측 워커 대기 중: {address[0]}:{address[1]}")
+        while True:
+            try:
+                with listener.accept() as conn:
+                    _handle(conn, predict)
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                print(f"예측 워커 요청 처리 오류: {e}")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in PREDICTION_WORKERS:
+        print(f"사용법: python -m ai_model.prediction_worker [{'|'.join(PREDICTION_WORKERS)}]")
+        sys.exit(1)
+    serve_forever(sys.argv[1])
@@ -1,19 +1,31 @@
 import os
 import sqlite3
 import json
-from fastapi import FastAPI, HTTPException, Request, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Callable
 from datetime import datetime, timedelta
 import uvicorn
+import anyio.to_thread
 import hashlib
-import uuid
+import heapq
+import secrets
 from dataclasses import dataclass, field
 import logging
 import re
 import requests
+import string
+import threading
+import time
+import queue
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import count, groupby, islice, product
+from operator import itemgetter
 
 # dotenv 추가
 from dotenv import load_dotenv
@@ -29,15 +41,64 @@ except ImportError:
     # CoolSMS SDK 설치 필요 시 주석 해제
 # print("⚠️ CoolSMS SDK가 설치되지 않았습니다. SMS 기능이 제한됩니다.")
 
+# orjson 사용 가능 시 JSON 응답 직렬화에 사용
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultJSONResponse
+    ORJSON_AVAILABLE = False
+
 # 로거 설정 추가
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 DB_PATH = 'posco_iot.db'
 DDL_PATH = 'posco_iot_DDL.sql'
+# 스키마 버전 (DDL/초기 데이터 변경 시 증가 → 다음 기동 시 init_db 재적용)
+SCHEMA_VERSION = 5
+
+# DB 연결 (요청마다 connect/close 하지 않고 재사용)
+# - 읽기: 연결 풀 (WAL이므로 쓰기 중에도 병렬 조회)
+# - 쓰기: 단일 연결 + 잠금 (쓰기 직렬화로 잠금 경합/SQLITE_BUSY 방지)
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(os.cpu_count() or 4)))
+_db_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+_db_pool_slots = threading.BoundedSemaphore(DB_READ_POOL_SIZE)
+_db_writer: Optional[sqlite3.Connection] = None
+_db_write_lock = threading.Lock()
+
+# 대시보드 폴링용 응답 캐시 (stale-while-revalidate)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "2.0"))
+RESPONSE_CACHE_STALE_TTL = float(os.getenv("RESPONSE_CACHE_STALE_TTL", "10.0"))
+_response_cache: Dict[str, Tuple[float, Any]] = {}
+_etag_cache: Dict[str, Tuple[Any, bytes, str]] = {}
+_refreshing_keys = set()
+_response_cache_lock = threading.Lock()
+
+# 최신 생산성 KPI (쓰기 경로에서 갱신, 조회 시 DB 접근 없음)
+_production_kpi_state: Optional[Dict] = None
 
 # 환경변수 설정 추가
 PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
+# 동기(def) 핸들러를 실행하는 스레드풀 크기 (기본 40 → 부하 시 포화 방지)
+API_THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", "200"))
+# 원본 센서 데이터 보존 기간 및 시간별 집계 주기
+SENSOR_RAW_RETENTION_HOURS = int(os.getenv("SENSOR_RAW_RETENTION_HOURS", "24"))
+SENSOR_ROLLUP_INTERVAL_SECONDS = int(os.getenv("SENSOR_ROLLUP_INTERVAL_SECONDS", "60"))
+# 센서 데이터 일괄 저장 단위 (건수 또는 대기 시간 중 먼저 도달하는 쪽)
+SENSOR_WRITE_BATCH_SIZE = int(os.getenv("SENSOR_WRITE_BATCH_SIZE", "500"))
+SENSOR_WRITE_FLUSH_SECONDS = float(os.getenv("SENSOR_WRITE_FLUSH_MS", "50")) / 1000
+ALERT_WRITE_BATCH_SIZE = int(os.getenv("ALERT_WRITE_BATCH_SIZE", "256"))
+# 메모리 데이터(알림 상태, 액션 토큰) 보존 기간 및 정리 주기
+ALERT_STATUS_RETENTION = timedelta(hours=int(os.getenv("ALERT_STATUS_RETENTION_HOURS", "24")))
+ACTION_TOKEN_TTL = timedelta(hours=24)
+# 정리 주기는 다음 만료 시각에 맞춰 조정되며, 아래 값은 최대 대기 시간
+MEMORY_CLEANUP_INTERVAL_SECONDS = int(os.getenv("MEMORY_CLEANUP_INTERVAL_SECONDS", "3600"))
+# 알림 상태 보관 개수 상한 (초과 시 즉시 정리하며 오래된 것부터 제거)
+ALERT_STATUS_SOFT_LIMIT = int(os.getenv("ALERT_STATUS_SOFT_LIMIT", "10000"))
+# 구독자별 SMS 동시 전송 스레드 수
+SMS_SEND_WORKERS = int(os.getenv("SMS_SEND_WORKERS", "8"))
 
 # 관리자 번호는 이제 데이터베이스에서 관리됨 (더 이상 .env 사용 안함)
 # ADMIN_PHONE_NUMBERS = [num.strip() for num in os.getenv("ADMIN_PHONE_NUMBERS", "").split(",") if num.strip()]
@@ -57,15 +118,63 @@ COOLDOWN_PERIODS = {
     'warning': timedelta(seconds=int(os.getenv("WARNING_COOLDOWN_SECONDS", "60"))),
     'info': timedelta(seconds=int(os.getenv("INFO_COOLDOWN_SECONDS", "120")))
 }
+# 메모리 보관 상한 (조치 이력 건수, 중복 체크용 알림 종류 수)
+MAX_ACTION_HISTORY = int(os.getenv("MAX_ACTION_HISTORY", "1000"))
+MAX_ALERT_HISTORY = int(os.getenv("MAX_ALERT_HISTORY", "1000"))
+# 알림 이력별로 보관하는 최근 값 개수
+ALERT_HISTORY_VALUES_MAX = 20
+# 중복 체크용 쿨다운 (초 단위 미리 계산)
+_COOLDOWN_SECONDS = {severity: period.total_seconds() for severity, period in COOLDOWN_PERIODS.items()}
+
+# 센서 종류 한글 표기 (SMS 메시지, 처리 페이지 공용)
+SENSOR_KO = {
+    'temperature': '온도',
+    'pressure': '압력',
+    'vibration': '진동',
+    'power': '전력',
+    'current': '전류',
+    'voltage': '전압'
+}
 
-app = FastAPI(title="POSCO MOBILITY IoT API", version="1.0.0")
+def sensor_label_ko(sensor_type: Optional[str]) -> Optional[str]:
+    """센서 종류 한글 표기 (매핑 없으면 원래 값)"""
+    return SENSOR_KO.get(sensor_type, sensor_type)
+
+app = FastAPI(title="POSCO MOBILITY IoT API", version="1.0.0", default_response_class=DefaultJSONResponse)
 
 # 전역 변수 추가
-action_history = []
-alert_history = {}
-recent_raw_alerts = []
+# 조치 이력은 최근 MAX_ACTION_HISTORY건만 보관 (초과분은 append 시 자동 제거)
+action_history = deque(maxlen=MAX_ACTION_HISTORY)
+# 설비별 조치 이력 (action_history와 같은 레코드, 설비 필터 조회용)
+action_history_by_equipment: Dict[str, deque] = defaultdict(deque)
+_action_seq = count(1)
+# 조치 통계 (action_history에 추가/제거될 때 함께 갱신, 조회 시 전체 순회 없음)
+action_type_counts = Counter()
+equipment_action_counts = Counter()  # (설비, 조치 종류)별 건수
+action_method_counts = Counter()
+_action_stats_lock = threading.Lock()
+# 중복 체크용 알림 이력 (최근 사용 순서, MAX_ALERT_HISTORY 초과 시 가장 오래된 것 제거)
+alert_history = OrderedDict()
 action_tokens = {}
-alert_status_memory = {}
+# 웹 링크 통계 (토큰 생성/처리/삭제 시점에 갱신 → /link_stats는 전체 순회 없이 조회)
+link_stats = Counter()          # active, processed
+link_action_counts = Counter()  # 처리된 링크의 액션별 건수
+_link_stats_lock = threading.Lock()
+# 알림 키는 (설비, 센서, timestamp) 튜플로 통일 (문자열 포맷 없이 바로 조회)
+AlertKey = Tuple[str, Optional[str], str]
+# 알림별 발급 토큰 (같은 알림은 링크를 재사용)
+alert_key_to_token: Dict[AlertKey, str] = {}
+# 알림 처리 상태
+alert_status_memory: Dict[AlertKey, str] = {}
+# 만료 순서 큐 (항상 같은 보존 기간을 더해 넣으므로 앞쪽이 가장 먼저 만료)
+_alert_status_expiry = deque()  # (만료 시각, (설비, 센서, timestamp))
+# 액션 토큰은 min-heap (삽입 순서와 무관하게 가장 이른 만료가 heap[0])
+_action_token_expiry: List[Tuple[datetime, str, AlertKey]] = []  # (만료 시각, token, alert_key)
+# 위 알림 상태/토큰 구조는 알림 수신(이벤트 루프), 정리 스레드, SMS 전송, 초기화 엔드포인트에서 함께 갱신
+_alert_memory_lock = threading.Lock()
+_cleanup_thread: Optional[threading.Thread] = None
+_cleanup_event = threading.Event()  # 상한 초과 등으로 즉시 정리가 필요할 때 set
+_cleanup_stop = threading.Event()
 
 # CORS 설정 (모든 Origin 허용)
 app.add_middleware(
@@ -135,38 +244,529 @@ class EquipmentUserUpdate(BaseModel):
 @dataclass
 class AlertHistory:
     """알림 이력 관리 (중복 방지용)"""
-    alert_hash: str
+    alert_hash: Tuple[str, Optional[str], str]
     equipment: str
     sensor_type: str
     severity: str
     first_occurrence: datetime
     last_occurrence: datetime
     occurrence_count: int = 1
-    values: List[float] = field(default_factory=list)
+    values: deque = field(default_factory=lambda: deque(maxlen=ALERT_HISTORY_VALUES_MAX))
     is_active: bool = True
     last_notification_time: Optional[datetime] = None
 
+# DB 연결 관리
+# 모든 연결에 적용하는 PRAGMA (cache_size는 연결별이므로 풀 크기를 고려해 20MB)
+_DB_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA busy_timeout=5000;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-20000;
+PRAGMA mmap_size=268435456;
+"""
+
+def _open_db(**kwargs) -> sqlite3.Connection:
+    """튜닝된 PRAGMA를 적용한 DB 연결 생성"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256, **kwargs)
+    conn.executescript(_DB_PRAGMAS)
+    return conn
+
+@contextmanager
+def get_db():
+    """읽기 풀에서 DB 연결을 빌려 사용 (최대 DB_READ_POOL_SIZE개, 커밋되지 않은 작업은 롤백 후 반납)"""
+    _db_pool_slots.acquire()
+    try:
+        try:
+            conn = _db_pool.get_nowait()
+        except queue.Empty:
+            conn = _open_db()
+            # 읽기 풀 연결은 쓰기 금지 (쓰기는 get_write_db 전용)
+            conn.execute("PRAGMA query_only=1")
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            _db_pool.put(conn)
+    finally:
+        _db_pool_slots.release()
+
+@contextmanager
+def get_write_db():
+    """쓰기 전용 연결 사용 (BEGIN IMMEDIATE로 쓰기 잠금 선점, 커밋되지 않은 작업은 롤백)"""
+    global _db_writer
+    with _db_write_lock:
+        if _db_writer is None:
+            _db_writer = _open_db(isolation_level=None)
+        _db_writer.execute("BEGIN IMMEDIATE")
+        try:
+            yield _db_writer
+        finally:
+            if _db_writer.in_transaction:
+                _db_writer.rollback()
+
+def close_db_pool():
+    """읽기 풀과 쓰기 연결 모두 닫기"""
+    global _db_writer
+    while True:
+        try:
+            _db_pool.get_nowait().close()
+        except queue.Empty:
+            break
+    with _db_write_lock:
+        if _db_writer is not None:
+            _db_writer.close()
+            _db_writer = None
+
+# 필터 조합별 고정 SQL (동일 문자열 재사용으로 statement cache 적중)
+_SENSORS_QUERIES = {
+    (False, False): "SELECT equipment, sensor_type, value, timestamp FROM sensor_data "
+                    "ORDER BY timestamp DESC LIMIT ?",
+    (True, False): "SELECT equipment, sensor_type, value, timestamp FROM sensor_data "
+                   "WHERE equipment = ? ORDER BY timestamp DESC LIMIT ?",
+    (False, True): "SELECT equipment, sensor_type, value, timestamp FROM sensor_data "
+                   "WHERE sensor_type = ? ORDER BY timestamp DESC LIMIT ?",
+    (True, True): "SELECT equipment, sensor_type, value, timestamp FROM sensor_data "
+                  "WHERE equipment = ? AND sensor_type = ? ORDER BY timestamp DESC LIMIT ?",
+}
+
+# (equipment, severity, status) 필터 조합별 SQL - 상태 필터도 DB에서 처리
+_ALERTS_FILTER_COLUMNS = ('equipment', 'severity', 'status')
+_ALERTS_QUERIES = {
+    key: "SELECT equipment, sensor_type, value, threshold, severity, timestamp, message FROM alerts "
+         + ("WHERE " + " AND ".join(f"{col} = ?" for col, used in zip(_ALERTS_FILTER_COLUMNS, key) if used) + " "
+            if any(key) else "")
+         + "ORDER BY timestamp DESC LIMIT ?"
+    for key in product((False, True), repeat=len(_ALERTS_FILTER_COLUMNS))
+}
+
+# 대시보드 센서 차트에 표시하는 센서 종류
+DASHBOARD_SENSOR_TYPES = ('temperature', 'pressure', 'vibration')
+
+# 센서 차트 SQL - (설비 필터, 시간별 집계 포함) 조합별 고정 SQL
+# 원본(sensor_data)은 SENSOR_RAW_RETENTION_HOURS까지만 남으므로 그보다 오래된 구간은 hourly_sensor_data에서 채움
+_SENSOR_CHART_RAW_SQL = (
+    "SELECT sensor_type, AVG(value), substr(timestamp, 1, 16) || ':00' AS minute FROM sensor_data "
+    "WHERE {equipment}sensor_type IN (?, ?, ?) "
+    "AND timestamp >= strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime', ?) "
+    "GROUP BY sensor_type, minute"
+)
+_SENSOR_CHART_HOURLY_SQL = (
+    "SELECT sensor_type, SUM(avg_value * sample_count) / SUM(sample_count), hour FROM hourly_sensor_data "
+    "WHERE {equipment}sensor_type IN (?, ?, ?) "
+    "AND hour >= strftime('%Y-%m-%dT%H:00:00', 'now', 'localtime', ?) "
+    "AND hour < strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime', ?) "
+    "GROUP BY sensor_type, hour"
+)
+_SENSOR_CHART_QUERIES = {
+    (has_equipment, with_hourly):
+        (_SENSOR_CHART_HOURLY_SQL.format(equipment="equipment = ? AND " if has_equipment else "") + " UNION ALL "
+         if with_hourly else "")
+        + _SENSOR_CHART_RAW_SQL.format(equipment="equipment = ? AND " if has_equipment else "")
+        + " ORDER BY 1, 3"
+    for has_equipment, with_hourly in product((False, True), repeat=2)
+}
+
+# 센서 데이터 보존/집계
+_rollup_timer: Optional[threading.Timer] = None
+
+def rollup_sensor_data() -> int:
+    """보존 기간이 지난 원본 센서 데이터를 시간별 집계로 옮긴 뒤 삭제"""
+    with get_write_db() as conn:
+        with conn:
+            cutoff = conn.execute(
+                "SELECT strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime', ?)",
+                (f'-{SENSOR_RAW_RETENTION_HOURS} hours',)
+            ).fetchone()[0]
+            # 같은 시간대가 여러 번에 나눠 집계될 수 있으므로 기존 집계와 병합
+            conn.execute('''
+                INSERT INTO hourly_sensor_data
+                    (equipment, sensor_type, hour, avg_value, min_value, max_value, sample_count)
+                SELECT equipment, COALESCE(sensor_type, ''), strftime('%Y-%m-%dT%H:00:00', timestamp),
+                       AVG(value), MIN(value), MAX(value), COUNT(*)
+                FROM sensor_data
+                WHERE timestamp < ?
+                GROUP BY 1, 2, 3
+                ON CONFLICT(equipment, sensor_type, hour) DO UPDATE SET
+                    avg_value = (avg_value * sample_count + excluded.avg_value * excluded.sample_count)
+                                / (sample_count + excluded.sample_count),
+                    min_value = MIN(min_value, excluded.min_value),
+                    max_value = MAX(max_value, excluded.max_value),
+                    sample_count = sample_count + excluded.sample_count
+            ''', (cutoff,))
+            deleted = conn.execute('DELETE FROM sensor_data WHERE timestamp < ?', (cutoff,)).rowcount
+    return deleted
+
+def _run_sensor_rollup():
+    """주기적 집계 실행 후 다음 실행 예약"""
+    try:
+        deleted = rollup_sensor_data()
+        if deleted:
+            logger.info(f"센서 데이터 집계: 원본 {deleted}건 → 시간별 집계로 이동")
+    except Exception as e:
+        logger.error(f"센서 데이터 집계 오류: {e}")
+    finally:
+        _schedule_sensor_rollup()
+
+def _schedule_sensor_rollup():
+    """센서 데이터 집계 타이머 예약"""
+    global _rollup_timer
+    _rollup_timer = threading.Timer(SENSOR_ROLLUP_INTERVAL_SECONDS, _run_sensor_rollup)
+    _rollup_timer.daemon = True
+    _rollup_timer.start()
+
+# 메모리 데이터 정리
+def cleanup_old_data() -> int:
+    """보존 기간이 지난 알림 상태/액션 토큰 제거 (만료된 항목 수만큼만 처리)"""
+    now = datetime.now()
+    removed = 0
+    
+    with _alert_memory_lock:
+        while _alert_status_expiry and _alert_status_expiry[0][0] < now:
+            _, alert_key = _alert_status_expiry.popleft()
+            if alert_status_memory.pop(alert_key, None) is not None:
+                removed += 1
+        
+        # 상한 초과분은 만료 전이라도 오래된 것부터 제거
+        while len(alert_status_memory) > ALERT_STATUS_SOFT_LIMIT and _alert_status_expiry:
+            _, alert_key = _alert_status_expiry.popleft()
+            if alert_status_memory.pop(alert_key, None) is not None:
+                removed += 1
+        
+        while _action_token_expiry and _action_token_expiry[0][0] < now:
+            _, token, alert_key = heapq.heappop(_action_token_expiry)
+            if discard_action_token(token):
+                removed += 1
+            if alert_key_to_token.get(alert_key) == token:
+                del alert_key_to_token[alert_key]
+    
+    return removed
+
+def _next_cleanup_delay() -> float:
+    """가장 이른 만료 시각까지 남은 시간 (1초 ~ MEMORY_CLEANUP_INTERVAL_SECONDS)"""
+    heads = []
+    if _alert_status_expiry:
+        heads.append(_alert_status_expiry[0][0])
+    if _action_token_expiry:
+        heads.append(_action_token_expiry[0][0])
+    if not heads:
+        return MEMORY_CLEANUP_INTERVAL_SECONDS
+    delay = (min(heads) - datetime.now()).total_seconds()
+    return min(max(delay, 1.0), MEMORY_CLEANUP_INTERVAL_SECONDS)
+
+def periodic_cleanup():
+    """만료 시각 도래 또는 상한 초과 알림 시에만 깨어나 메모리 정리"""
+    while not _cleanup_stop.is_set():
+        _cleanup_event.wait(timeout=_next_cleanup_delay())
+        _cleanup_event.clear()
+        if _cleanup_stop.is_set():
+            break
+        try:
+            removed = cleanup_old_data()
+            if removed:
+                logger.info(f"메모리 정리: 항목 {removed}건 제거")
+        except Exception as e:
+            logger.error(f"메모리 정리 오류: {e}")
+
+def start_cleanup():
+    global _cleanup_thread
+    _cleanup_stop.clear()
+    _cleanup_thread = threading.Thread(target=periodic_cleanup, name="memory-cleanup", daemon=True)
+    _cleanup_thread.start()
+
+def stop_cleanup():
+    _cleanup_stop.set()
+    _cleanup_event.set()
+
+# 일괄 쓰기 (요청마다 커밋하지 않고 모아서 한 트랜잭션으로 저장)
+class BatchWriter:
+    """큐에 쌓인 항목을 최대 batch_size건 또는 flush_seconds 단위로 모아 저장하는 백그라운드 쓰기 스레드"""
+    
+    def __init__(self, name: str, flush: Callable[[sqlite3.Connection, List[Any]], None], batch_size: int,
+                 flush_seconds: float, on_discard: Optional[Callable[[Any, Optional[Exception]], None]] = None):
+        self.name = name
+        self.flush = flush
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.on_discard = on_discard
+        self.queue: "queue.Queue[Any]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        # 데이터 초기화 세대 - 항목은 넣을 때의 세대로 표시되고, 저장 시 세대가 바뀌었으면 버림
+        self.generation = 0
+        # 저장 실패 집계 (응답은 큐 적재 시점에 나가므로 /health로 실패를 노출)
+        self.failed_batches = 0
+        self.failed_items = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[str] = None
+    
+    def put(self, item: Any):
+        self.queue.put((self.generation, item))
+    
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """남은 항목을 모두 저장한 뒤 쓰기 스레드 종료"""
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout=5)
+    
+    def discard_pending(self):
+        """아직 저장되지 않은 항목 버림 (데이터 초기화 시, get_write_db() 안에서 호출)
+        세대를 올려 두므로 쓰기 스레드가 이미 꺼내 잠금을 기다리던 배치도 저장되지 않음"""
+        self.generation += 1
+        while True:
+            try:
+                entry = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self.queue.put(None)
+                break
+            self._discard(entry[1])
+    
+    def _discard(self, item: Any, error: Optional[Exception] = None):
+        """저장하지 않고 버린 항목 통지 (error가 없으면 데이터 초기화로 버린 것)"""
+        if self.on_discard:
+            self.on_discard(item, error)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.queue.qsize(),
+            "failed_batches": self.failed_batches,
+            "failed_items": self.failed_items,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at
+        }
+    
+    def _run(self):
+        running = True
+        while running:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            try:
+                with get_write_db() as conn:
+                    # 세대 비교는 쓰기 잠금 안에서 (초기화와 겹친 배치는 DELETE 뒤에 저장되지 않도록 버림)
+                    items = []
+                    for generation, item in batch:
+                        if generation == self.generation:
+                            items.append(item)
+                        else:
+                            self._discard(item)
+                    if items:
+                        self.flush(conn, items)
+            except Exception as e:
+                self.failed_batches += 1
+                self.failed_items += len(batch)
+                self.last_error = str(e)
+                self.last_error_at = datetime.now().isoformat()
+                logger.error(f"[{self.name}] 일괄 저장 오류 ({len(batch)}건): {e}")
+                for _, item in batch:
+                    self._discard(item, e)
+
+def _flush_sensor_rows(conn: sqlite3.Connection, rows: List[Tuple]):
+    with conn:
+        conn.executemany('''INSERT INTO sensor_data (equipment, sensor_type, value, timestamp) \
+            VALUES (?, ?, ?, ?)''', rows)
+
+_INSERT_ALERT_SQL = '''INSERT INTO alerts (equipment, sensor_type, value, threshold, severity, timestamp, message) \
+    VALUES (?, ?, ?, ?, ?, ?, ?)'''
+
+def _flush_alert_rows(conn: sqlite3.Connection, items: List[Tuple[Tuple, Optional[Future]]]):
+    """알림 일괄 저장 - ID가 필요한 항목(Future 있음)이 있으면 행별 execute로 lastrowid 수집"""
+    alert_ids = []
+    with conn:
+        if any(future for _, future in items):
+            c = conn.cursor()
+            for row, _ in items:
+                c.execute(_INSERT_ALERT_SQL, row)
+                alert_ids.append(c.lastrowid)
+        else:
+            conn.executemany(_INSERT_ALERT_SQL, [row for row, _ in items])
+    # 커밋 이후에 ID 전달
+    for (_, future), alert_id in zip(items, alert_ids):
+        if future:
+            future.set_result(alert_id)
+
+def _cancel_alert_row(item: Tuple[Tuple, Optional[Future]], error: Optional[Exception]):
+    """저장되지 않은 알림의 ID 대기(SMS 전송) 취소"""
+    _, future = item
+    if future and not future.done():
+        future.set_exception(error or RuntimeError("데이터 초기화로 알림 저장이 취소되었습니다"))
+
+sensor_writer = BatchWriter("sensor-writer", _flush_sensor_rows,
+                            SENSOR_WRITE_BATCH_SIZE, SENSOR_WRITE_FLUSH_SECONDS)
+alert_writer = BatchWriter("alert-writer", _flush_alert_rows,
+                           ALERT_WRITE_BATCH_SIZE, SENSOR_WRITE_FLUSH_SECONDS, on_discard=_cancel_alert_row)
+
+# 응답 캐시 관리
+def cached_response(key: str, loader, ttl: float = RESPONSE_CACHE_TTL,
+                    stale_ttl: float = RESPONSE_CACHE_STALE_TTL):
+    """TTL 내에는 캐시 반환, stale_ttl 내에는 이전 값을 반환하고 백그라운드에서 갱신"""
+    entry = _response_cache.get(key)
+    if entry:
+        age = time.monotonic() - entry[0]
+        if age < ttl:
+            return entry[1]
+        if age < stale_ttl:
+            with _response_cache_lock:
+                if key not in _refreshing_keys:
+                    _refreshing_keys.add(key)
+                    threading.Thread(target=_refresh_cached_response, args=(key, loader), daemon=True).start()
+            return entry[1]
+    
+    value = loader()
+    _response_cache[key] = (time.monotonic(), value)
+    return value
+
+def _refresh_cached_response(key: str, loader):
+    """백그라운드 캐시 갱신"""
+    try:
+        _response_cache[key] = (time.monotonic(), loader())
+    except Exception as e:
+        logger.error(f"캐시 갱신 오류 ({key}): {e}")
+    finally:
+        with _response_cache_lock:
+            _refreshing_keys.discard(key)
+
+def invalidate_cache(*keys: str):
+    """데이터 변경 시 캐시 무효화 (키 미지정 시 전체)"""
+    if not keys:
+        _response_cache.clear()
+        return
+    for key in keys:
+        _response_cache.pop(key, None)
+
+def etag_response(request: Request, key: str, payload: Any) -> Response:
+    """ETag 기반 조건부 응답 (If-None-Match 일치 시 본문 없이 304)"""
+    entry = _etag_cache.get(key)
+    if entry and entry[0] is payload:
+        body, etag = entry[1], entry[2]
+    else:
+        if ORJSON_AVAILABLE:
+            body = orjson.dumps(payload)
+        else:
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        _etag_cache[key] = (payload, body, etag)
+    
+    headers = {"ETag": etag, "Cache-Control": f"max-age={int(RESPONSE_CACHE_TTL)}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+_now_iso_cache: Tuple[int, str] = (0, "")
+
+def now_iso_cached() -> str:
+    """초 단위로 캐시한 현재 시각 ISO 문자열 (매초 폴링되는 응답에서 매번 isoformat 생성 방지)"""
+    global _now_iso_cache
+    now_sec = int(time.time())
+    cached_sec, cached_iso = _now_iso_cache
+    if now_sec != cached_sec:
+        cached_iso = datetime.fromtimestamp(now_sec).isoformat()
+        _now_iso_cache = (now_sec, cached_iso)
+    return cached_iso
+
 # 유틸리티 함수들
+_TIMESTAMP_SECONDS_RE = re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})')
+
 def normalize_timestamp(timestamp: str) -> str:
     """타임스탬프를 초 단위까지만 잘라서 정규화"""
-    match = re.match(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})', timestamp)
+    # 'YYYY-MM-DDTHH:MM:SS'(19자) 이하는 잘라낼 부분이 없으므로 그대로 반환
+    if len(timestamp) <= 19:
+        return timestamp
+    match = _TIMESTAMP_SECONDS_RE.match(timestamp)
     if match:
         return match.group(1)
     return timestamp
 
 def generate_action_link(alert_data: dict) -> str:
-    """알림 처리용 고유 링크 생성"""
-    token = str(uuid.uuid4())
+    """알림 처리용 고유 링크 생성 (같은 알림은 만료 전까지 기존 링크 재사용)"""
+    alert_key = (alert_data['equipment'], alert_data['sensor_type'], alert_data['timestamp'])
+    now = datetime.now()
     
-    action_tokens[token] = {
-        "alert_data": alert_data,
-        "created_at": datetime.now(),
-        "processed": False,
-        "expires_at": datetime.now() + timedelta(hours=24)
-    }
+    with _alert_memory_lock:
+        token = alert_key_to_token.get(alert_key)
+        if token:
+            token_data = action_tokens.get(token)
+            if token_data and now <= token_data["expires_at"]:
+                return f"{PUBLIC_BASE_URL}/action/{token}"
+            discard_action_token(token)
+        
+        token = secrets.token_urlsafe(16)
+        expires_at = now + ACTION_TOKEN_TTL
+        action_tokens[token] = {
+            "alert_data": alert_data,
+            "sensor_ko": sensor_label_ko(alert_data['sensor_type']),
+            "created_at": now,
+            "processed": False,
+            "expires_at": expires_at
+        }
+        alert_key_to_token[alert_key] = token
+        heapq.heappush(_action_token_expiry, (expires_at, token, alert_key))
+        with _link_stats_lock:
+            link_stats["active"] += 1
     
     return f"{PUBLIC_BASE_URL}/action/{token}"
 
+def discard_action_token(token: str) -> bool:
+    """액션 토큰 삭제 및 링크 통계 반영 (삭제했으면 True, _alert_memory_lock 안에서 호출)"""
+    token_data = action_tokens.pop(token, None)
+    if token_data is None:
+        return False
+    with _link_stats_lock:
+        if token_data["processed"]:
+            link_stats["processed"] -= 1
+            if token_data.get("action"):
+                link_action_counts[token_data["action"]] -= 1
+        else:
+            link_stats["active"] -= 1
+    return True
+
+# 구독자별 SMS 전송용 스레드풀 (수신자 N명 전송 시간 ≈ 가장 느린 1건)
+_sms_executor = ThreadPoolExecutor(max_workers=SMS_SEND_WORKERS, thread_name_prefix="sms-send")
+
+def _send_sms_to_subscriber(subscriber: Dict, message: str, alert_id: Optional[int]) -> bool:
+    """구독자 1명에게 SMS 전송 후 이력 저장"""
+    try:
+        params = {
+            'type': 'SMS',
+            'to': subscriber['phone_number'],
+            'from': coolsms_sender,
+            'text': message
+        }
+        
+        response = coolsms_api.send(params)
+        if response.get('success_count', 0) > 0:
+            # SMS 이력 저장
+            save_sms_history(subscriber['id'], alert_id, subscriber['phone_number'], message)
+            logger.info(f"✅ SMS 전송 성공: {subscriber['phone_number']}")
+            return True
+        logger.error(f"❌ SMS 전송 실패: {subscriber['phone_number']} - {response}")
+            
+    except CoolsmsException as e:
+        logger.error(f"❌ CoolSMS 오류: {subscriber['phone_number']} - {e}")
+    except Exception as e:
+        logger.error(f"❌ SMS 전송 오류: {subscriber['phone_number']} - {e}")
+    return False
+
 def send_sms_alert(alert_data: dict) -> bool:
     """SMS 알림 전송 (기업용 - 동적 사용자 관리)"""
     if not coolsms_api or not coolsms_sender:
@@ -184,15 +784,7 @@ def send_sms_alert(alert_data: dict) -> bool:
         action_link = generate_action_link(alert_data)
         
         # 메시지 포맷팅 (간단한 포맷)
-        sensor_map = {
-            'temperature': '온도',
-            'pressure': '압력', 
-            'vibration': '진동',
-            'power': '전력',
-            'current': '전류',
-            'voltage': '전압'
-        }
-        sensor_ko = sensor_map.get(alert_data.get('sensor_type', ''), alert_data.get('sensor_type', ''))
+        sensor_ko = sensor_label_ko(alert_data.get('sensor_type', ''))
         
         # 발생 시간 포맷팅
         current_time = datetime.now().strftime('%H:%M:%S')
@@ -219,30 +811,9 @@ def send_sms_alert(alert_data: dict) -> bool:
         except:
             pass  # 단축 실패 시 원본 링크 사용
         
-        success_count = 0
-        for subscriber in subscribers:
-            try:
-                params = {
-                    'type': 'SMS',
-                    'to': subscriber['phone_number'],
-                    'from': coolsms_sender,
-                    'text': message
-                }
-                
-                response = coolsms_api.send(params)
-                if response.get('success_count', 0) > 0:
-                    # SMS 이력 저장
-                    save_sms_history(subscriber['id'], alert_data.get('id'), 
-                                   subscriber['phone_number'], message)
-                    success_count += 1
-                    logger.info(f"✅ SMS 전송 성공: {subscriber['phone_number']}")
-                else:
-                    logger.error(f"❌ SMS 전송 실패: {subscriber['phone_number']} - {response}")
-                    
-            except CoolsmsException as e:
-                logger.error(f"❌ CoolSMS 오류: {subscriber['phone_number']} - {e}")
-            except Exception as e:
-                logger.error(f"❌ SMS 전송 오류: {subscriber['phone_number']} - {e}")
+        # 구독자별 전송을 동시에 진행
+        send = partial(_send_sms_to_subscriber, message=message, alert_id=alert_data.get('id'))
+        success_count = sum(_sms_executor.map(send, subscribers))
         
         logger.info(f"📱 SMS 전송 완료: {success_count}/{len(subscribers)} 성공")
         return success_count > 0
@@ -251,38 +822,36 @@ def send_sms_alert(alert_data: dict) -> bool:
         logger.error(f"❌ SMS 알림 전송 오류: {e}")
         return False
 
+# 알림 단위 SMS 작업용 (구독자별 전송은 _sms_executor의 map을 기다리므로 같은 풀에 넣지 않음)
+_sms_alert_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sms-alert")
+
+def send_sms_alert_after_insert(alert_data: dict, alert_id_future: Future):
+    """알림 DB 저장(일괄 쓰기)이 끝나 ID가 정해지면 SMS 전송 예약 (저장을 기다리며 스레드를 붙잡지 않음)"""
+    def on_saved(future: Future):
+        try:
+            # alert_dict에 id 추가
+            alert_data['id'] = future.result()
+        except Exception as e:
+            logger.error(f"❌ 알림 저장 실패로 SMS 전송 취소: {e}")
+            return
+        _sms_alert_executor.submit(send_sms_alert, alert_data)
+    alert_id_future.add_done_callback(on_saved)
+
 def get_alert_subscribers(alert_data: dict) -> List[Dict]:
     """알림 구독자 조회 (설비별 사용자 관리 기반)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # 1. 해당 설비에 할당된 사용자들 조회 (우선순위 1)
-        equipment_users_query = """
-        SELECT DISTINCT u.id, u.phone_number, u.name, u.department, eu.role as equipment_role, eu.is_primary
+        # 1. 해당 설비에 할당된 사용자들 (우선순위 1)
+        # 2. 일반 알림 구독 설정에 맞는 사용자들 (우선순위 2)
+        # 두 조회를 UNION ALL 한 번으로 가져오고 priority 컬럼으로 구분
+        subscribers_query = """
+        SELECT DISTINCT 1 AS priority, u.id, u.phone_number, u.name, u.department,
+               eu.role AS equipment_role, eu.is_primary
         FROM users u
         JOIN equipment_users eu ON u.id = eu.user_id
         WHERE u.is_active = 1 
         AND eu.equipment_id = ?
-        ORDER BY eu.is_primary DESC, u.name ASC
-        """
-        
-        cursor.execute(equipment_users_query, (alert_data['equipment'],))
-        equipment_users = []
-        for row in cursor.fetchall():
-            equipment_users.append({
-                'id': row[0],
-                'phone_number': row[1],
-                'name': row[2],
-                'department': row[3],
-                'equipment_role': row[4],
-                'is_primary': bool(row[5]),
-                'source': 'equipment_assignment'
-            })
-        
-        # 2. 일반 알림 구독 설정에 맞는 사용자들 조회 (우선순위 2)
-        subscription_query = """
-        SELECT DISTINCT u.id, u.phone_number, u.name, u.department
+        UNION ALL
+        SELECT DISTINCT 2, u.id, u.phone_number, u.name, u.department, NULL, NULL
         FROM users u
         JOIN alert_subscriptions s ON u.id = s.user_id
         WHERE u.is_active = 1 
@@ -295,26 +864,41 @@ def get_alert_subscribers(alert_data: dict) -> List[Dict]:
             FROM equipment_users eu 
             WHERE eu.equipment_id = ?
         )
+        ORDER BY priority, is_primary DESC, name ASC
         """
         
-        cursor.execute(subscription_query, (
-            alert_data['severity'],
-            alert_data['equipment'],
-            alert_data.get('sensor_type', ''),
-            alert_data['equipment']
-        ))
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(subscribers_query, (
+                alert_data['equipment'],
+                alert_data['severity'],
+                alert_data['equipment'],
+                alert_data.get('sensor_type', ''),
+                alert_data['equipment']
+            ))
+            rows = cursor.fetchall()
         
+        equipment_users = []
         subscription_users = []
-        for row in cursor.fetchall():
-            subscription_users.append({
-                'id': row[0],
-                'phone_number': row[1],
-                'name': row[2],
-                'department': row[3],
-                'source': 'subscription'
-            })
-        
-        conn.close()
+        for row in rows:
+            if row[0] == 1:
+                equipment_users.append({
+                    'id': row[1],
+                    'phone_number': row[2],
+                    'name': row[3],
+                    'department': row[4],
+                    'equipment_role': row[5],
+                    'is_primary': bool(row[6]),
+                    'source': 'equipment_assignment'
+                })
+            else:
+                subscription_users.append({
+                    'id': row[1],
+                    'phone_number': row[2],
+                    'name': row[3],
+                    'department': row[4],
+                    'source': 'subscription'
+                })
         
         # 설비 할당 사용자를 우선으로 하고, 중복 제거
         all_subscribers = equipment_users + subscription_users
@@ -336,16 +920,15 @@ def get_alert_subscribers(alert_data: dict) -> List[Dict]:
 def save_sms_history(user_id: int, alert_id: Optional[int], phone_number: str, message: str):
     """SMS 전송 이력 저장"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO sms_history (user_id, alert_id, phone_number, message, status)
-            VALUES (?, ?, ?, ?, 'sent')
-        """, (user_id, alert_id, phone_number, message))
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                INSERT INTO sms_history (user_id, alert_id, phone_number, message, status)
+                VALUES (?, ?, ?, ?, 'sent')
+            """, (user_id, alert_id, phone_number, message))
+            
+            conn.commit()
         
     except Exception as e:
         logger.error(f"❌ SMS 이력 저장 오류: {e}")
@@ -353,28 +936,27 @@ def save_sms_history(user_id: int, alert_id: Optional[int], phone_number: str, m
 def get_users_from_db() -> List[Dict]:
     """데이터베이스에서 사용자 목록 조회"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, phone_number, name, department, role, is_active, created_at
-            FROM users
-            ORDER BY created_at DESC
-        """)
-        
-        users = []
-        for row in cursor.fetchall():
-            users.append({
-                'id': row[0],
-                'phone_number': row[1],
-                'name': row[2],
-                'department': row[3],
-                'role': row[4],
-                'is_active': bool(row[5]),
-                'created_at': row[6]
-            })
+        with get_db() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT id, phone_number, name, department, role, is_active, created_at
+                FROM users
+                ORDER BY created_at DESC
+            """)
+            
+            users = []
+            for row in cursor:
+                users.append({
+                    'id': row[0],
+                    'phone_number': row[1],
+                    'name': row[2],
+                    'department': row[3],
+                    'role': row[4],
+                    'is_active': bool(row[5]),
+                    'created_at': row[6]
+                })
         
-        conn.close()
         return users
         
     except Exception as e:
@@ -384,9 +966,6 @@ def get_users_from_db() -> List[Dict]:
 def get_equipment_users_from_db(equipment_id: Optional[str] = None) -> List[Dict]:
     """설비별 사용자 할당 정보 조회"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
         if equipment_id:
             query = """
             SELECT eu.id, eu.equipment_id, eu.user_id, eu.role, eu.is_primary, eu.created_at,
@@ -396,7 +975,7 @@ def get_equipment_users_from_db(equipment_id: Optional[str] = None) -> List[Dict
             WHERE eu.equipment_id = ?
             ORDER BY eu.is_primary DESC, eu.created_at ASC
             """
-            cursor.execute(query, (equipment_id,))
+            params = (equipment_id,)
         else:
             query = """
             SELECT eu.id, eu.equipment_id, eu.user_id, eu.role, eu.is_primary, eu.created_at,
@@ -405,24 +984,27 @@ def get_equipment_users_from_db(equipment_id: Optional[str] = None) -> List[Dict
             JOIN users u ON eu.user_id = u.id
             ORDER BY eu.equipment_id, eu.is_primary DESC, eu.created_at ASC
             """
-            cursor.execute(query)
+            params = ()
         
-        assignments = []
-        for row in cursor.fetchall():
-            assignments.append({
-                'id': row[0],
-                'equipment_id': row[1],
-                'user_id': row[2],
-                'role': row[3],
-                'is_primary': bool(row[4]),
-                'created_at': row[5],
-                'user_name': row[6],
-                'phone_number': row[7],
-                'department': row[8],
-                'user_role': row[9]
-            })
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            
+            assignments = []
+            for row in cursor:
+                assignments.append({
+                    'id': row[0],
+                    'equipment_id': row[1],
+                    'user_id': row[2],
+                    'role': row[3],
+                    'is_primary': bool(row[4]),
+                    'created_at': row[5],
+                    'user_name': row[6],
+                    'phone_number': row[7],
+                    'department': row[8],
+                    'user_role': row[9]
+                })
         
-        conn.close()
         return assignments
         
     except Exception as e:
@@ -436,9 +1018,6 @@ def get_equipment_users_by_equipment(equipment_id: str) -> List[Dict]:
 def get_equipment_users_by_user(user_id: int) -> List[Dict]:
     """특정 사용자가 담당하는 설비 목록 조회"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
         query = """
         SELECT eu.id, eu.equipment_id, eu.role, eu.is_primary, eu.created_at,
                es.name as equipment_name, es.type as equipment_type
@@ -447,93 +1026,99 @@ def get_equipment_users_by_user(user_id: int) -> List[Dict]:
         WHERE eu.user_id = ?
         ORDER BY eu.is_primary DESC, es.name ASC
         """
-        cursor.execute(query, (user_id,))
-        
-        assignments = []
-        for row in cursor.fetchall():
-            assignments.append({
-                'id': row[0],
-                'equipment_id': row[1],
-                'role': row[2],
-                'is_primary': bool(row[3]),
-                'created_at': row[4],
-                'equipment_name': row[5],
-                'equipment_type': row[6]
-            })
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (user_id,))
+            
+            assignments = []
+            for row in cursor:
+                assignments.append({
+                    'id': row[0],
+                    'equipment_id': row[1],
+                    'role': row[2],
+                    'is_primary': bool(row[3]),
+                    'created_at': row[4],
+                    'equipment_name': row[5],
+                    'equipment_type': row[6]
+                })
         
-        conn.close()
         return assignments
         
     except Exception as e:
         logger.error(f"❌ 사용자별 설비 조회 오류: {e}")
         return []
 
-def check_duplicate_alert(alert_data: Dict) -> Tuple[bool, str]:
+def check_duplicate_alert(equipment: str, sensor_type: Optional[str], severity: str,
+                          value: Optional[float]) -> Tuple[bool, str]:
     """알림 중복 체크 - True면 중복(스킵), False면 신규(발송)"""
-    unique_string = f"{alert_data['equipment']}:{alert_data['sensor_type']}:{alert_data['severity']}"
-    hash_key = hashlib.md5(unique_string.encode()).hexdigest()
+    hash_key = (equipment, sensor_type, severity)
+    now = datetime.now()
     
     if hash_key not in alert_history:
+        if len(alert_history) >= MAX_ALERT_HISTORY:
+            alert_history.popitem(last=False)
         alert_history[hash_key] = AlertHistory(
             alert_hash=hash_key,
-            equipment=alert_data['equipment'],
-            sensor_type=alert_data['sensor_type'],
-            severity=alert_data['severity'],
-            first_occurrence=datetime.now(),
-            last_occurrence=datetime.now(),
+            equipment=equipment,
+            sensor_type=sensor_type,
+            severity=severity,
+            first_occurrence=now,
+            last_occurrence=now,
             occurrence_count=1,
-            values=[alert_data['value']],
+            values=deque([value], maxlen=ALERT_HISTORY_VALUES_MAX),
             is_active=True,
-            last_notification_time=datetime.now()
+            last_notification_time=now
         )
         return False, "새로운 알림 타입"
     
     history = alert_history[hash_key]
-    now = datetime.now()
+    alert_history.move_to_end(hash_key)
     
     # 직전 값과 동일한지 체크
     if history.values and len(history.values) > 0:
         last_value = history.values[-1]
-        if abs(alert_data['value'] - last_value) < 0.01:
+        if abs(value - last_value) < 0.01:
             time_since_last = now - history.last_occurrence
             if time_since_last < timedelta(seconds=5):
                 history.last_occurrence = now
-                return True, f"동일한 값 반복 (값: {alert_data['value']})"
+                return True, f"동일한 값 반복 (값: {value})"
     
     # 쿨다운 체크
     if history.last_notification_time:
-        cooldown = COOLDOWN_PERIODS.get(alert_data['severity'], timedelta(seconds=30))
-        if now - history.last_notification_time < cooldown:
-            remaining = int((history.last_notification_time + cooldown - now).total_seconds())
+        cooldown = _COOLDOWN_SECONDS.get(severity, 30.0)
+        elapsed = (now - history.last_notification_time).total_seconds()
+        if elapsed < cooldown:
+            remaining = int(cooldown - elapsed)
             return True, f"쿨다운 중 (남은시간: {remaining}초)"
     
     # 값 변화율 체크
     if history.values and len(history.values) > 1:
         last_value = history.values[-1]
         if last_value != 0:
-            change_rate = abs(alert_data['value'] - last_value) / abs(last_value)
+            change_rate = abs(value - last_value) / abs(last_value)
             if change_rate < 0.05:
                 return True, f"변화율 미달 ({change_rate*100:.1f}% < 5%)"
     
     history.last_occurrence = now
     history.occurrence_count += 1
-    history.values.append(alert_data['value'])
+    history.values.append(value)
     history.last_notification_time = now
     history.is_active = True
     
-    if len(history.values) > 20:
-        history.values = history.values[-20:]
-        
-    return False, f"새로운 알림 (값: {alert_data['value']})"
+    return False, f"새로운 알림 (값: {value})"
 
 # DB 초기화 함수 (DDL 적용 및 장비 초기 데이터 삽입)
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    # 이미 현재 스키마 버전이 적용된 DB면 건너뜀
+    with get_db() as conn:
+        current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current_version >= SCHEMA_VERSION:
+        logger.info(f"DB 스키마 v{current_version} 적용됨 - 초기화 생략")
+        return
+    
     # DDL 파일 실행
     with open(DDL_PATH, encoding='utf-8') as f:
         ddl = f.read()
-    c.executescript(ddl)
     # 장비 초기 데이터 (시뮬레이터와 완전히 일치)
     initial_equipment = [
         # 프레스기 4개
@@ -558,14 +1143,29 @@ def init_db():
         ("pack_001", "포장기 #1", "정상", 93.5, "포장", "2024-01-19"),
         ("pack_002", "포장기 #2", "정상", 95.8, "포장", "2024-01-20")
     ]
-    c.executemany('''INSERT OR IGNORE INTO equipment_status \
-        (id, name, status, efficiency, type, last_maintenance) VALUES (?, ?, ?, ?, ?, ?)''', initial_equipment)
-    conn.commit()
-    conn.close()
+    with get_write_db() as conn:
+        c = conn.cursor()
+        c.executescript(ddl)
+        c.executemany('''INSERT OR IGNORE INTO equipment_status \
+            (id, name, status, efficiency, type, last_maintenance) VALUES (?, ?, ?, ?, ?, ?)''', initial_equipment)
+        c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+        # 인덱스 통계 갱신 (쿼리 플래너용)
+        c.execute("ANALYZE")
+    logger.info(f"DB 스키마 v{SCHEMA_VERSION} 초기화 완료")
+
+@app.on_event("startup")
+async def configure_threadpool():
+    """DB 작업을 하는 동기 핸들러용 스레드풀 크기 조정"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
 
 @app.on_event("startup")
 def startup():
     init_db()
+    sensor_writer.start()
+    alert_writer.start()
+    _schedule_sensor_rollup()
+    start_cleanup()
     # 환경변수 확인 로그 추가
     logger.info("="*50)
     logger.info("환경변수 설정 확인:")
@@ -578,62 +1178,57 @@ def startup():
         logger.info(f"📞 발신번호: {coolsms_sender}")
     logger.info("="*50)
 
+@app.on_event("shutdown")
+def shutdown():
+    if _rollup_timer:
+        _rollup_timer.cancel()
+    stop_cleanup()
+    sensor_writer.stop()
+    alert_writer.stop()
+    _sms_alert_executor.shutdown(wait=False)
+    _sms_executor.shutdown(wait=False)
+    close_db_pool()
+
 # 센서 데이터 조회 (시뮬레이터/대시보드)
-@app.get("/sensors", response_model=List[SensorData])
+@app.get("/sensors")
 def get_sensors(equipment: Optional[str] = None, sensor_type: Optional[str] = None, limit: int = 100):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    query = "SELECT equipment, sensor_type, value, timestamp FROM sensor_data"
-    params = []
-    conditions = []
-    if equipment:
-        conditions.append("equipment = ?")
-        params.append(equipment)
-    if sensor_type:
-        conditions.append("sensor_type = ?")
-        params.append(sensor_type)
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    query += " ORDER BY timestamp DESC LIMIT ?"
+    query = _SENSORS_QUERIES[(bool(equipment), bool(sensor_type))]
+    params = [p for p in (equipment, sensor_type) if p]
     params.append(limit)
-    c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
-    return [SensorData(equipment=row[0], sensor_type=row[1], value=row[2], timestamp=row[3]) for row in rows]
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(query, params)
+        # 커서에서 바로 변환 (fetchall 중간 리스트 없음)
+        return DefaultJSONResponse([{'equipment': row[0], 'sensor_type': row[1], 'value': row[2], 'timestamp': row[3]}
+                                    for row in c])
 
 # 센서 데이터 저장 (시뮬레이터)
-@app.post("/sensors")
+# 쓰기 큐에 넣고 바로 202 응답 (sensor-writer 스레드가 모아서 저장, 저장 실패는 /health의 writers에 집계)
+@app.post("/sensors", status_code=202)
 def post_sensor(data: SensorData):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
     timestamp = data.timestamp or datetime.now().isoformat()
-    c.execute('''INSERT INTO sensor_data (equipment, sensor_type, value, timestamp) \
-        VALUES (?, ?, ?, ?)''', (data.equipment, data.sensor_type, data.value, timestamp))
-    conn.commit()
-    conn.close()
-    return {"status": "ok", "message": "센서 데이터가 저장되었습니다."}
+    sensor_writer.put((data.equipment, data.sensor_type, data.value, timestamp))
+    return {"status": "queued", "message": "센서 데이터가 저장 대기열에 추가되었습니다."}
+
+# 센서 데이터 일괄 저장 (시뮬레이터) - 쓰기 큐를 거쳐 다른 요청분과 함께 executemany
+@app.post("/sensors/batch", status_code=202)
+def post_sensor_batch(data: List[SensorData]):
+    now = datetime.now().isoformat()
+    rows = [(d.equipment, d.sensor_type, d.value, d.timestamp or now) for d in data]
+    for row in rows:
+        sensor_writer.put(row)
+    return {"status": "queued", "message": f"센서 데이터 {len(rows)}건이 저장 대기열에 추가되었습니다."}
 
 # 알림 데이터 조회 (대시보드/시뮬레이터) - 수정됨
-@app.get("/alerts", response_model=List[AlertData])
+@app.get("/alerts")
 def get_alerts(equipment: Optional[str] = None, severity: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    query = "SELECT equipment, sensor_type, value, threshold, severity, timestamp, message FROM alerts"
-    params = []
-    conditions = []
-    if equipment:
-        conditions.append("equipment = ?")
-        params.append(equipment)
-    if severity:
-        conditions.append("severity = ?")
-        params.append(severity)
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    query += " ORDER BY timestamp DESC LIMIT ?"
+    query = _ALERTS_QUERIES[(bool(equipment), bool(severity), bool(status))]
+    params = [p for p in (equipment, severity, status) if p]
     params.append(limit)
-    c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(query, params)
+        rows = c.fetchall()
     
     results = []
     for row in rows:
@@ -648,138 +1243,127 @@ def get_alerts(equipment: Optional[str] = None, severity: Optional[str] = None,
         }
         
         # 웹 링크 생성 (error severity만)
-        if row[4] == 'error':
-            alert_dict["action_link"] = generate_action_link(alert_dict)
+        action_link = generate_action_link(alert_dict) if row[4] == 'error' else None
+        alert_dict["action_link"] = action_link
             
-        results.append(AlertData(**alert_dict))
+        results.append(alert_dict)
             
-    return results
+    return DefaultJSONResponse(results)
 
 # 알림 데이터 저장 (시뮬레이터/AI) - 수정됨
-@app.post("/alerts")
-def post_alert(data: AlertData, background_tasks: BackgroundTasks):
+# DB 저장은 alert-writer 큐, SMS는 저장 완료 콜백에서 예약하므로 핸들러 자체는 블로킹 I/O가 없음
+# → 스레드풀을 거치지 않고 이벤트 루프에서 바로 처리
+# (알림 상태 메모리는 정리 스레드/초기화 엔드포인트도 갱신하므로 _alert_memory_lock 안에서만 변경)
+@app.post("/alerts", status_code=202)
+async def post_alert(data: AlertData, response: Response):
     logger.info(f"[알람 수신] equipment={data.equipment}, sensor={data.sensor_type}, "
                 f"severity={data.severity}, value={data.value}, threshold={data.threshold}")
     
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    timestamp = data.timestamp or datetime.now().isoformat()
+    received_at = datetime.now()
+    timestamp = data.timestamp or received_at.isoformat()
     normalized_timestamp = normalize_timestamp(timestamp)
     
-    # 중복 체크
-    alert_dict = data.dict()
-    alert_dict['timestamp'] = normalized_timestamp
-    
-    is_duplicate, reason = check_duplicate_alert(alert_dict)
+    # 중복(쿨다운) 체크 (필드 값만 사용 - 필터링되는 알림에는 dict 변환 비용을 들이지 않음)
+    is_duplicate, reason = check_duplicate_alert(data.equipment, data.sensor_type, data.severity, data.value)
     if is_duplicate:
         logger.info(f"알림 스킵: {data.equipment}/{data.sensor_type} - {reason}")
-        conn.close()
+        response.status_code = 200
         return {"status": "filtered", "message": f"알림 필터링됨: {reason}", "timestamp": normalized_timestamp}
     
-    logger.info(f"[알람 저장] DB에 저장: {data.equipment}/{data.sensor_type} severity={data.severity}")
-    
-    c.execute('''INSERT INTO alerts (equipment, sensor_type, value, threshold, severity, timestamp, message) \
-        VALUES (?, ?, ?, ?, ?, ?, ?)''',
-        (data.equipment, data.sensor_type, data.value, data.threshold, data.severity, normalized_timestamp, data.message))
+    logger.info(f"[알람 저장] 저장 대기열에 추가: {data.equipment}/{data.sensor_type} severity={data.severity}")
     
-    # 저장된 알림의 ID 가져오기
-    alert_id = c.lastrowid
-    conn.commit()
-    conn.close()
+    # 쓰기 큐에 넣고 바로 202 응답 (alert-writer 스레드가 모아서 저장, 저장 실패는 /health의 writers에 집계)
+    # SMS 링크에 알림 ID가 필요한 error만 저장 완료 후 ID를 받을 Future 전달
+    alert_id_future = Future() if data.severity == "error" else None
+    alert_writer.put(((data.equipment, data.sensor_type, data.value, data.threshold, data.severity,
+                       normalized_timestamp, data.message), alert_id_future))
     
     # 메모리에 status 저장
-    alert_key = f"{data.equipment}_{data.sensor_type}_{normalized_timestamp}"
-    alert_status_memory[alert_key] = "미처리"
+    alert_key = (data.equipment, data.sensor_type, normalized_timestamp)
+    with _alert_memory_lock:
+        alert_status_memory[alert_key] = "미처리"
+        _alert_status_expiry.append((received_at + ALERT_STATUS_RETENTION, alert_key))
+        over_limit = len(alert_status_memory) > ALERT_STATUS_SOFT_LIMIT
+    if over_limit:
+        _cleanup_event.set()
     
     # error severity일 때만 SMS 알림 전송
     if data.severity == "error":
         logger.info(f"[SMS 알림] error severity 감지 - SMS 전송 시작")
-        # alert_dict에 id 추가
-        alert_dict['id'] = alert_id
-        background_tasks.add_task(send_sms_alert, alert_dict)
+        alert_dict = data.dict()
+        alert_dict['timestamp'] = normalized_timestamp
+        send_sms_alert_after_insert(alert_dict, alert_id_future)
     
-    return {"status": "ok", "message": "알림이 저장되었습니다.", "timestamp": normalized_timestamp}
+    return {"status": "queued", "message": "알림이 저장 대기열에 추가되었습니다.", "timestamp": normalized_timestamp}
 
 # 알림 상태 업데이트 (처리/미처리 등)
 @app.put("/alerts/{alert_id}/status")
 def update_alert_status(alert_id: int, status: str):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('UPDATE alerts SET status = ? WHERE id = ?', (status, alert_id))
-    if c.rowcount == 0:
-        conn.close()
-        raise HTTPException(status_code=404, detail="알림을 찾을 수 없습니다.")
-    conn.commit()
-    conn.close()
+    with get_write_db() as conn:
+        c = conn.cursor()
+        c.execute('UPDATE alerts SET status = ? WHERE id = ?', (status, alert_id))
+        if c.rowcount == 0:
+            raise HTTPException(status_code=404, detail="알림을 찾을 수 없습니다.")
+        conn.commit()
     return {"status": "ok", "message": f"알림 상태가 '{status}'로 업데이트되었습니다."}
 
 # 설비 상태 조회 (대시보드)
-@app.get("/equipment", response_model=List[EquipmentStatus])
+@app.get("/equipment")
 def get_equipment():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT id, name, status, efficiency, type, last_maintenance FROM equipment_status')
-    rows = c.fetchall()
-    conn.close()
-    return [EquipmentStatus(
-        id=row[0], name=row[1], status=row[2], efficiency=row[3], type=row[4], last_maintenance=row[5]
-    ) for row in rows]
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id, name, status, efficiency, type, last_maintenance FROM equipment_status')
+        rows = c.fetchall()
+    return [{
+        'id': row[0], 'name': row[1], 'status': row[2], 'efficiency': row[3], 'type': row[4], 'last_maintenance': row[5]
+    } for row in rows]
 
 # 설비 상태 업데이트 (시뮬레이터)
 @app.put("/equipment/{equipment_id}/status")
 def update_equipment_status(equipment_id: str, status: str = Query(...), efficiency: float = Query(...)):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # 먼저 설비가 존재하는지 확인
-    c.execute('SELECT id FROM equipment_status WHERE id = ?', (equipment_id,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail=f"설비를 찾을 수 없습니다: {equipment_id}")
-    
-    c.execute('UPDATE equipment_status SET status = ?, efficiency = ? WHERE id = ?', (status, efficiency, equipment_id))
-    conn.commit()
-    conn.close()
+    with get_write_db() as conn:
+        c = conn.cursor()
+        
+        # 존재 확인과 갱신을 한 문장으로 처리 (RETURNING 결과가 없으면 없는 설비)
+        c.execute('UPDATE equipment_status SET status = ?, efficiency = ? WHERE id = ? RETURNING id',
+                  (status, efficiency, equipment_id))
+        if c.fetchone() is None:
+            raise HTTPException(status_code=404, detail=f"설비를 찾을 수 없습니다: {equipment_id}")
+        conn.commit()
+    invalidate_cache("equipment_status")
     return {"status": "ok", "message": "설비 상태가 업데이트되었습니다."}
 
 # 대시보드용 센서 데이터 (시간별 집계)
 @app.get("/api/sensor_data")
 def get_sensor_data(equipment: Optional[str] = None, hours: int = 6):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    since = datetime.now() - timedelta(hours=hours)
-    if equipment:
-        c.execute('''SELECT sensor_type, value, timestamp FROM sensor_data \
-            WHERE equipment = ? AND timestamp >= ? ORDER BY timestamp''', (equipment, since.isoformat()))
-    else:
-        c.execute('''SELECT sensor_type, value, timestamp FROM sensor_data \
-            WHERE timestamp >= ? ORDER BY timestamp''', (since.isoformat(),))
-    rows = c.fetchall()
-    conn.close()
-    temperature = []
-    pressure = []
-    vibration = []
-    for row in rows:
-        if row[0] == 'temperature':
-            temperature.append({'timestamp': row[2], 'value': row[1]})
-        elif row[0] == 'pressure':
-            pressure.append({'timestamp': row[2], 'value': row[1]})
-        elif row[0] == 'vibration':
-            vibration.append({'timestamp': row[2], 'value': row[1]})
-    return {
-        'temperature': temperature,
-        'pressure': pressure,
-        'vibration': vibration
-    }
+    # 조회 시작 시각은 SQLite에서 저장 형식(로컬 시각 ISO-8601)과 동일하게 계산
+    since_modifier = f'-{hours} hours'
+    # 차트에는 분 단위 평균만 표시하므로 원본 샘플 대신 DB에서 분 단위로 집계해서 가져옴
+    # (ISO 타임스탬프 앞 16자 = 'YYYY-MM-DDTHH:MM'), 원본 보존 기간 이전 구간은 시간 단위 평균
+    with_hourly = hours > SENSOR_RAW_RETENTION_HOURS
+    filter_params = (equipment, *DASHBOARD_SENSOR_TYPES) if equipment else DASHBOARD_SENSOR_TYPES
+    params = ((*filter_params, since_modifier, f'-{SENSOR_RAW_RETENTION_HOURS} hours') if with_hourly else ()) \
+        + (*filter_params, since_modifier)
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(_SENSOR_CHART_QUERIES[(bool(equipment), with_hourly)], params)
+        # 센서 종류별로 정렬된 결과를 커서에서 바로 그룹 단위로 변환 (fetchall 사본 없음)
+        data = {sensor_type: [] for sensor_type in DASHBOARD_SENSOR_TYPES}
+        for sensor_type, group in groupby(c, key=itemgetter(0)):
+            data[sensor_type] = [{'timestamp': row[2], 'value': row[1]} for row in group]
+    return DefaultJSONResponse(data)
 
 # 대시보드용 설비 상태
 @app.get("/api/equipment_status")
-def get_equipment_status_api():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT id, name, status, efficiency, type, last_maintenance FROM equipment_status')
-    rows = c.fetchall()
-    conn.close()
+def get_equipment_status_api(request: Request):
+    return etag_response(request, "equipment_status",
+                         cached_response("equipment_status", _load_equipment_status))
+
+def _load_equipment_status() -> List[Dict]:
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id, name, status, efficiency, type, last_maintenance FROM equipment_status')
+        rows = c.fetchall()
     return [{
         'id': row[0],
         'name': row[1],
@@ -792,24 +1376,45 @@ def get_equipment_status_api():
 # 대시보드용 알림 데이터
 @app.get("/api/alerts")
 def get_alerts_api():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT equipment, sensor_type, value, threshold, severity, timestamp, message FROM alerts ORDER BY timestamp DESC LIMIT 20')
-    rows = c.fetchall()
-    conn.close()
-    result = []
-    for row in rows:
-        result.append({
-            'time': row[5],
-            'issue': row[6] or f"{row[0]} {row[1] or ''} 알림",
+    with get_db() as conn:
+        c = conn.cursor()
+        # 처리 상태는 update_alert_status가 갱신하는 alerts.status 컬럼에서 같이 조회
+        c.execute('SELECT equipment, sensor_type, severity, timestamp, message, status FROM alerts '
+                  'ORDER BY timestamp DESC LIMIT 20')
+        return [{
+            'time': row[3],
+            'issue': row[4] or f"{row[0]} {row[1] or ''} 알림",
             'equipment': row[0],
-            'severity': row[4]
-        })
-    return result
+            'severity': row[2],
+            'status': row[5]
+        } for row in c]
 
-# 대시보드용 품질 추세 (더미 데이터)
+# 대시보드용 품질 추세 (시뮬레이터가 저장한 집계 1행 조회, 없으면 기본값)
 @app.get("/api/quality_trend")
-def get_quality_trend():
+def get_quality_trend(request: Request):
+    return etag_response(request, "quality_trend",
+                         cached_response("quality_trend", _load_quality_trend))
+
+def _load_quality_trend() -> Dict:
+    with get_db() as conn:
+        c = conn.cursor()
+        try:
+            c.execute('''SELECT days, quality_rates, production_volume, defect_rates
+                        FROM quality_trend ORDER BY id DESC LIMIT 1''')
+            row = c.fetchone()
+        except Exception as e:
+            logger.error(f"품질 추세 조회 오류: {e}")
+            row = None
+    
+    if row:
+        return {
+            'days': json.loads(row[0]),
+            'quality_rates': json.loads(row[1]),
+            'production_volume': json.loads(row[2]),
+            'defect_rates': json.loads(row[3])
+        }
+    
+    # 기본값 반환
     days = ['월', '화', '수', '목', '금', '토', '일']
     quality_rates = [98.1, 97.8, 95.5, 99.1, 98.2, 92.3, 94.7]
     production_volume = [1200, 1350, 1180, 1420, 1247, 980, 650]
@@ -825,37 +1430,61 @@ def get_quality_trend():
 @app.post("/api/quality_trend")
 def post_quality_trend(data: dict):
     # DB에 품질 트렌드 데이터 저장
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    try:
-        # 기존 품질 트렌드 데이터 삭제
-        c.execute('DELETE FROM quality_trend')
-        
-        # 새로운 데이터 삽입 (JSON 형태로 저장)
-        import json
-        c.execute('''INSERT INTO quality_trend (days, quality_rates, defect_rates, production_volume, timestamp) 
-                    VALUES (?, ?, ?, ?, ?)''', 
-                 (json.dumps(data.get('days', [])),
-                  json.dumps(data.get('quality_rates', [])),
-                  json.dumps(data.get('defect_rates', [])),
-                  json.dumps(data.get('production_volume', [])),
-                  datetime.now().isoformat()))
-        
-        conn.commit()
-        return {"status": "ok", "message": "품질 추세 데이터가 업데이트되었습니다."}
-    except Exception as e:
-        conn.rollback()
-        return {"status": "error", "message": f"품질 추세 데이터 저장 실패: {str(e)}"}
-    finally:
-        conn.close()
+    with get_write_db() as conn:
+        c = conn.cursor()
+        try:
+            # 기존 품질 트렌드 데이터 삭제
+            c.execute('DELETE FROM quality_trend')
+            
+            # 새로운 데이터 삽입 (JSON 형태로 저장)
+            import json
+            c.execute('''INSERT INTO quality_trend (days, quality_rates, defect_rates, production_volume, timestamp) 
+                        VALUES (?, ?, ?, ?, ?)''', 
+                     (json.dumps(data.get('days', [])),
+                      json.dumps(data.get('quality_rates', [])),
+                      json.dumps(data.get('defect_rates', [])),
+                      json.dumps(data.get('production_volume', [])),
+                      datetime.now().isoformat()))
+            
+            conn.commit()
+            invalidate_cache("quality_trend")
+            return {"status": "ok", "message": "품질 추세 데이터가 업데이트되었습니다."}
+        except Exception as e:
+            conn.rollback()
+            return {"status": "error", "message": f"품질 추세 데이터 저장 실패: {str(e)}"}
 
 # 대시보드용 생산성 KPI (DB에서 읽기)
+PRODUCTION_KPI_DEFAULTS = {
+    'daily_target': 1300,
+    'daily_actual': 1247,
+    'weekly_target': 9100,
+    'weekly_actual': 8727,
+    'monthly_target': 39000,
+    'monthly_actual': 35420,
+    'oee': 87.3,
+    'availability': 94.2,
+    'performance': 92.8,
+    'quality': 97.6
+}
+
 @app.get("/api/production_kpi")
-def get_production_kpi():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    try:
-        # DB에서 KPI 데이터 읽기 (없으면 기본값 반환)
+def get_production_kpi(request: Request):
+    global _production_kpi_state
+    kpi = _production_kpi_state
+    if kpi is None:
+        # 기동 직후/초기화 이후 최초 1회만 DB에서 읽음
+        try:
+            kpi = _production_kpi_state = _load_production_kpi()
+        except Exception as e:
+            # 오류 시 기본값 반환 (캐시하지 않음 → 다음 조회에서 DB 다시 읽음)
+            logger.error(f"생산성 KPI 조회 오류: {e}")
+            kpi = dict(PRODUCTION_KPI_DEFAULTS)
+    return etag_response(request, "production_kpi", kpi)
+
+def _load_production_kpi() -> Dict:
+    """DB의 최신 KPI (없으면 기본값) - 조회 오류는 호출부로 전달"""
+    with get_db() as conn:
+        c = conn.cursor()
         c.execute('SELECT * FROM production_kpi ORDER BY timestamp DESC LIMIT 1')
         row = c.fetchone()
         
@@ -874,243 +1503,219 @@ def get_production_kpi():
             }
         else:
             # 기본값 반환
-            return {
-                'daily_target': 1300,
-                'daily_actual': 1247,
-                'weekly_target': 9100,
-                'weekly_actual': 8727,
-                'monthly_target': 39000,
-                'monthly_actual': 35420,
-                'oee': 87.3,
-                'availability': 94.2,
-                'performance': 92.8,
-                'quality': 97.6
-            }
-    except Exception as e:
-        # 오류 시 기본값 반환
-        return {
-            'daily_target': 1300,
-            'daily_actual': 1247,
-            'weekly_target': 9100,
-            'weekly_actual': 8727,
-            'monthly_target': 39000,
-            'monthly_actual': 35420,
-            'oee': 87.3,
-            'availability': 94.2,
-            'performance': 92.8,
-            'quality': 97.6
-        }
-    finally:
-        conn.close()
+            return dict(PRODUCTION_KPI_DEFAULTS)
 
 # 시뮬레이터용 생산성 KPI POST 엔드포인트
 @app.post("/api/production_kpi")
 def post_production_kpi(data: dict):
+    global _production_kpi_state
+    kpi = {key: data.get(key, default) for key, default in PRODUCTION_KPI_DEFAULTS.items()}
     # DB에 KPI 데이터 저장
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    try:
-        c.execute('''INSERT INTO production_kpi 
-                    (daily_target, daily_actual, weekly_target, weekly_actual, 
-                     monthly_target, monthly_actual, oee, availability, performance, quality, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                 (data.get('daily_target', 1300), data.get('daily_actual', 1247),
-                  data.get('weekly_target', 9100), data.get('weekly_actual', 8727),
-                  data.get('monthly_target', 39000), data.get('monthly_actual', 35420),
-                  data.get('oee', 87.3), data.get('availability', 94.2),
-                  data.get('performance', 92.8), data.get('quality', 97.6),
-                  datetime.now().isoformat()))
-        
-        conn.commit()
-        return {"status": "ok", "message": "생산성 KPI 데이터가 업데이트되었습니다."}
-    except Exception as e:
-        conn.rollback()
-        return {"status": "error", "message": f"KPI 데이터 저장 실패: {str(e)}"}
-    finally:
-        conn.close()
+    with get_write_db() as conn:
+        c = conn.cursor()
+        try:
+            c.execute('''INSERT INTO production_kpi 
+                        (daily_target, daily_actual, weekly_target, weekly_actual, 
+                         monthly_target, monthly_actual, oee, availability, performance, quality, timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                     (*kpi.values(), datetime.now().isoformat()))
+            
+            conn.commit()
+            _production_kpi_state = kpi
+            return {"status": "ok", "message": "생산성 KPI 데이터가 업데이트되었습니다."}
+        except Exception as e:
+            conn.rollback()
+            return {"status": "error", "message": f"KPI 데이터 저장 실패: {str(e)}"}
+
+def reset_memory_state():
+    """메모리 기반 데이터 초기화 - 객체를 새로 만들지 않고 제자리에서 비움 (다른 곳의 참조 유지)"""
+    global _production_kpi_state
+    invalidate_cache()
+    _production_kpi_state = None
+    clear_action_history()
+    alert_history.clear()
+    with _alert_memory_lock:
+        action_tokens.clear()
+        with _link_stats_lock:
+            link_stats.clear()
+            link_action_counts.clear()
+        alert_key_to_token.clear()
+        _action_token_expiry.clear()
+        alert_status_memory.clear()
+        _alert_status_expiry.clear()
 
 # 데이터베이스 초기화 (기존 데이터 삭제) - 수정됨
 @app.post("/clear_data")
 def clear_data():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    try:
-        # 모든 테이블 데이터 완전 삭제 (순서 중요)
-        c.execute('DELETE FROM alerts')  # 알림 먼저 삭제
-        logger.info(f"[API] 알림 데이터 삭제 완료")
-        c.execute('DELETE FROM sensor_data')  # 센서 데이터 삭제
-        logger.info(f"[API] 센서 데이터 삭제 완료")
-        c.execute('DELETE FROM quality_trend')
-        c.execute('DELETE FROM production_kpi')
-        
-        # 사용자 관리 관련 테이블 삭제
-        c.execute('DELETE FROM sms_history')  # SMS 이력 삭제
-        logger.info(f"[API] SMS 이력 삭제 완료")
-        c.execute('DELETE FROM alert_subscriptions')  # 알림 구독 설정 삭제
-        logger.info(f"[API] 알림 구독 설정 삭제 완료")
-        c.execute('DELETE FROM equipment_users')  # 설비별 사용자 할당 삭제
-        logger.info(f"[API] 설비별 사용자 할당 삭제 완료")
-        c.execute('DELETE FROM users')  # 사용자 삭제
-        logger.info(f"[API] 사용자 삭제 완료")
-        
-        # 설비 상태도 완전히 삭제 후 재생성
-        c.execute('DELETE FROM equipment_status')
-        
-        # 설비 상태 테이블 재생성 및 초기 데이터 삽입
-        c.execute('DROP TABLE IF EXISTS equipment_status')
-        c.execute('''CREATE TABLE equipment_status (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            status TEXT NOT NULL,
-            efficiency REAL NOT NULL,
-            type TEXT NOT NULL,
-            last_maintenance TEXT NOT NULL
-        )''')
-        
-        # 초기 설비 데이터 삽입 (시뮬레이터와 일치)
-        initial_equipment = [
-            ("press_001", "프레스기 #1", "정상", 95.0, "프레스", "2024-01-15"),
-            ("press_002", "프레스기 #2", "정상", 95.0, "프레스", "2024-01-10"),
-            ("press_003", "프레스기 #3", "정상", 95.0, "프레스", "2024-01-16"),
-            ("press_004", "프레스기 #4", "정상", 95.0, "프레스", "2024-01-17"),
-            ("weld_001", "용접기 #1", "정상", 95.0, "용접", "2024-01-12"),
-            ("weld_002", "용접기 #2", "정상", 95.0, "용접", "2024-01-13"),
-            ("weld_003", "용접기 #3", "정상", 95.0, "용접", "2024-01-11"),
-            ("weld_004", "용접기 #4", "정상", 95.0, "용접", "2024-01-14"),
-            ("assemble_001", "조립기 #1", "정상", 95.0, "조립", "2024-01-14"),
-            ("assemble_002", "조립기 #2", "정상", 95.0, "조립", "2024-01-17"),
-            ("assemble_003", "조립기 #3", "정상", 95.0, "조립", "2024-01-18"),
-            ("inspect_001", "검사기 #1", "정상", 95.0, "검사", "2024-01-05"),
-            ("inspect_002", "검사기 #2", "정상", 95.0, "검사", "2024-01-06"),
-            ("inspect_003", "검사기 #3", "정상", 95.0, "검사", "2024-01-07"),
-            ("pack_001", "포장기 #1", "정상", 95.0, "포장", "2024-01-19"),
-            ("pack_002", "포장기 #2", "정상", 95.0, "포장", "2024-01-20")
-        ]
-        c.executemany('''INSERT INTO equipment_status 
-            (id, name, status, efficiency, type, last_maintenance) VALUES (?, ?, ?, ?, ?, ?)''', initial_equipment)
-        logger.info(f"[API] 설비 데이터 삽입 완료: {len(initial_equipment)}개")
-        
-        # 테이블 재생성 (스키마 변경 대응)
-        c.execute('DROP TABLE IF EXISTS quality_trend')
-        c.execute('''CREATE TABLE quality_trend (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            days TEXT,
-            quality_rates TEXT,
-            defect_rates TEXT,
-            production_volume TEXT,
-            timestamp TEXT DEFAULT CURRENT_TIMESTAMP
-        )''')
-        
-        conn.commit()
-        
-        # 설비 개수 확인
-        c.execute('SELECT COUNT(*) FROM equipment_status')
-        equipment_count = c.fetchone()[0]
-        logger.info(f"[API] 최종 설비 개수 확인: {equipment_count}개")
-        
-        # 메모리 기반 데이터도 초기화
-        global action_history, alert_history, recent_raw_alerts, action_tokens, alert_status_memory
-        action_history = []
-        alert_history = {}
-        recent_raw_alerts = []
-        action_tokens = {}
-        alert_status_memory = {}
-        
-        return {"status": "ok", "message": "데이터베이스가 초기화되었습니다. 시뮬레이터를 시작하면 실제 데이터가 들어옵니다."}
-    except Exception as e:
-        conn.rollback()
-        raise HTTPException(status_code=500, detail=f"데이터베이스 초기화 실패: {str(e)}")
-    finally:
-        conn.close()
+    with get_write_db() as conn:
+        c = conn.cursor()
+        try:
+            # 모든 테이블 데이터 완전 삭제 (순서 중요)
+            alert_writer.discard_pending()
+            c.execute('DELETE FROM alerts')  # 알림 먼저 삭제
+            logger.info(f"[API] 알림 데이터 삭제 완료")
+            sensor_writer.discard_pending()
+            c.execute('DELETE FROM sensor_data')  # 센서 데이터 삭제
+            c.execute('DELETE FROM hourly_sensor_data')
+            logger.info(f"[API] 센서 데이터 삭제 완료")
+            c.execute('DELETE FROM quality_trend')
+            c.execute('DELETE FROM production_kpi')
+            
+            # 사용자 관리 관련 테이블 삭제
+            c.execute('DELETE FROM sms_history')  # SMS 이력 삭제
+            logger.info(f"[API] SMS 이력 삭제 완료")
+            c.execute('DELETE FROM alert_subscriptions')  # 알림 구독 설정 삭제
+            logger.info(f"[API] 알림 구독 설정 삭제 완료")
+            c.execute('DELETE FROM equipment_users')  # 설비별 사용자 할당 삭제
+            logger.info(f"[API] 설비별 사용자 할당 삭제 완료")
+            c.execute('DELETE FROM users')  # 사용자 삭제
+            logger.info(f"[API] 사용자 삭제 완료")
+            
+            # 설비 상태 테이블 재생성 및 초기 데이터 삽입
+            c.execute('DROP TABLE IF EXISTS equipment_status')
+            c.execute('''CREATE TABLE equipment_status (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                efficiency REAL NOT NULL,
+                type TEXT NOT NULL,
+                last_maintenance TEXT NOT NULL
+            )''')
+            
+            # 초기 설비 데이터 삽입 (시뮬레이터와 일치)
+            initial_equipment = [
+                ("press_001", "프레스기 #1", "정상", 95.0, "프레스", "2024-01-15"),
+                ("press_002", "프레스기 #2", "정상", 95.0, "프레스", "2024-01-10"),
+                ("press_003", "프레스기 #3", "정상", 95.0, "프레스", "2024-01-16"),
+                ("press_004", "프레스기 #4", "정상", 95.0, "프레스", "2024-01-17"),
+                ("weld_001", "용접기 #1", "정상", 95.0, "용접", "2024-01-12"),
+                ("weld_002", "용접기 #2", "정상", 95.0, "용접", "2024-01-13"),
+                ("weld_003", "용접기 #3", "정상", 95.0, "용접", "2024-01-11"),
+                ("weld_004", "용접기 #4", "정상", 95.0, "용접", "2024-01-14"),
+                ("assemble_001", "조립기 #1", "정상", 95.0, "조립", "2024-01-14"),
+                ("assemble_002", "조립기 #2", "정상", 95.0, "조립", "2024-01-17"),
+                ("assemble_003", "조립기 #3", "정상", 95.0, "조립", "2024-01-18"),
+                ("inspect_001", "검사기 #1", "정상", 95.0, "검사", "2024-01-05"),
+                ("inspect_002", "검사기 #2", "정상", 95.0, "검사", "2024-01-06"),
+                ("inspect_003", "검사기 #3", "정상", 95.0, "검사", "2024-01-07"),
+                ("pack_001", "포장기 #1", "정상", 95.0, "포장", "2024-01-19"),
+                ("pack_002", "포장기 #2", "정상", 95.0, "포장", "2024-01-20")
+            ]
+            c.executemany('''INSERT INTO equipment_status 
+                (id, name, status, efficiency, type, last_maintenance) VALUES (?, ?, ?, ?, ?, ?)''', initial_equipment)
+            logger.info(f"[API] 설비 데이터 삽입 완료: {len(initial_equipment)}개")
+            
+            # 테이블 재생성 (스키마 변경 대응)
+            c.execute('DROP TABLE IF EXISTS quality_trend')
+            c.execute('''CREATE TABLE quality_trend (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                days TEXT,
+                quality_rates TEXT,
+                defect_rates TEXT,
+                production_volume TEXT,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            )''')
+            
+            conn.commit()
+            
+            # 설비 개수 확인
+            c.execute('SELECT COUNT(*) FROM equipment_status')
+            equipment_count = c.fetchone()[0]
+            logger.info(f"[API] 최종 설비 개수 확인: {equipment_count}개")
+            
+            # 메모리 기반 데이터도 초기화
+            reset_memory_state()
+            
+            return {"status": "ok", "message": "데이터베이스가 초기화되었습니다. 시뮬레이터를 시작하면 실제 데이터가 들어옵니다."}
+        except Exception as e:
+            conn.rollback()
+            raise HTTPException(status_code=500, detail=f"데이터베이스 초기화 실패: {str(e)}")
 
 @app.post("/clear_sensor_data")
 def clear_sensor_data():
     """센서 데이터와 알림만 삭제하고 사용자 데이터는 보존"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    try:
-        # 센서 데이터와 알림만 삭제 (사용자 데이터는 보존)
-        c.execute('DELETE FROM alerts')  # 알림 먼저 삭제
-        logger.info(f"[API] 알림 데이터 삭제 완료")
-        c.execute('DELETE FROM sensor_data')  # 센서 데이터 삭제
-        logger.info(f"[API] 센서 데이터 삭제 완료")
-        c.execute('DELETE FROM quality_trend')
-        c.execute('DELETE FROM production_kpi')
-        
-        # 설비 상태도 완전히 삭제 후 재생성
-        c.execute('DELETE FROM equipment_status')
-        
-        # 설비 상태 테이블 재생성 및 초기 데이터 삽입
-        c.execute('DROP TABLE IF EXISTS equipment_status')
-        c.execute('''CREATE TABLE equipment_status (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            status TEXT NOT NULL,
-            efficiency REAL NOT NULL,
-            type TEXT NOT NULL,
-            last_maintenance TEXT NOT NULL
-        )''')
-        
-        # 초기 설비 데이터 삽입 (시뮬레이터와 일치)
-        initial_equipment = [
-            ("press_001", "프레스기 #1", "정상", 95.0, "프레스", "2024-01-15"),
-            ("press_002", "프레스기 #2", "정상", 95.0, "프레스", "2024-01-10"),
-            ("press_003", "프레스기 #3", "정상", 95.0, "프레스", "2024-01-16"),
-            ("press_004", "프레스기 #4", "정상", 95.0, "프레스", "2024-01-17"),
-            ("weld_001", "용접기 #1", "정상", 95.0, "용접", "2024-01-12"),
-            ("weld_002", "용접기 #2", "정상", 95.0, "용접", "2024-01-13"),
-            ("weld_003", "용접기 #3", "정상", 95.0, "용접", "2024-01-11"),
-            ("weld_004", "용접기 #4", "정상", 95.0, "용접", "2024-01-14"),
-            ("assemble_001", "조립기 #1", "정상", 95.0, "조립", "2024-01-14"),
-            ("assemble_002", "조립기 #2", "정상", 95.0, "조립", "2024-01-17"),
-            ("assemble_003", "조립기 #3", "정상", 95.0, "조립", "2024-01-18"),
-            ("inspect_001", "검사기 #1", "정상", 95.0, "검사", "2024-01-05"),
-            ("inspect_002", "검사기 #2", "정상", 95.0, "검사", "2024-01-06"),
-            ("inspect_003", "검사기 #3", "정상", 95.0, "검사", "2024-01-07"),
-            ("pack_001", "포장기 #1", "정상", 95.0, "포장", "2024-01-19"),
-            ("pack_002", "포장기 #2", "정상", 95.0, "포장", "2024-01-20")
-        ]
-        c.executemany('''INSERT INTO equipment_status 
-            (id, name, status, efficiency, type, last_maintenance) VALUES (?, ?, ?, ?, ?, ?)''', initial_equipment)
-        logger.info(f"[API] 설비 데이터 삽입 완료: {len(initial_equipment)}개")
-        
-        # 테이블 재생성 (스키마 변경 대응)
-        c.execute('DROP TABLE IF EXISTS quality_trend')
-        c.execute('''CREATE TABLE quality_trend (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            days TEXT,
-            quality_rates TEXT,
-            defect_rates TEXT,
-            production_volume TEXT,
-            timestamp TEXT DEFAULT CURRENT_TIMESTAMP
-        )''')
-        
-        conn.commit()
-        
-        # 설비 개수 확인
-        c.execute('SELECT COUNT(*) FROM equipment_status')
-        equipment_count = c.fetchone()[0]
-        logger.info(f"[API] 최종 설비 개수 확인: {equipment_count}개")
-        
-        # 메모리 기반 데이터도 초기화
-        global action_history, alert_history, recent_raw_alerts, action_tokens, alert_status_memory
-        action_history = []
-        alert_history = {}
-        recent_raw_alerts = []
-        action_tokens = {}
-        alert_status_memory = {}
-        
-        return {"status": "ok", "message": "센서 데이터가 초기화되었습니다. 사용자 데이터는 보존됩니다."}
-    except Exception as e:
-        conn.rollback()
-        raise HTTPException(status_code=500, detail=f"센서 데이터 초기화 실패: {str(e)}")
-    finally:
-        conn.close()
+    with get_write_db() as conn:
+        c = conn.cursor()
+        try:
+            # 센서 데이터와 알림만 삭제 (사용자 데이터는 보존)
+            alert_writer.discard_pending()
+            c.execute('DELETE FROM alerts')  # 알림 먼저 삭제
+            logger.info(f"[API] 알림 데이터 삭제 완료")
+            sensor_writer.discard_pending()
+            c.execute('DELETE FROM sensor_data')  # 센서 데이터 삭제
+            c.execute('DELETE FROM hourly_sensor_data')
+            logger.info(f"[API] 센서 데이터 삭제 완료")
+            c.execute('DELETE FROM quality_trend')
+            c.execute('DELETE FROM production_kpi')
+            
+            # 설비 상태 테이블 재생성 및 초기 데이터 삽입
+            c.execute('DROP TABLE IF EXISTS equipment_status')
+            c.execute('''CREATE TABLE equipment_status (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                efficiency REAL NOT NULL,
+                type TEXT NOT NULL,
+                last_maintenance TEXT NOT NULL
+            )''')
+            
+            # 초기 설비 데이터 삽입 (시뮬레이터와 일치)
+            initial_equipment = [
+                ("press_001", "프레스기 #1", "정상", 95.0, "프레스", "2024-01-15"),
+                ("press_002", "프레스기 #2", "정상", 95.0, "프레스", "2024-01-10"),
+                ("press_003", "프레스기 #3", "정상", 95.0, "프레스", "2024-01-16"),
+                ("press_004", "프레스기 #4", "정상", 95.0, "프레스", "2024-01-17"),
+                ("weld_001", "용접기 #1", "정상", 95.0, "용접", "2024-01-12"),
+                ("weld_002", "용접기 #2", "정상", 95.0, "용접", "2024-01-13"),
+                ("weld_003", "용접기 #3", "정상", 95.0, "용접", "2024-01-11"),
+                ("weld_004", "용접기 #4", "정상", 95.0, "용접", "2024-01-14"),
+                ("assemble_001", "조립기 #1", "정상", 95.0, "조립", "2024-01-14"),
+                ("assemble_002", "조립기 #2", "정상", 95.0, "조립", "2024-01-17"),
+                ("assemble_003", "조립기 #3", "정상", 95.0, "조립", "2024-01-18"),
+                ("inspect_001", "검사기 #1", "정상", 95.0, "검사", "2024-01-05"),
+                ("inspect_002", "검사기 #2", "정상", 95.0, "검사", "2024-01-06"),
+                ("inspect_003", "검사기 #3", "정상", 95.0, "검사", "2024-01-07"),
+                ("pack_001", "포장기 #1", "정상", 95.0, "포장", "2024-01-19"),
+                ("pack_002", "포장기 #2", "정상", 95.0, "포장", "2024-01-20")
+            ]
+            c.executemany('''INSERT INTO equipment_status 
+                (id, name, status, efficiency, type, last_maintenance) VALUES (?, ?, ?, ?, ?, ?)''', initial_equipment)
+            logger.info(f"[API] 설비 데이터 삽입 완료: {len(initial_equipment)}개")
+            
+            # 테이블 재생성 (스키마 변경 대응)
+            c.execute('DROP TABLE IF EXISTS quality_trend')
+            c.execute('''CREATE TABLE quality_trend (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                days TEXT,
+                quality_rates TEXT,
+                defect_rates TEXT,
+                production_volume TEXT,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            )''')
+            
+            conn.commit()
+            
+            # 설비 개수 확인
+            c.execute('SELECT COUNT(*) FROM equipment_status')
+            equipment_count = c.fetchone()[0]
+            logger.info(f"[API] 최종 설비 개수 확인: {equipment_count}개")
+            
+            # 메모리 기반 데이터도 초기화
+            reset_memory_state()
+            
+            return {"status": "ok", "message": "센서 데이터가 초기화되었습니다. 사용자 데이터는 보존됩니다."}
+        except Exception as e:
+            conn.rollback()
+            raise HTTPException(status_code=500, detail=f"센서 데이터 초기화 실패: {str(e)}")
 
 # 헬스체크
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": now_iso_cached(),
+        "writers": {writer.name: writer.stats() for writer in (sensor_writer, alert_writer)}
+    }
 
 
 
@@ -1133,30 +1738,29 @@ def get_users():
 def create_user(user: UserCreate):
     """새 사용자 등록"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # 중복 번호 체크
-        cursor.execute("SELECT id FROM users WHERE phone_number = ?", (user.phone_number,))
-        if cursor.fetchone():
-            raise HTTPException(status_code=400, detail="이미 등록된 전화번호입니다.")
-        
-        # 사용자 등록
-        cursor.execute("""
-            INSERT INTO users (phone_number, name, department, role)
-            VALUES (?, ?, ?, ?)
-        """, (user.phone_number, user.name, user.department, user.role))
-        
-        user_id = cursor.lastrowid
-        
-        # 기본 알림 구독 설정 (error만)
-        cursor.execute("""
-            INSERT INTO alert_subscriptions (user_id, severity)
-            VALUES (?, 'error')
-        """, (user_id,))
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            # 중복 번호 체크
+            cursor.execute("SELECT id FROM users WHERE phone_number = ?", (user.phone_number,))
+            if cursor.fetchone():
+                raise HTTPException(status_code=400, detail="이미 등록된 전화번호입니다.")
+            
+            # 사용자 등록
+            cursor.execute("""
+                INSERT INTO users (phone_number, name, department, role)
+                VALUES (?, ?, ?, ?)
+            """, (user.phone_number, user.name, user.department, user.role))
+            
+            user_id = cursor.lastrowid
+            
+            # 기본 알림 구독 설정 (error만)
+            cursor.execute("""
+                INSERT INTO alert_subscriptions (user_id, severity)
+                VALUES (?, 'error')
+            """, (user_id,))
+            
+            conn.commit()
         
         return {"message": "사용자가 등록되었습니다.", "user_id": user_id}
         
@@ -1169,40 +1773,39 @@ def create_user(user: UserCreate):
 def update_user(user_id: int, user_update: UserUpdate):
     """사용자 정보 수정"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # 업데이트할 필드 구성
-        update_fields = []
-        params = []
-        
-        if user_update.name is not None:
-            update_fields.append("name = ?")
-            params.append(user_update.name)
-        if user_update.department is not None:
-            update_fields.append("department = ?")
-            params.append(user_update.department)
-        if user_update.role is not None:
-            update_fields.append("role = ?")
-            params.append(user_update.role)
-        if user_update.is_active is not None:
-            update_fields.append("is_active = ?")
-            params.append(user_update.is_active)
-        
-        if not update_fields:
-            raise HTTPException(status_code=400, detail="수정할 내용이 없습니다.")
-        
-        update_fields.append("updated_at = CURRENT_TIMESTAMP")
-        params.append(user_id)
-        
-        query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
-        cursor.execute(query, params)
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            # 업데이트할 필드 구성
+            update_fields = []
+            params = []
+            
+            if user_update.name is not None:
+                update_fields.append("name = ?")
+                params.append(user_update.name)
+            if user_update.department is not None:
+                update_fields.append("department = ?")
+                params.append(user_update.department)
+            if user_update.role is not None:
+                update_fields.append("role = ?")
+                params.append(user_update.role)
+            if user_update.is_active is not None:
+                update_fields.append("is_active = ?")
+                params.append(user_update.is_active)
+            
+            if not update_fields:
+                raise HTTPException(status_code=400, detail="수정할 내용이 없습니다.")
+            
+            update_fields.append("updated_at = CURRENT_TIMESTAMP")
+            params.append(user_id)
+            
+            query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
+            cursor.execute(query, params)
+            
+            if cursor.rowcount == 0:
+                raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+            
+            conn.commit()
         
         return {"message": "사용자 정보가 수정되었습니다."}
         
@@ -1215,16 +1818,15 @@ def update_user(user_id: int, user_update: UserUpdate):
 def delete_user(user_id: int):
     """사용자 삭제 (비활성화)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
+            
+            if cursor.rowcount == 0:
+                raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+            
+            conn.commit()
         
         return {"message": "사용자가 비활성화되었습니다."}
         
@@ -1241,28 +1843,27 @@ def delete_user(user_id: int):
 def get_user_subscriptions(user_id: int):
     """사용자의 알림 구독 설정 조회"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, equipment, sensor_type, severity, is_active, created_at
-            FROM alert_subscriptions
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-        """, (user_id,))
-        
-        subscriptions = []
-        for row in cursor.fetchall():
-            subscriptions.append({
-                'id': row[0],
-                'equipment': row[1],
-                'sensor_type': row[2],
-                'severity': row[3],
-                'is_active': bool(row[4]),
-                'created_at': row[5]
-            })
+        with get_db() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT id, equipment, sensor_type, severity, is_active, created_at
+                FROM alert_subscriptions
+                WHERE user_id = ?
+                ORDER BY created_at DESC
+            """, (user_id,))
+            
+            subscriptions = []
+            for row in cursor:
+                subscriptions.append({
+                    'id': row[0],
+                    'equipment': row[1],
+                    'sensor_type': row[2],
+                    'severity': row[3],
+                    'is_active': bool(row[4]),
+                    'created_at': row[5]
+                })
         
-        conn.close()
         return {"subscriptions": subscriptions}
         
     except Exception as e:
@@ -1272,23 +1873,22 @@ def get_user_subscriptions(user_id: int):
 def create_subscription(user_id: int, subscription: AlertSubscription):
     """알림 구독 설정 추가"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # 사용자 존재 확인
-        cursor.execute("SELECT id FROM users WHERE id = ? AND is_active = 1", (user_id,))
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-        
-        # 구독 설정 추가
-        cursor.execute("""
-            INSERT INTO alert_subscriptions (user_id, equipment, sensor_type, severity, is_active)
-            VALUES (?, ?, ?, ?, ?)
-        """, (user_id, subscription.equipment, subscription.sensor_type, 
-              subscription.severity, subscription.is_active))
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            # 사용자 존재 확인
+            cursor.execute("SELECT id FROM users WHERE id = ? AND is_active = 1", (user_id,))
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+            
+            # 구독 설정 추가
+            cursor.execute("""
+                INSERT INTO alert_subscriptions (user_id, equipment, sensor_type, severity, is_active)
+                VALUES (?, ?, ?, ?, ?)
+            """, (user_id, subscription.equipment, subscription.sensor_type, 
+                  subscription.severity, subscription.is_active))
+            
+            conn.commit()
         
         return {"message": "알림 구독이 설정되었습니다."}
         
@@ -1301,16 +1901,15 @@ def create_subscription(user_id: int, subscription: AlertSubscription):
 def delete_subscription(subscription_id: int):
     """알림 구독 설정 삭제"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM alert_subscriptions WHERE id = ?", (subscription_id,))
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="구독 설정을 찾을 수 없습니다.")
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("DELETE FROM alert_subscriptions WHERE id = ?", (subscription_id,))
+            
+            if cursor.rowcount == 0:
+                raise HTTPException(status_code=404, detail="구독 설정을 찾을 수 없습니다.")
+            
+            conn.commit()
         
         return {"message": "알림 구독이 삭제되었습니다."}
         
@@ -1327,29 +1926,28 @@ def delete_subscription(subscription_id: int):
 def get_sms_history(limit: int = 50):
     """SMS 전송 이력 조회"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT sh.id, u.name, sh.phone_number, sh.message, sh.status, sh.sent_at
-            FROM sms_history sh
-            JOIN users u ON sh.user_id = u.id
-            ORDER BY sh.sent_at DESC
-            LIMIT ?
-        """, (limit,))
-        
-        history = []
-        for row in cursor.fetchall():
-            history.append({
-                'id': row[0],
-                'user_name': row[1],
-                'phone_number': row[2],
-                'message': row[3],
-                'status': row[4],
-                'sent_at': row[5]
-            })
+        with get_db() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT sh.id, u.name, sh.phone_number, sh.message, sh.status, sh.sent_at
+                FROM sms_history sh
+                JOIN users u ON sh.user_id = u.id
+                ORDER BY sh.sent_at DESC
+                LIMIT ?
+            """, (limit,))
+            
+            history = []
+            for row in cursor:
+                history.append({
+                    'id': row[0],
+                    'user_name': row[1],
+                    'phone_number': row[2],
+                    'message': row[3],
+                    'status': row[4],
+                    'sent_at': row[5]
+                })
         
-        conn.close()
         return {"history": history, "count": len(history)}
         
     except Exception as e:
@@ -1364,11 +1962,10 @@ def get_equipment_users(equipment_id: str):
     """특정 설비에 할당된 사용자 목록 조회"""
     try:
         # 설비 존재 확인
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM equipment_status WHERE id = ?", (equipment_id,))
-        equipment = cursor.fetchone()
-        conn.close()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name FROM equipment_status WHERE id = ?", (equipment_id,))
+            equipment = cursor.fetchone()
         
         if not equipment:
             raise HTTPException(status_code=404, detail="설비를 찾을 수 없습니다.")
@@ -1390,38 +1987,37 @@ def get_equipment_users(equipment_id: str):
 def assign_user_to_equipment(equipment_id: str, assignment: EquipmentUserAssignment):
     """설비에 사용자 할당"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # 설비 존재 확인
-        cursor.execute("SELECT id FROM equipment_status WHERE id = ?", (equipment_id,))
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail="설비를 찾을 수 없습니다.")
-        
-        # 사용자 존재 확인
-        cursor.execute("SELECT id, name FROM users WHERE id = ? AND is_active = 1", (assignment.user_id,))
-        user = cursor.fetchone()
-        if not user:
-            raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-        
-        # 중복 할당 확인
-        cursor.execute("SELECT id FROM equipment_users WHERE equipment_id = ? AND user_id = ?", 
-                      (equipment_id, assignment.user_id))
-        if cursor.fetchone():
-            raise HTTPException(status_code=400, detail="이미 할당된 사용자입니다.")
-        
-        # 주담당자 설정 시 기존 주담당자 해제
-        if assignment.is_primary:
-            cursor.execute("UPDATE equipment_users SET is_primary = 0 WHERE equipment_id = ?", (equipment_id,))
-        
-        # 사용자 할당
-        cursor.execute("""
-            INSERT INTO equipment_users (equipment_id, user_id, role, is_primary)
-            VALUES (?, ?, ?, ?)
-        """, (equipment_id, assignment.user_id, assignment.role, assignment.is_primary))
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            # 설비 존재 확인
+            cursor.execute("SELECT id FROM equipment_status WHERE id = ?", (equipment_id,))
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail="설비를 찾을 수 없습니다.")
+            
+            # 사용자 존재 확인
+            cursor.execute("SELECT id, name FROM users WHERE id = ? AND is_active = 1", (assignment.user_id,))
+            user = cursor.fetchone()
+            if not user:
+                raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+            
+            # 중복 할당 확인
+            cursor.execute("SELECT id FROM equipment_users WHERE equipment_id = ? AND user_id = ?", 
+                          (equipment_id, assignment.user_id))
+            if cursor.fetchone():
+                raise HTTPException(status_code=400, detail="이미 할당된 사용자입니다.")
+            
+            # 주담당자 설정 시 기존 주담당자 해제
+            if assignment.is_primary:
+                cursor.execute("UPDATE equipment_users SET is_primary = 0 WHERE equipment_id = ?", (equipment_id,))
+            
+            # 사용자 할당
+            cursor.execute("""
+                INSERT INTO equipment_users (equipment_id, user_id, role, is_primary)
+                VALUES (?, ?, ?, ?)
+            """, (equipment_id, assignment.user_id, assignment.role, assignment.is_primary))
+            
+            conn.commit()
         
         logger.info(f"✅ 사용자 할당 완료: {user[1]} → {equipment_id}")
         return {"message": f"사용자 '{user[1]}'이(가) 설비에 할당되었습니다."}
@@ -1435,41 +2031,40 @@ def assign_user_to_equipment(equipment_id: str, assignment: EquipmentUserAssignm
 def update_equipment_user(equipment_id: str, user_id: int, update_data: EquipmentUserUpdate):
     """설비별 사용자 정보 수정"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # 할당 정보 존재 확인
-        cursor.execute("SELECT id FROM equipment_users WHERE equipment_id = ? AND user_id = ?", 
-                      (equipment_id, user_id))
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail="할당 정보를 찾을 수 없습니다.")
-        
-        # 업데이트할 필드 구성
-        update_fields = []
-        params = []
-        
-        if update_data.role is not None:
-            update_fields.append("role = ?")
-            params.append(update_data.role)
-        
-        if update_data.is_primary is not None:
-            if update_data.is_primary:
-                # 주담당자 설정 시 기존 주담당자 해제
-                cursor.execute("UPDATE equipment_users SET is_primary = 0 WHERE equipment_id = ?", (equipment_id,))
-            update_fields.append("is_primary = ?")
-            params.append(update_data.is_primary)
-        
-        if not update_fields:
-            raise HTTPException(status_code=400, detail="수정할 내용이 없습니다.")
-        
-        update_fields.append("updated_at = CURRENT_TIMESTAMP")
-        params.extend([equipment_id, user_id])
-        
-        query = f"UPDATE equipment_users SET {', '.join(update_fields)} WHERE equipment_id = ? AND user_id = ?"
-        cursor.execute(query, params)
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            # 할당 정보 존재 확인
+            cursor.execute("SELECT id FROM equipment_users WHERE equipment_id = ? AND user_id = ?", 
+                          (equipment_id, user_id))
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail="할당 정보를 찾을 수 없습니다.")
+            
+            # 업데이트할 필드 구성
+            update_fields = []
+            params = []
+            
+            if update_data.role is not None:
+                update_fields.append("role = ?")
+                params.append(update_data.role)
+            
+            if update_data.is_primary is not None:
+                if update_data.is_primary:
+                    # 주담당자 설정 시 기존 주담당자 해제
+                    cursor.execute("UPDATE equipment_users SET is_primary = 0 WHERE equipment_id = ?", (equipment_id,))
+                update_fields.append("is_primary = ?")
+                params.append(update_data.is_primary)
+            
+            if not update_fields:
+                raise HTTPException(status_code=400, detail="수정할 내용이 없습니다.")
+            
+            update_fields.append("updated_at = CURRENT_TIMESTAMP")
+            params.extend([equipment_id, user_id])
+            
+            query = f"UPDATE equipment_users SET {', '.join(update_fields)} WHERE equipment_id = ? AND user_id = ?"
+            cursor.execute(query, params)
+            
+            conn.commit()
         
         return {"message": "사용자 할당 정보가 수정되었습니다."}
         
@@ -1482,17 +2077,16 @@ def update_equipment_user(equipment_id: str, user_id: int, update_data: Equipmen
 def remove_user_from_equipment(equipment_id: str, user_id: int):
     """설비에서 사용자 할당 해제"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM equipment_users WHERE equipment_id = ? AND user_id = ?", 
-                      (equipment_id, user_id))
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="할당 정보를 찾을 수 없습니다.")
-        
-        conn.commit()
-        conn.close()
+        with get_write_db() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("DELETE FROM equipment_users WHERE equipment_id = ? AND user_id = ?", 
+                          (equipment_id, user_id))
+            
+            if cursor.rowcount == 0:
+                raise HTTPException(status_code=404, detail="할당 정보를 찾을 수 없습니다.")
+            
+            conn.commit()
         
         logger.info(f"✅ 사용자 할당 해제 완료: user_id {user_id} → {equipment_id}")
         return {"message": "사용자 할당이 해제되었습니다."}
@@ -1507,11 +2101,10 @@ def get_user_equipment(user_id: int):
     """특정 사용자가 담당하는 설비 목록 조회"""
     try:
         # 사용자 존재 확인
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM users WHERE id = ? AND is_active = 1", (user_id,))
-        user = cursor.fetchone()
-        conn.close()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name FROM users WHERE id = ? AND is_active = 1", (user_id,))
+            user = cursor.fetchone()
         
         if not user:
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
@@ -1533,37 +2126,35 @@ def get_user_equipment(user_id: int):
 def get_equipment_users_summary():
     """설비별 사용자 할당 요약 정보"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # 설비별 사용자 수 통계
-        cursor.execute("""
-            SELECT es.id, es.name, es.type, COUNT(eu.user_id) as user_count,
-                   SUM(CASE WHEN eu.is_primary = 1 THEN 1 ELSE 0 END) as primary_count
-            FROM equipment_status es
-            LEFT JOIN equipment_users eu ON es.id = eu.equipment_id
-            GROUP BY es.id, es.name, es.type
-            ORDER BY es.name
-        """)
-        
-        summary = []
-        for row in cursor.fetchall():
-            summary.append({
-                'equipment_id': row[0],
-                'equipment_name': row[1],
-                'equipment_type': row[2],
-                'user_count': row[3],
-                'primary_user_count': row[4]
-            })
-        
-        # 전체 통계
-        cursor.execute("SELECT COUNT(*) FROM equipment_users")
-        total_assignments = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM equipment_users WHERE is_primary = 1")
-        total_primary = cursor.fetchone()[0]
-        
-        conn.close()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            
+            # 설비별 사용자 수 통계
+            cursor.execute("""
+                SELECT es.id, es.name, es.type, COUNT(eu.user_id) as user_count,
+                       SUM(CASE WHEN eu.is_primary = 1 THEN 1 ELSE 0 END) as primary_count
+                FROM equipment_status es
+                LEFT JOIN equipment_users eu ON es.id = eu.equipment_id
+                GROUP BY es.id, es.name, es.type
+                ORDER BY es.name
+            """)
+            
+            summary = []
+            for row in cursor:
+                summary.append({
+                    'equipment_id': row[0],
+                    'equipment_name': row[1],
+                    'equipment_type': row[2],
+                    'user_count': row[3],
+                    'primary_user_count': row[4]
+                })
+            
+            # 전체 통계 (한 번의 스캔으로 두 값 집계)
+            cursor.execute("""
+                SELECT COUNT(*), COALESCE(SUM(CASE WHEN is_primary = 1 THEN 1 ELSE 0 END), 0)
+                FROM equipment_users
+            """)
+            total_assignments, total_primary = cursor.fetchone()
         
         return {
             "summary": summary,
@@ -1575,14 +2166,27 @@ def get_equipment_users_summary():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"요약 정보 조회 오류: {e}")
 
-# 웹 링크 처리 엔드포인트들 추가
-@app.get("/action/{token}", response_class=HTMLResponse)
-async def show_action_page(token: str):
-    """처리 페이지 표시"""
-    
-    token_data = action_tokens.get(token)
-    if not token_data:
-        return HTMLResponse("""
+# 웹 링크 조치 처리
+def _apply_interlock(alert: dict) -> bool:
+    """인터락: 설비 정지 상태로 변경 (이미 정지 상태면 쓰기 없이 False)"""
+    with get_write_db() as conn:
+        c = conn.cursor()
+        c.execute("UPDATE equipment_status SET status = ?, efficiency = ? WHERE id = ? AND status != ?", 
+                 ("정지", 0.0, alert['equipment'], "정지"))
+        if c.rowcount == 0:
+            return False
+        conn.commit()
+    invalidate_cache("equipment_status")
+    return True
+
+# 조치별 (부가 작업, 조치명, 결과 이모지, 결과 문구)
+WEB_LINK_ACTIONS = {
+    "interlock": (_apply_interlock, "인터락", "🔴", "설비가 정지되었습니다"),
+    "bypass": (None, "바이패스", "🟢", "설비가 계속 운전됩니다"),
+}
+
+# 웹 링크 처리 페이지 HTML (모듈 로드 시 한 번만 구성, 요청마다 문자열을 새로 만들지 않음)
+_ACTION_INVALID_HTML = """
         <html>
         <head>
             <meta charset="utf-8">
@@ -1594,11 +2198,9 @@ async def show_action_page(token: str):
             <p>링크가 만료되었거나 잘못된 접근입니다.</p>
         </body>
         </html>
-        """)
-    
-    if datetime.now() > token_data["expires_at"]:
-        del action_tokens[token]
-        return HTMLResponse("""
+        """
+
+_ACTION_EXPIRED_HTML = """
         <html>
         <head>
             <meta charset="utf-8">
@@ -1610,10 +2212,9 @@ async def show_action_page(token: str):
             <p>24시간이 경과하여 처리할 수 없습니다.</p>
         </body>
         </html>
-        """)
-    
-    if token_data["processed"]:
-        return HTMLResponse("""
+        """
+
+_ACTION_ALREADY_PROCESSED_HTML = """
         <html>
         <head>
             <meta charset="utf-8">
@@ -1625,62 +2226,67 @@ async def show_action_page(token: str):
             <p>이 알림은 이미 처리 완료되었습니다.</p>
         </body>
         </html>
-        """)
-    
-    alert = token_data["alert_data"]
-    sensor_map = {
-        'temperature': '온도',
-        'pressure': '압력',
-        'vibration': '진동',
-        'power': '전력'
-    }
-    sensor_ko = sensor_map.get(alert['sensor_type'], alert['sensor_type'])
-    
-    html_content = f"""
+        """
+
+_ACTION_PROCESS_ERROR_HTML = """
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1">
+            <title>처리 오류</title>
+        </head>
+        <body style="font-family: Arial; padding: 20px; text-align: center;">
+            <h2>❌ 처리할 수 없습니다</h2>
+            <p>유효하지 않거나 이미 처리된 요청입니다.</p>
+        </body>
+        </html>
+        """
+
+_ACTION_PAGE_TEMPLATE = string.Template("""
     <html>
     <head>
         <meta charset="utf-8">
         <meta name="viewport" content="width=device-width, initial-scale=1">
         <title>알림 처리</title>
         <style>
-            body {{
+            body {
                 font-family: Arial, sans-serif;
                 padding: 20px;
                 max-width: 400px;
                 margin: 0 auto;
                 background-color: #f5f5f5;
-            }}
-            .container {{
+            }
+            .container {
                 background: white;
                 padding: 20px;
                 border-radius: 10px;
                 box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            }}
-            h2 {{
+            }
+            h2 {
                 color: #333;
                 margin-bottom: 20px;
-            }}
-            .alert-info {{
+            }
+            .alert-info {
                 background: #f0f0f0;
                 padding: 15px;
                 border-radius: 5px;
                 margin-bottom: 20px;
-            }}
-            .info-row {{
+            }
+            .info-row {
                 margin: 5px 0;
-            }}
-            .label {{
+            }
+            .label {
                 font-weight: bold;
                 color: #666;
-            }}
-            .value {{
+            }
+            .value {
                 color: #333;
-            }}
-            .severity-error {{
+            }
+            .severity-error {
                 color: #d32f2f;
                 font-weight: bold;
-            }}
-            .btn {{
+            }
+            .btn {
                 display: block;
                 width: 100%;
                 padding: 15px;
@@ -1692,18 +2298,18 @@ async def show_action_page(token: str):
                 border-radius: 5px;
                 cursor: pointer;
                 border: none;
-            }}
-            .btn-interlock {{
+            }
+            .btn-interlock {
                 background: #d32f2f;
                 color: white;
-            }}
-            .btn-bypass {{
+            }
+            .btn-bypass {
                 background: #10b981;
                 color: white;
-            }}
-            .btn:hover {{
+            }
+            .btn:hover {
                 opacity: 0.9;
-            }}
+            }
         </style>
     </head>
     <body>
@@ -1713,209 +2319,266 @@ async def show_action_page(token: str):
             <div class="alert-info">
                 <div class="info-row">
                     <span class="label">설비:</span>
-                    <span class="value">{alert['equipment']}</span>
+                    <span class="value">$equipment</span>
                 </div>
                 <div class="info-row">
                     <span class="label">센서:</span>
-                    <span class="value">{sensor_ko}</span>
+                    <span class="value">$sensor_ko</span>
                 </div>
                 <div class="info-row">
                     <span class="label">측정값:</span>
-                    <span class="value">{alert['value']:.1f}</span>
+                    <span class="value">$value</span>
                 </div>
                 <div class="info-row">
                     <span class="label">임계값:</span>
-                    <span class="value">{alert['threshold']:.1f}</span>
+                    <span class="value">$threshold</span>
                 </div>
                 <div class="info-row">
                     <span class="label">심각도:</span>
-                    <span class="value severity-{alert['severity']}">{alert['severity'].upper()}</span>
+                    <span class="value severity-$severity">$severity_label</span>
                 </div>
             </div>
             
             <div class="actions">
                 <h3>처리 방법을 선택하세요:</h3>
-                <a href="/action/{token}/process?action=interlock" class="btn btn-interlock">
+                <a href="/action/$token/process?action=interlock" class="btn btn-interlock">
                     1. 인터락 (설비 정지)
                 </a>
-                <a href="/action/{token}/process?action=bypass" class="btn btn-bypass">
+                <a href="/action/$token/process?action=bypass" class="btn btn-bypass">
                     2. 바이패스 (계속 운전)
                 </a>
             </div>
         </div>
     </body>
     </html>
-    """
-    
-    return HTMLResponse(html_content)
+    """)
 
-@app.get("/action/{token}/process")
-async def process_action(token: str, action: str):
-    """실제 처리 실행"""
-    
-    token_data = action_tokens.get(token)
-    if not token_data or token_data["processed"]:
-        return HTMLResponse("""
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <title>처리 오류</title>
-        </head>
-        <body style="font-family: Arial; padding: 20px; text-align: center;">
-            <h2>❌ 처리할 수 없습니다</h2>
-            <p>유효하지 않거나 이미 처리된 요청입니다.</p>
-        </body>
-        </html>
-        """)
-    
-    alert = token_data["alert_data"]
-    
-    if action == "interlock":
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute('UPDATE equipment_status SET status = ?, efficiency = ? WHERE id = ?', 
-                 ("정지", 0.0, alert['equipment']))
-        conn.commit()
-        conn.close()
-        
-        action_type = "interlock"
-        action_text = "인터락"
-        result_emoji = "🔴"
-        result_text = "설비가 정지되었습니다"
-    elif action == "bypass":
-        action_type = "bypass"
-        action_text = "바이패스"
-        result_emoji = "🟢"
-        result_text = "설비가 계속 운전됩니다"
-    else:
-        return HTMLResponse("잘못된 액션입니다")
-    
-    # 조치 이력 저장
-    action_record = {
-        "action_id": f"action_{len(action_history) + 1}",
-        "alert_id": f"{alert['equipment']}_{alert['sensor_type']}_{alert['timestamp']}",
-        "equipment": alert['equipment'],
-        "sensor_type": alert['sensor_type'],
-        "action_type": action_type,
-        "action_time": datetime.now().isoformat(),
-        "assigned_to": "web_link",
-        "value": alert['value'],
-        "threshold": alert['threshold'],
-        "severity": alert['severity'],
-        "status": "completed",
-        "message": f"웹 링크로 {action_text} 처리됨"
-    }
-    action_history.append(action_record)
-    
-    token_data["processed"] = True
-    token_data["processed_at"] = datetime.now()
-    token_data["action"] = action_type
-    
-    logger.info(f"✅ 웹 링크 처리 완료: {alert['equipment']} → {action_text}")
-    
-    html_content = f"""
+_ACTION_RESULT_TEMPLATE = string.Template("""
     <html>
     <head>
         <meta charset="utf-8">
         <meta name="viewport" content="width=device-width, initial-scale=1">
         <title>처리 완료</title>
         <style>
-            body {{
+            body {
                 font-family: Arial, sans-serif;
                 padding: 20px;
                 max-width: 400px;
                 margin: 0 auto;
                 background-color: #f5f5f5;
-            }}
-            .container {{
+            }
+            .container {
                 background: white;
                 padding: 30px;
                 border-radius: 10px;
                 box-shadow: 0 2px 10px rgba(0,0,0,0.1);
                 text-align: center;
-            }}
-            .result-emoji {{
+            }
+            .result-emoji {
                 font-size: 60px;
                 margin-bottom: 20px;
-            }}
-            h2 {{
+            }
+            h2 {
                 color: #333;
                 margin-bottom: 10px;
-            }}
-            .result-text {{
+            }
+            .result-text {
                 color: #666;
                 font-size: 18px;
                 margin-bottom: 30px;
-            }}
+            }
         </style>
     </head>
     <body>
         <div class="container">
-            <div class="result-emoji">{result_emoji}</div>
+            <div class="result-emoji">$result_emoji</div>
             <h2>처리 완료</h2>
-            <p class="result-text">{result_text}</p>
+            <p class="result-text">$result_text</p>
             <p style="color: #666;">이 창은 닫으셔도 됩니다.</p>
         </div>
     </body>
     </html>
-    """
+    """)
+
+# 처리 결과 페이지는 액션별로 내용이 고정이므로 미리 렌더링
+_ACTION_RESULT_PAGES = {
+    action: _ACTION_RESULT_TEMPLATE.substitute(result_emoji=result_emoji, result_text=result_text)
+    for action, (_, _, result_emoji, result_text) in WEB_LINK_ACTIONS.items()
+}
+
+# 웹 링크 처리 엔드포인트들 추가
+@app.get("/action/{token}", response_class=HTMLResponse)
+async def show_action_page(token: str):
+    """처리 페이지 표시"""
+    
+    token_data = action_tokens.get(token)
+    if not token_data:
+        return HTMLResponse(_ACTION_INVALID_HTML)
+    
+    if datetime.now() > token_data["expires_at"]:
+        with _alert_memory_lock:
+            discard_action_token(token)
+        return HTMLResponse(_ACTION_EXPIRED_HTML)
+    
+    if token_data["processed"]:
+        return HTMLResponse(_ACTION_ALREADY_PROCESSED_HTML)
+    
+    alert = token_data["alert_data"]
+    
+    html_content = _ACTION_PAGE_TEMPLATE.substitute(
+        equipment=alert['equipment'],
+        sensor_ko=token_data["sensor_ko"],
+        value=f"{alert['value']:.1f}",
+        threshold=f"{alert['threshold']:.1f}",
+        severity=alert['severity'],
+        severity_label=alert['severity'].upper(),
+        token=token
+    )
     
     return HTMLResponse(html_content)
 
+@app.get("/action/{token}/process")
+def process_action(token: str, action: str):
+    """실제 처리 실행 (DB 작업이 있으므로 스레드풀에서 실행)"""
+    
+    web_action = WEB_LINK_ACTIONS.get(action)
+    if web_action is None:
+        return HTMLResponse("잘못된 액션입니다")
+    
+    apply_action, action_text, result_emoji, result_text = web_action
+    action_type = action
+    
+    # 토큰 선점: 처리 여부 확인과 처리 표시를 잠금 안에서 한 번에
+    # (중복 클릭/동시 요청 중 하나만 이력 저장·통계 반영, 처리 시각은 한 번만 구해서 이력/토큰에 같이 사용)
+    processed_at = datetime.now()
+    with _alert_memory_lock:
+        token_data = action_tokens.get(token)
+        if not token_data or token_data["processed"]:
+            return HTMLResponse(_ACTION_PROCESS_ERROR_HTML)
+        token_data["processed"] = True
+        token_data["processed_at"] = processed_at
+        token_data["action"] = action_type
+        with _link_stats_lock:
+            link_stats["active"] -= 1
+            link_stats["processed"] += 1
+            link_action_counts[action_type] += 1
+    
+    alert = token_data["alert_data"]
+    try:
+        if apply_action and not apply_action(alert):
+            logger.info(f"ℹ️ 웹 링크 처리: {alert['equipment']} 이미 {action_text} 적용 상태 - DB 변경 없음")
+    except Exception:
+        # 조치 실패 시 선점 취소 (같은 링크로 다시 처리할 수 있도록)
+        with _alert_memory_lock:
+            token_data["processed"] = False
+            token_data.pop("processed_at", None)
+            token_data.pop("action", None)
+            with _link_stats_lock:
+                link_stats["active"] += 1
+                link_stats["processed"] -= 1
+                link_action_counts[action_type] -= 1
+        raise
+    
+    # 조치 이력 저장
+    action_record = {
+        "action_id": f"action_{next(_action_seq)}",
+        "alert_id": f"{alert['equipment']}_{alert['sensor_type']}_{alert['timestamp']}",
+        "equipment": alert['equipment'],
+        "sensor_type": alert['sensor_type'],
+        "action_type": action_type,
+        "action_time": processed_at.isoformat(),
+        "assigned_to": "web_link",
+        "value": alert['value'],
+        "threshold": alert['threshold'],
+        "severity": alert['severity'],
+        "status": "completed",
+        "message": f"웹 링크로 {action_text} 처리됨"
+    }
+    record_action(action_record)
+    
+    logger.info(f"✅ 웹 링크 처리 완료: {alert['equipment']} → {action_text}")
+    
+    return HTMLResponse(_ACTION_RESULT_PAGES[action])
+
 # 조치 이력 관련 엔드포인트들
+def _action_method(action: dict) -> Optional[str]:
+    assigned_to = action.get('assigned_to', '')
+    if assigned_to.startswith('sms_'):
+        return 'sms'
+    if assigned_to == 'web_link':
+        return 'web_link'
+    return None
+
+def _count_action(action: dict, delta: int):
+    action_type_counts[action['action_type']] += delta
+    equipment_action_counts[(action['equipment'], action['action_type'])] += delta
+    method = _action_method(action)
+    if method:
+        action_method_counts[method] += delta
+
+def record_action(action: dict):
+    """조치 이력 추가 + 통계 카운터 갱신 (maxlen 초과로 밀려나는 이력은 통계에서 제외)"""
+    with _action_stats_lock:
+        if len(action_history) == action_history.maxlen:
+            evicted = action_history[0]
+            _count_action(evicted, -1)
+            # 시간순으로 추가되므로 밀려나는 이력은 항상 해당 설비 이력의 가장 오래된 항목
+            equipment_history = action_history_by_equipment[evicted['equipment']]
+            equipment_history.popleft()
+            if not equipment_history:
+                del action_history_by_equipment[evicted['equipment']]
+        action_history.append(action)
+        action_history_by_equipment[action['equipment']].append(action)
+        _count_action(action, 1)
+
+def clear_action_history():
+    """조치 이력과 통계 카운터 초기화"""
+    with _action_stats_lock:
+        action_history.clear()
+        action_history_by_equipment.clear()
+        action_type_counts.clear()
+        equipment_action_counts.clear()
+        action_method_counts.clear()
+
 @app.get("/action_history")
-def get_action_history(limit: int = 20):
-    """인터락/바이패스 조치 이력 조회"""
-    sorted_history = sorted(action_history, key=lambda x: x['action_time'], reverse=True)
-    return sorted_history[:limit]
+def get_action_history(limit: int = 20, equipment: Optional[str] = None):
+    """인터락/바이패스 조치 이력 조회 (equipment 지정 시 해당 설비만)"""
+    # 이력은 시간순으로만 추가되므로 최신순 = 역순 (정렬 불필요)
+    with _action_stats_lock:
+        history = action_history_by_equipment.get(equipment, ()) if equipment else action_history
+        return list(islice(reversed(history), max(limit, 0)))
 
 @app.get("/action_stats")
 def get_action_stats():
     """조치 통계"""
-    interlock_count = sum(1 for a in action_history if a['action_type'] == 'interlock')
-    bypass_count = sum(1 for a in action_history if a['action_type'] == 'bypass')
-    
-    equipment_stats = {}
-    for action in action_history:
-        eq = action['equipment']
-        if eq not in equipment_stats:
-            equipment_stats[eq] = {'interlock': 0, 'bypass': 0}
-        equipment_stats[eq][action['action_type']] += 1
-    
-    method_stats = {'sms': 0, 'web_link': 0}
-    for action in action_history:
-        if action.get('assigned_to', '').startswith('sms_'):
-            method_stats['sms'] += 1
-        elif action.get('assigned_to') == 'web_link':
-            method_stats['web_link'] += 1
-    
-    return {
-        "total_actions": len(action_history),
-        "interlock_count": interlock_count,
-        "bypass_count": bypass_count,
-        "equipment_stats": equipment_stats,
-        "method_stats": method_stats,
-        "last_action": action_history[-1] if action_history else None
-    }
+    with _action_stats_lock:
+        equipment_stats = {}
+        for (eq, action_type), n in equipment_action_counts.items():
+            if n:
+                equipment_stats.setdefault(eq, {'interlock': 0, 'bypass': 0})[action_type] = n
+        return {
+            "total_actions": len(action_history),
+            "interlock_count": action_type_counts['interlock'],
+            "bypass_count": action_type_counts['bypass'],
+            "equipment_stats": equipment_stats,
+            "method_stats": {'sms': action_method_counts['sms'], 'web_link': action_method_counts['web_link']},
+            "last_action": action_history[-1] if action_history else None
+        }
 
 @app.get("/link_stats")
 def get_link_stats():
     """웹 링크 처리 통계"""
-    active_links = sum(1 for t in action_tokens.values() if not t["processed"])
-    processed_links = sum(1 for t in action_tokens.values() if t["processed"])
-    
-    action_stats = {"interlock": 0, "bypass": 0}
-    for token_data in action_tokens.values():
-        if token_data.get("processed") and token_data.get("action"):
-            action_stats[token_data["action"]] = action_stats.get(token_data["action"], 0) + 1
+    with _link_stats_lock:
+        active_links = link_stats["active"]
+        processed_links = link_stats["processed"]
+        action_stats = {action: link_action_counts[action] for action in WEB_LINK_ACTIONS}
     
     return {
         "total_links": len(action_tokens),
         "active_links": active_links,
         "processed_links": processed_links,
         "action_stats": action_stats,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now_iso_cached()
     }
 
 # 모듈로 사용할 때만 실행
@@ -54,6 +54,23 @@ else:
     logger.info(f"  - 발신번호: {COOLSMS_SENDER}")
     logger.info(f"  - 관리자 수: {len(ADMIN_PHONE_NUMBERS)}")
 
+# SMS 표기용 매핑 (메시지마다 새로 만들지 않도록 모듈 상수로 유지)
+SENSOR_SHORT = {
+    'temperature': '온도',
+    'pressure': '압력',
+    'vibration': '진동',
+    'power': '전력'
+}
+SEVERITY_CODE = {
+    'error': 'HH',
+    'warning': 'H',
+    'info': 'L'
+}
+ACTION_KO = {
+    'interlock': '인터락',
+    'bypass': '바이패스'
+}
+
 @dataclass
 class Alert:
     """알림 데이터 클래스"""
@@ -175,18 +192,8 @@ class CoolSMSService:
         equipment = alert.equipment
         current_time = datetime.now().strftime('%H:%M:%S')
         
-        sensor_short = {
-            'temperature': '온도',
-            'pressure': '압력',
-            'vibration': '진동',
-            'power': '전력'
-        }.get(alert.sensor_type, alert.sensor_type[:2])
-        
-        severity_code = {
-            'error': 'HH',
-            'warning': 'H',
-            'info': 'L'
-        }.get(alert.severity, 'HH')
+        sensor_short = SENSOR_SHORT.get(alert.sensor_type) or alert.sensor_type[:2]
+        severity_code = SEVERITY_CODE.get(alert.severity, 'HH')
         
         # TinyURL로 URL 단축
         try:
@@ -258,9 +265,27 @@ class FastAPIMonitor:
         self.fastapi_url = fastapi_url
         self.running = False
         self.processed_alerts = set()
+        # 알림 timestamp 문자열 → datetime 파싱 결과 (폴링마다 같은 알림이 반복 수신되므로 재사용)
+        self.alert_time_cache: Dict[str, Optional[datetime]] = {}
         self.start_time = datetime.now()
         logger.info(f"🕐 모니터링 시작 시간: {self.start_time.strftime('%H:%M:%S')}")
         
+    def parse_alert_time(self, timestamp: str) -> Optional[datetime]:
+        """알림 timestamp 파싱 (캐시 사용, 실패 시 None)"""
+        if timestamp in self.alert_time_cache:
+            return self.alert_time_cache[timestamp]
+        try:
+            alert_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            if alert_time.tzinfo is not None:
+                # 비교 기준(start_time)이 로컬 naive 시각이므로 맞춰서 변환
+                alert_time = alert_time.astimezone().replace(tzinfo=None)
+        except (AttributeError, ValueError):
+            alert_time = None
+        if len(self.alert_time_cache) > 1000:
+            self.alert_time_cache.clear()
+        self.alert_time_cache[timestamp] = alert_time
+        return alert_time
+        
     async def monitor_alerts(self):
         """알림 모니터링"""
         logger.info("📡 알림 모니터링 시작...")
@@ -282,39 +307,25 @@ class FastAPIMonitor:
                 if response.status_code == 200:
                     api_alerts = response.json()
                     
+                    # 봇 시작 시간 이후 + 5초 이내의 알림만 처리 (빠른 대응) - 기준 시각은 폴링당 한 번 계산
+                    cutoff = max(self.start_time, datetime.now() - timedelta(seconds=5))
+                    alert_times = [self.parse_alert_time(api_alert.get('timestamp', '')) for api_alert in api_alerts]
+                    
                     # 새 알림이 있을 때만 로그 출력
                     if api_alerts:
                         # 5초 이내의 알림만 카운트
-                        recent_alerts = []
-                        for api_alert in api_alerts:
-                            try:
-                                alert_time = datetime.fromisoformat(api_alert.get('timestamp', '').replace('Z', '+00:00'))
-                                if alert_time >= self.start_time and alert_time >= datetime.now() - timedelta(seconds=5):
-                                    recent_alerts.append(api_alert)
-                            except:
-                                pass
+                        recent_alerts = [t for t in alert_times if t is not None and t >= cutoff]
                         
                         if recent_alerts:
                             logger.info(f"[API 응답] 최근 알림 {len(recent_alerts)}개 발견")
                         else:
                             pass  # 총 {len(api_alerts)}개 알람 수신 (모두 이전 알림)
                     
-                    for api_alert in api_alerts:
-                        alert_time_str = api_alert.get('timestamp', '')
-                        try:
-                            alert_time = datetime.fromisoformat(alert_time_str.replace('Z', '+00:00'))
-                            
-                            # 봇 시작 시간 이후의 알림만 처리
-                            if alert_time < self.start_time:
-                                continue
-                                
-                            # 5초 이내의 알림만 처리 (빠른 대응)
-                            five_seconds_ago = datetime.now() - timedelta(seconds=5)
-                            if alert_time < five_seconds_ago:
-                                continue
-                                
-                        except Exception as e:
-                            logger.warning(f"시간 파싱 오류: {e}, 알림 처리 계속")
+                    for api_alert, alert_time in zip(api_alerts, alert_times):
+                        if alert_time is None:
+                            logger.warning(f"시간 파싱 오류: {api_alert.get('timestamp', '')!r}, 알림 처리 계속")
+                        elif alert_time < cutoff:
+                            continue
                         
                         unique_id = f"{api_alert.get('equipment', '')}_{api_alert.get('sensor_type', '')}_{api_alert.get('timestamp', '')}"
                         
@@ -447,7 +458,7 @@ async def action_callback(data: dict):
     # 처리 완료 SMS 발송 (옵션)
     if data.get("send_confirmation") and data.get("phone"):
         equipment = data.get("equipment", "알 수 없음")
-        action = "인터락" if data.get("action_type") == "interlock" else "바이패스"
+        action = ACTION_KO.get(data.get("action_type"), ACTION_KO['bypass'])
         
         message = f"✅ 처리 완료\n{equipment}\n조치: {action}\n시간: {datetime.now().strftime('%H:%M:%S')}"
         sms_service.send_confirmation_sms(data["phone"], message)
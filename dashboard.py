@@ -26,6 +26,7 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 import matplotlib.pyplot as plt
 import seaborn as sns
+from ai_model.prediction_worker import request_prediction
 
 # Plotly 경고 무시
 warnings.filterwarnings("ignore", category=FutureWarning, module="_plotly_utils")
@@ -46,6 +47,7 @@ EFFICIENCY_TARGET = 85.0  # 효율성 목표값 (%)
 OEE_TARGET = 85.0  # OEE 목표값 (%)
 AVAILABILITY_TARGET = 90.0  # 가동률 목표값 (%)
 PERFORMANCE_TARGET = 90.0  # 성능률 목표값 (%)
+PREDICTION_WORKER_TIMEOUT = 3  # 상주 예측 워커 응답 타임아웃 (초)
 
 # 세션 상태 초기화
 if 'sensor_container' not in st.session_state:
@@ -166,49 +168,46 @@ def get_color_and_icon_for_probability(status, probability):
             return {'color': '#EF4444', 'bg': '#FEF2F2', 'icon': '🔴'}
 
 def get_ai_prediction_results(use_real_api=True):
-    """AI 예측 결과 JSON 파일들을 읽어오기"""
+    """AI 예측 결과 가져오기 (상주 예측 워커 우선, 없으면 마지막 결과 JSON 파일)"""
     predictions = {}
     
     # API 연동이 OFF인 경우 더미 데이터 반환
     if not use_real_api:
         return generate_ai_prediction_data()
     
-    # API 연동이 ON인 경우 실제 JSON 파일 읽기
-    # 설비 이상 예측 결과 읽기
+    # API 연동이 ON인 경우 상주 예측 워커에 요청, 워커가 없거나 응답이 없으면 마지막 결과 JSON 파일 읽기
+    # 설비 이상 예측 결과
+    predictions['abnormal_detection'] = _load_ai_prediction(
+        'abnormal', "ai_model/abnormal_detec/last_prediction.json")
+    
+    # 유압 이상 탐지 결과
+    predictions['hydraulic_detection'] = _load_ai_prediction(
+        'hydraulic', "ai_model/hydraulic_rf/last_prediction.json")
+    
+    return predictions
+
+def _load_ai_prediction(worker_model, fallback_path):
+    """상주 예측 워커 결과 (실패 시 fallback_path의 마지막 예측 결과 파일)"""
     try:
-        abnormal_path = "ai_model/abnormal_detec/last_prediction.json"
-        if os.path.exists(abnormal_path):
-            with open(abnormal_path, 'r', encoding='utf-8') as f:
-                predictions['abnormal_detection'] = json.load(f)
-        else:
-            predictions['abnormal_detection'] = {
-                'status': 'error',
-                'error_message': '예측 결과 파일이 없습니다.'
-            }
-    except Exception as e:
-        predictions['abnormal_detection'] = {
-            'status': 'error',
-            'error_message': f'파일 읽기 오류: {str(e)}'
-        }
+        result = request_prediction(worker_model, timeout=PREDICTION_WORKER_TIMEOUT)
+        if isinstance(result, dict):
+            return result
+    except Exception:
+        pass
     
-    # 유압 이상 탐지 결과 읽기
     try:
-        hydraulic_path = "ai_model/hydraulic_rf/last_prediction.json"
-        if os.path.exists(hydraulic_path):
-            with open(hydraulic_path, 'r', encoding='utf-8') as f:
-                predictions['hydraulic_detection'] = json.load(f)
-        else:
-            predictions['hydraulic_detection'] = {
-                'status': 'error',
-                'error_message': '예측 결과 파일이 없습니다.'
-            }
+        if os.path.exists(fallback_path):
+            with open(fallback_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {
+            'status': 'error',
+            'error_message': '예측 결과 파일이 없습니다.'
+        }
     except Exception as e:
-        predictions['hydraulic_detection'] = {
+        return {
             'status': 'error',
             'error_message': f'파일 읽기 오류: {str(e)}'
         }
-    
-    return predictions
 
 def generate_ai_prediction_data():
     """AI 예측 결과 더미 데이터 생성"""
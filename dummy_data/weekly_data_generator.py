@@ -1,12 +1,50 @@
 import json
 import csv
+import os
 import random
+import multiprocessing
 import pandas as pd
 from datetime import datetime, timedelta
 import numpy as np
 
+# orjson 사용 가능 시 JSON 저장에 사용 (C 구현, UTF-8 바이트로 바로 출력)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# pyarrow 사용 가능 시 센서 데이터를 Parquet으로도 저장 (타입 유지, 로드 시 파싱 비용 없음)
+try:
+    import pyarrow
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 class WeeklyDataGenerator:
-    def __init__(self):
+    # 센서 타입별 값 범위 (sensor_types 순서와 동일)
+    SENSOR_VALUE_RANGES = {
+        "온도": (20, 80),
+        "압력": (50, 200),
+        "진동": (0.1, 5.0),
+        "전류": (10, 100),
+        "전압": (200, 400),
+        "유량": (10, 50),
+        "속도": (100, 500),
+        "위치": (0, 100),
+    }
+    # 경고 심각도별 (값 범위, 임계값 범위, 메시지 문구) (severity_levels 순서와 동일)
+    ALERT_SEVERITY_PROFILES = {
+        "낮음": ((50, 65), (40, 55), "경미한 이상 감지"),
+        "보통": ((60, 75), (50, 65), "주의 수준 이상 감지"),
+        "높음": ((70, 85), (60, 75), "높은 수준 이상 감지"),
+        "긴급": ((80, 100), (70, 85), "긴급 이상 감지"),
+    }
+
+    def __init__(self, seed=None):
+        # 대량 샘플링용 난수 생성기 (seed 지정 시 재현 가능)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
         self.start_date = datetime(2024, 7, 28)
         self.end_date = datetime(2024, 8, 4)
         self.equipment_list = [
@@ -36,125 +74,99 @@ class WeeklyDataGenerator:
         return dates
     
     def generate_sensor_data(self):
-        """센서 데이터 생성 - 시간별로 많은 데이터"""
-        sensor_data = []
+        """센서 데이터 생성 - 시간별로 많은 데이터 (전체 레코드를 NumPy로 한 번에 샘플링해 DataFrame 반환)"""
+        rng = self.rng
         dates = self.generate_date_range()
         
-        for date in dates:
-            # 하루에 24시간, 시간당 4-6개의 데이터 생성 (낮 시간대에 더 많게)
-            for hour in range(24):
-                # 낮 시간대(6-18시)에는 더 많은 데이터 생성
-                if 6 <= hour <= 18:
-                    num_records = random.randint(8, 12)
-                else:
-                    num_records = random.randint(2, 4)
-                
-                for _ in range(num_records):
-                    minute = random.randint(0, 59)
-                    second = random.randint(0, 59)
-                    timestamp = date.replace(hour=hour, minute=minute, second=second)
-                    
-                    equipment = random.choice(self.equipment_list)
-                    sensor_type = random.choice(self.sensor_types)
-                    
-                    # 센서 타입별 적절한 값 범위 설정
-                    if sensor_type == "온도":
-                        value = random.uniform(20, 80)
-                    elif sensor_type == "압력":
-                        value = random.uniform(50, 200)
-                    elif sensor_type == "진동":
-                        value = random.uniform(0.1, 5.0)
-                    elif sensor_type == "전류":
-                        value = random.uniform(10, 100)
-                    elif sensor_type == "전압":
-                        value = random.uniform(200, 400)
-                    elif sensor_type == "유량":
-                        value = random.uniform(10, 50)
-                    elif sensor_type == "속도":
-                        value = random.uniform(100, 500)
-                    else:  # 위치
-                        value = random.uniform(0, 100)
-                    
-                    sensor_data.append({
-                        "equipment": equipment,
-                        "sensor_type": sensor_type,
-                        "value": round(value, 2),
-                        "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                    })
+        # 날짜 x 24시간 슬롯별 레코드 수 (낮 시간대(6-18시)에는 8-12개, 그 외 2-4개)
+        hours = np.tile(np.arange(24), len(dates))
+        daytime = (hours >= 6) & (hours <= 18)
+        counts = np.where(daytime,
+                          rng.integers(8, 13, size=hours.size),
+                          rng.integers(2, 5, size=hours.size))
+        total = int(counts.sum())
         
-        return sensor_data
+        # 슬롯 시작 시각을 레코드 수만큼 펼친 뒤 분/초 오프셋을 더함
+        slot_starts = (np.repeat(np.array(dates, dtype='datetime64[s]'), 24)
+                       + hours.astype('timedelta64[h]'))
+        offsets = rng.integers(0, 60, size=total) * 60 + rng.integers(0, 60, size=total)
+        timestamps = np.repeat(slot_starts, counts) + offsets.astype('timedelta64[s]')
+        
+        equipment_idx = rng.integers(0, len(self.equipment_list), size=total)
+        sensor_idx = rng.integers(0, len(self.sensor_types), size=total)
+        
+        # 센서 타입별 적절한 값 범위 설정
+        low, high = np.array([self.SENSOR_VALUE_RANGES[s] for s in self.sensor_types], dtype=np.float64).T
+        values = rng.uniform(low[sensor_idx], high[sensor_idx])
+        np.round(values, 2, out=values)
+        
+        return pd.DataFrame({
+            "equipment": np.array(self.equipment_list, dtype=object)[equipment_idx],
+            "sensor_type": np.array(self.sensor_types, dtype=object)[sensor_idx],
+            "value": values,
+            # datetime64 그대로 보관 (CSV에는 "YYYY-MM-DD HH:MM:SS"로 기록됨)
+            "timestamp": timestamps
+        })
     
     def generate_equipment_status(self):
-        """설비 상태 데이터 생성 - 하루에 모든 설비의 데이터 하나씩"""
-        equipment_status = []
-        dates = self.generate_date_range()
+        """설비 상태 데이터 생성 - 하루에 모든 설비의 데이터 하나씩 (열 단위로 한 번에 생성)"""
+        rng = self.rng
+        dates = np.array(self.generate_date_range(), dtype='datetime64[D]')
+        num_equipment = len(self.equipment_list)
+        num_rows = len(dates) * num_equipment
         
-        for date in dates:
-            for equipment in self.equipment_list:
-                status = random.choice(self.status_levels)
-                efficiency = random.uniform(70, 98)
-                equipment_type = "압연기"
-                last_maintenance = (date - timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d")
-                
-                equipment_status.append({
-                    "id": equipment,
-                    "name": equipment,
-                    "status": status,
-                    "efficiency": round(efficiency, 1),
-                    "type": equipment_type,
-                    "last_maintenance": last_maintenance,
-                    "date": date.strftime("%Y-%m-%d")
-                })
+        # 날짜별로 전체 설비가 한 줄씩 (날짜 우선 순서)
+        row_dates = np.repeat(dates, num_equipment)
+        status_idx = rng.integers(0, len(self.status_levels), size=num_rows)
+        efficiency = np.round(rng.uniform(70, 98, size=num_rows), 1)
+        last_maintenance = row_dates - rng.integers(1, 31, size=num_rows).astype('timedelta64[D]')
+        equipment = np.tile(np.array(self.equipment_list, dtype=object), len(dates))
         
-        return equipment_status
+        df = pd.DataFrame({
+            "id": equipment,
+            "name": equipment,
+            "status": np.array(self.status_levels, dtype=object)[status_idx],
+            "efficiency": efficiency,
+            "type": "압연기",
+            "last_maintenance": np.datetime_as_string(last_maintenance),
+            "date": np.datetime_as_string(row_dates)
+        })
+        return df.to_dict('records')
     
     def generate_alert_data(self):
-        """경고 데이터 생성 - 하루에 5-8개씩"""
-        alert_data = []
-        dates = self.generate_date_range()
+        """경고 데이터 생성 - 하루에 5-8개씩 (열 단위로 한 번에 생성)"""
+        rng = self.rng
+        dates = np.array(self.generate_date_range(), dtype='datetime64[s]')
         
-        for date in dates:
-            num_alerts = random.randint(5, 8)
-            
-            for _ in range(num_alerts):
-                hour = random.randint(0, 23)
-                minute = random.randint(0, 59)
-                timestamp = date.replace(hour=hour, minute=minute)
-                
-                equipment = random.choice(self.equipment_list)
-                sensor_type = random.choice(self.sensor_types)
-                severity = random.choice(self.severity_levels)
-                
-                # 심각도별 메시지 생성
-                if severity == "긴급":
-                    message = f"{equipment} {sensor_type} 긴급 이상 감지"
-                    value = random.uniform(80, 100)
-                    threshold = random.uniform(70, 85)
-                elif severity == "높음":
-                    message = f"{equipment} {sensor_type} 높은 수준 이상 감지"
-                    value = random.uniform(70, 85)
-                    threshold = random.uniform(60, 75)
-                elif severity == "보통":
-                    message = f"{equipment} {sensor_type} 주의 수준 이상 감지"
-                    value = random.uniform(60, 75)
-                    threshold = random.uniform(50, 65)
-                else:  # 낮음
-                    message = f"{equipment} {sensor_type} 경미한 이상 감지"
-                    value = random.uniform(50, 65)
-                    threshold = random.uniform(40, 55)
-                
-                alert_data.append({
-                    "equipment": equipment,
-                    "sensor_type": sensor_type,
-                    "value": round(value, 2),
-                    "threshold": round(threshold, 2),
-                    "severity": severity,
-                    "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                    "message": message,
-                    "status": "미처리"
-                })
+        counts = rng.integers(5, 9, size=len(dates))
+        total = int(counts.sum())
+        offsets = rng.integers(0, 24, size=total) * 3600 + rng.integers(0, 60, size=total) * 60
+        timestamps = np.repeat(dates, counts) + offsets.astype('timedelta64[s]')
+        
+        equipment = np.array(self.equipment_list, dtype=object)[rng.integers(0, len(self.equipment_list), size=total)]
+        sensor_type = np.array(self.sensor_types, dtype=object)[rng.integers(0, len(self.sensor_types), size=total)]
+        severity_idx = rng.integers(0, len(self.severity_levels), size=total)
         
-        return alert_data
+        # 심각도별 값/임계값 범위와 메시지 문구를 심각도 인덱스로 선택
+        profiles = [self.ALERT_SEVERITY_PROFILES[s] for s in self.severity_levels]
+        value_low, value_high = np.array([p[0] for p in profiles], dtype=np.float64).T
+        threshold_low, threshold_high = np.array([p[1] for p in profiles], dtype=np.float64).T
+        message_suffix = [p[2] for p in profiles]
+        values = np.round(rng.uniform(value_low[severity_idx], value_high[severity_idx]), 2)
+        thresholds = np.round(rng.uniform(threshold_low[severity_idx], threshold_high[severity_idx]), 2)
+        
+        df = pd.DataFrame({
+            "equipment": equipment,
+            "sensor_type": sensor_type,
+            "value": values,
+            "threshold": thresholds,
+            "severity": np.array(self.severity_levels, dtype=object)[severity_idx],
+            "timestamp": np.char.replace(np.datetime_as_string(timestamps, unit='s'), 'T', ' '),
+            "message": [f"{eq} {st} {message_suffix[i]}"
+                        for eq, st, i in zip(equipment, sensor_type, severity_idx.tolist())],
+            "status": "미처리"
+        })
+        return df.to_dict('records')
     
     def generate_ai_prediction_data(self):
         """AI 설비이상 예측 데이터 생성 - 하루에 1개씩"""
@@ -281,77 +293,34 @@ class WeeklyDataGenerator:
         
         return equipment_users
     
-    def save_all_data(self):
-        """모든 데이터를 파일로 저장"""
-        print("1주일치 더미 데이터 생성 시작...")
-        
-        # 센서 데이터 생성 및 저장
-        print("센서 데이터 생성 중...")
-        sensor_data = self.generate_sensor_data()
-        df_sensor = pd.DataFrame(sensor_data)
-        df_sensor.to_csv("dummy_data/weekly_sensor_data.csv", index=False, encoding='utf-8-sig')
-        print(f"센서 데이터 저장 완료: {len(sensor_data)}개 레코드")
-        
-        # 설비 상태 데이터 생성 및 저장
-        print("설비 상태 데이터 생성 중...")
-        equipment_status = self.generate_equipment_status()
-        with open("dummy_data/weekly_equipment_status.json", "w", encoding="utf-8") as f:
-            json.dump(equipment_status, f, ensure_ascii=False, indent=2)
-        print(f"설비 상태 데이터 저장 완료: {len(equipment_status)}개 레코드")
-        
-        # 경고 데이터 생성 및 저장
-        print("경고 데이터 생성 중...")
-        alert_data = self.generate_alert_data()
-        with open("dummy_data/weekly_alert_data.json", "w", encoding="utf-8") as f:
-            json.dump(alert_data, f, ensure_ascii=False, indent=2)
-        print(f"경고 데이터 저장 완료: {len(alert_data)}개 레코드")
-        
-        # AI 예측 데이터 생성 및 저장
-        print("AI 예측 데이터 생성 중...")
-        ai_prediction_data = self.generate_ai_prediction_data()
-        with open("dummy_data/weekly_ai_prediction_data.json", "w", encoding="utf-8") as f:
-            json.dump(ai_prediction_data, f, ensure_ascii=False, indent=2)
-        print(f"AI 예측 데이터 저장 완료: {len(ai_prediction_data)}개 레코드")
+    def save_all_data(self, processes=None, write_csv=True):
+        """모든 데이터를 파일로 저장 (데이터셋별 생성/저장을 프로세스 풀에서 병렬 처리)
         
-        # 유압 예측 데이터 생성 및 저장
-        print("유압 예측 데이터 생성 중...")
-        hydraulic_data = self.generate_hydraulic_prediction_data()
-        with open("dummy_data/weekly_hydraulic_prediction_data.json", "w", encoding="utf-8") as f:
-            json.dump(hydraulic_data, f, ensure_ascii=False, indent=2)
-        print(f"유압 예측 데이터 저장 완료: {len(hydraulic_data)}개 레코드")
-        
-        # 품질 트렌드 데이터 생성 및 저장
-        print("품질 트렌드 데이터 생성 중...")
-        quality_data = self.generate_quality_trend()
-        df_quality = pd.DataFrame(quality_data)
-        df_quality.to_csv("dummy_data/weekly_quality_trend.csv", index=False, encoding='utf-8-sig')
-        print(f"품질 트렌드 데이터 저장 완료: {len(quality_data)}개 레코드")
+        write_csv=False이면 Parquet으로 저장되는 데이터셋은 CSV를 생략 (pyarrow 없으면 항상 CSV 저장)
+        """
+        print("1주일치 더미 데이터 생성 시작...")
         
-        # 생산 KPI 데이터 생성 및 저장
-        print("생산 KPI 데이터 생성 중...")
-        kpi_data = self.generate_production_kpi()
-        with open("dummy_data/weekly_production_kpi.json", "w", encoding="utf-8") as f:
-            json.dump(kpi_data, f, ensure_ascii=False, indent=2)
-        print(f"생산 KPI 데이터 저장 완료: {len(kpi_data)}개 레코드")
+        # 데이터셋마다 독립된 시드를 나눠 주어 워커끼리 난수열이 겹치지 않도록 함
+        seeds = np.random.SeedSequence(self.seed).spawn(len(DATASET_TASKS))
+        task_specs = [
+            (task, seed, self.start_date, self.end_date, self.equipment_list, write_csv)
+            for task, seed in zip(DATASET_TASKS, seeds)
+        ]
         
-        # 사용자 데이터 생성 및 저장
-        print("사용자 데이터 생성 중...")
-        users_data = self.generate_users_data()
-        with open("dummy_data/weekly_users_data.json", "w", encoding="utf-8") as f:
-            json.dump(users_data, f, ensure_ascii=False, indent=2)
-        print(f"사용자 데이터 저장 완료: {len(users_data)}개 레코드")
+        processes = processes or min(len(task_specs), os.cpu_count() or 1)
+        if processes > 1:
+            with multiprocessing.Pool(processes=processes) as pool:
+                results = pool.map(run_dataset_task, task_specs)
+        else:
+            results = [run_dataset_task(spec) for spec in task_specs]
         
-        # 설비별 사용자 할당 데이터 생성 및 저장
-        print("설비별 사용자 할당 데이터 생성 중...")
-        equipment_users_data = self.generate_equipment_users_data()
-        with open("dummy_data/weekly_equipment_users_data.json", "w", encoding="utf-8") as f:
-            json.dump(equipment_users_data, f, ensure_ascii=False, indent=2)
-        print(f"설비별 사용자 할당 데이터 저장 완료: {len(equipment_users_data)}개 레코드")
+        for label, count in results:
+            print(f"{label} 저장 완료: {count}개 레코드")
         
         print("\n=== 1주일치 더미 데이터 생성 완료 ===")
         print(f"생성 기간: {self.start_date.strftime('%Y-%m-%d')} ~ {self.end_date.strftime('%Y-%m-%d')}")
         print("생성된 파일들:")
-        print("- weekly_sensor_data.csv (센서 데이터)")
+        print("- weekly_sensor_data.csv / .parquet (센서 데이터)")
         print("- weekly_equipment_status.json (설비 상태)")
         print("- weekly_alert_data.json (경고 데이터)")
         print("- weekly_ai_prediction_data.json (AI 설비이상 예측)")
@@ -361,6 +330,54 @@ class WeeklyDataGenerator:
         print("- weekly_users_data.json (사용자 데이터)")
         print("- weekly_equipment_users_data.json (설비별 사용자 할당)")
 
+# Parquet 사본도 저장하는 데이터셋 (생성 메서드 → 경로, 범주형으로 저장할 열)
+PARQUET_COPIES = {
+    "generate_sensor_data": ("dummy_data/weekly_sensor_data.parquet", ("equipment", "sensor_type")),
+}
+
+# 데이터셋별 (생성 메서드, 저장 경로, 표시 이름)
+DATASET_TASKS = [
+    ("generate_sensor_data", "dummy_data/weekly_sensor_data.csv", "센서 데이터"),
+    ("generate_equipment_status", "dummy_data/weekly_equipment_status.json", "설비 상태 데이터"),
+    ("generate_alert_data", "dummy_data/weekly_alert_data.json", "경고 데이터"),
+    ("generate_ai_prediction_data", "dummy_data/weekly_ai_prediction_data.json", "AI 예측 데이터"),
+    ("generate_hydraulic_prediction_data", "dummy_data/weekly_hydraulic_prediction_data.json", "유압 예측 데이터"),
+    ("generate_quality_trend", "dummy_data/weekly_quality_trend.csv", "품질 트렌드 데이터"),
+    ("generate_production_kpi", "dummy_data/weekly_production_kpi.json", "생산 KPI 데이터"),
+    ("generate_users_data", "dummy_data/weekly_users_data.json", "사용자 데이터"),
+    ("generate_equipment_users_data", "dummy_data/weekly_equipment_users_data.json", "설비별 사용자 할당 데이터"),
+]
+
+def run_dataset_task(task_spec):
+    """데이터셋 하나를 생성해 파일로 저장 (프로세스 풀 워커에서 실행되므로 모듈 최상위 함수)"""
+    (method_name, path, label), seed, start_date, end_date, equipment_list, write_csv = task_spec
+    # random 모듈 상태도 워커마다 달라지도록 같은 시드로 초기화 (fork 시 부모 상태가 그대로 복사됨)
+    random.seed(int(seed.generate_state(1)[0]))
+    generator = WeeklyDataGenerator(seed=seed)
+    generator.start_date = start_date
+    generator.end_date = end_date
+    generator.equipment_list = equipment_list
+    
+    data = getattr(generator, method_name)()
+    parquet_copy = PARQUET_COPIES.get(method_name) if PARQUET_AVAILABLE else None
+    if path.endswith(".csv"):
+        if write_csv or parquet_copy is None:
+            df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+            df.to_csv(path, index=False, encoding='utf-8-sig')
+    elif ORJSON_AVAILABLE:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    
+    # Parquet은 CSV 다음에 저장 (로더는 CSV보다 새로운 Parquet만 사용)
+    if parquet_copy is not None:
+        parquet_path, category_columns = parquet_copy
+        data.astype({column: 'category' for column in category_columns}).to_parquet(
+            parquet_path, compression='zstd', index=False)
+    return label, len(data)
+
 if __name__ == "__main__":
     generator = WeeklyDataGenerator()
     generator.save_all_data() 
\ No newline at end of file
@@ -1,19 +1,114 @@
 import json
 import pandas as pd
+import numpy as np
 import os
+from collections import defaultdict
 from datetime import datetime, timedelta
 
+# pyarrow 사용 가능 시 센서 데이터는 Parquet 파일을 우선 사용 (CSV 파싱/시간 변환 생략)
+try:
+    import pyarrow
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# 경고 데이터 필터 가능한 필드 (필드별 역인덱스를 만듦)
+ALERT_INDEX_FIELDS = ('equipment', 'severity', 'status')
+
+def _read_json(path):
+    """UTF-8 JSON 파일 파싱"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _build_index(data, field):
+    """레코드 목록 → {필드 값: 레코드 목록} 역인덱스 (원래 순서 유지)"""
+    index = defaultdict(list)
+    for item in data:
+        index[item.get(field)].append(item)
+    return dict(index)
+
 class WeeklyDataLoader:
     def __init__(self):
         self.data_dir = "dummy_data"
         self.start_date = datetime(2024, 7, 28)
         self.end_date = datetime(2024, 8, 4)
+        # 파일별 파싱 결과 캐시: {경로: (수정 시각, 파싱 결과)} - 파일이 바뀌면 다시 읽음
+        self._cache = {}
+    
+    def _load_cached(self, filename, parse):
+        """파일 수정 시각이 그대로면 캐시된 파싱 결과를 반환 (없는 파일은 FileNotFoundError)"""
+        path = f"{self.data_dir}/{filename}"
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        value = parse(path)
+        self._cache[path] = (mtime, value)
+        return value
+    
+    def _load_json(self, filename):
+        """JSON 파일 로드 (캐시)"""
+        return self._load_cached(filename, _read_json)
+    
+    def _load_equipment_status_index(self):
+        """설비 상태 데이터를 날짜별로 묶어 (날짜 → 레코드 목록, 최신 날짜) 형태로 캐시"""
+        def parse(path):
+            by_date = {}
+            for item in _read_json(path):
+                by_date.setdefault(item.get('date'), []).append(item)
+            latest_date = max((date for date in by_date if date is not None), default=None)
+            return by_date, latest_date
+        return self._load_cached("weekly_equipment_status.json", parse)
+    
+    def _load_alert_index(self):
+        """경고 데이터와 필드별 역인덱스 (설비/심각도/상태)를 함께 캐시"""
+        def parse(path):
+            data = _read_json(path)
+            return data, {field: _build_index(data, field) for field in ALERT_INDEX_FIELDS}
+        return self._load_cached("weekly_alert_data.json", parse)
+    
+    def _load_equipment_users_index(self):
+        """설비별 사용자 할당 데이터와 설비 ID 역인덱스를 함께 캐시"""
+        def parse(path):
+            data = _read_json(path)
+            return data, _build_index(data, 'equipment_id')
+        return self._load_cached("weekly_equipment_users_data.json", parse)
+    
+    def _load_csv(self, filename):
+        """CSV 파일 로드 (캐시)"""
+        return self._load_cached(filename, pd.read_csv)
+    
+    def _load_sensor_frame(self):
+        """센서 데이터 DataFrame 로드 (timestamp 변환까지 끝낸 상태로 캐시)"""
+        if self._use_sensor_parquet():
+            # Parquet은 범주형/시간 타입이 그대로 저장되어 있음
+            return self._load_cached("weekly_sensor_data.parquet", pd.read_parquet)
         
-    def load_sensor_data(self, equipment=None, sensor_type=None, hours=None):
-        """센서 데이터 로드"""
+        def parse(path):
+            # 설비/센서 타입은 범주형으로 읽어 동등 비교를 정수 코드 비교로 처리
+            return pd.read_csv(path, parse_dates=['timestamp'],
+                               dtype={'equipment': 'category', 'sensor_type': 'category'})
+        return self._load_cached("weekly_sensor_data.csv", parse)
+    
+    def _use_sensor_parquet(self):
+        """Parquet 파일이 있고 CSV보다 오래되지 않았으면 Parquet 사용"""
+        if not PARQUET_AVAILABLE:
+            return False
         try:
-            df = pd.read_csv(f"{self.data_dir}/weekly_sensor_data.csv")
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            parquet_mtime = os.stat(f"{self.data_dir}/weekly_sensor_data.parquet").st_mtime_ns
+        except FileNotFoundError:
+            return False
+        try:
+            return parquet_mtime >= os.stat(f"{self.data_dir}/weekly_sensor_data.csv").st_mtime_ns
+        except FileNotFoundError:
+            return True
+        
+    def load_sensor_data(self, equipment=None, sensor_type=None, hours=None) -> pd.DataFrame:
+        """센서 데이터 로드 (열 단위 접근을 위해 DataFrame 그대로 반환)"""
+        try:
+            df = self._load_sensor_frame()
+            # 조건들을 하나의 불리언 마스크로 합쳐 한 번만 선택
+            mask = np.ones(len(df), dtype=bool)
             
             # 주간 데이터이므로 기본적으로 전체 데이터 반환
             # hours가 168시간(1주일) 미만일 때만 필터링
@@ -21,36 +116,32 @@ class WeeklyDataLoader:
                 # 주간 데이터의 마지막 부분에서 최근 N시간 데이터 추출
                 latest_time = df['timestamp'].max()
                 cutoff_time = latest_time - timedelta(hours=hours)
-                df = df[df['timestamp'] >= cutoff_time]
+                mask &= (df['timestamp'] >= cutoff_time).to_numpy()
             
             # 설비 필터링
             if equipment and equipment != "전체":
-                df = df[df['equipment'] == equipment]
+                mask &= (df['equipment'] == equipment).to_numpy()
             
             # 센서 타입 필터링
             if sensor_type and sensor_type != "전체":
-                df = df[df['sensor_type'] == sensor_type]
+                mask &= (df['sensor_type'] == sensor_type).to_numpy()
             
-            return df.to_dict('records')
+            return df.loc[mask]
         except FileNotFoundError:
             print("주간 센서 데이터 파일을 찾을 수 없습니다.")
-            return []
+            return pd.DataFrame()
+    
+    def load_sensor_records(self, equipment=None, sensor_type=None, hours=None):
+        """센서 데이터를 레코드(dict) 목록으로 반환 (기존 호출부 호환용)"""
+        return self.load_sensor_data(equipment, sensor_type, hours).to_dict('records')
     
     def load_equipment_status(self, target_date=None):
         """설비 상태 데이터 로드"""
         try:
-            with open(f"{self.data_dir}/weekly_equipment_status.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
+            by_date, latest_date = self._load_equipment_status_index()
             
-            if target_date:
-                # 특정 날짜의 데이터만 필터링
-                filtered_data = [item for item in data if item.get('date') == target_date]
-                return filtered_data
-            
-            # 최신 데이터만 반환 (마지막 날짜)
-            latest_date = max(item.get('date', '') for item in data)
-            latest_data = [item for item in data if item.get('date') == latest_date]
-            return latest_data
+            # 특정 날짜가 없으면 최신 데이터만 반환 (마지막 날짜)
+            return list(by_date.get(target_date or latest_date, []))
             
         except FileNotFoundError:
             print("주간 설비 상태 데이터 파일을 찾을 수 없습니다.")
@@ -59,22 +150,19 @@ class WeeklyDataLoader:
     def load_alert_data(self, equipment=None, severity=None, status=None):
         """경고 데이터 로드"""
         try:
-            with open(f"{self.data_dir}/weekly_alert_data.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            # 설비 필터링
-            if equipment and equipment != "전체":
-                data = [item for item in data if item.get('equipment') == equipment]
-            
-            # 심각도 필터링
-            if severity and severity != "전체":
-                data = [item for item in data if item.get('severity') == severity]
+            data, indexes = self._load_alert_index()
             
-            # 상태 필터링
-            if status and status != "전체":
-                data = [item for item in data if item.get('status') == status]
+            # 설비/심각도/상태 필터 ("전체"는 필터 없음)
+            filters = {field: value for field, value in zip(ALERT_INDEX_FIELDS, (equipment, severity, status))
+                       if value and value != "전체"}
+            if not filters:
+                return list(data)
             
-            return data
+            # 가장 짧은 역인덱스 목록에서 시작해 나머지 조건만 확인
+            postings = {field: indexes[field].get(value, []) for field, value in filters.items()}
+            start_field = min(postings, key=lambda field: len(postings[field]))
+            return [item for item in postings[start_field]
+                    if all(item.get(field) == value for field, value in filters.items() if field != start_field)]
             
         except FileNotFoundError:
             print("주간 경고 데이터 파일을 찾을 수 없습니다.")
@@ -83,9 +171,8 @@ class WeeklyDataLoader:
     def load_ai_prediction_data(self):
         """AI 설비이상 예측 데이터 로드"""
         try:
-            with open(f"{self.data_dir}/weekly_ai_prediction_data.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data
+            data = self._load_json("weekly_ai_prediction_data.json")
+            return list(data)
         except FileNotFoundError:
             print("주간 AI 예측 데이터 파일을 찾을 수 없습니다.")
             return []
@@ -93,28 +180,25 @@ class WeeklyDataLoader:
     def load_hydraulic_prediction_data(self):
         """AI 유압 프레스 이상 탐지 데이터 로드"""
         try:
-            with open(f"{self.data_dir}/weekly_hydraulic_prediction_data.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data
+            data = self._load_json("weekly_hydraulic_prediction_data.json")
+            return list(data)
         except FileNotFoundError:
             print("주간 유압 예측 데이터 파일을 찾을 수 없습니다.")
             return []
     
-    def load_quality_trend(self):
-        """품질 트렌드 데이터 로드"""
+    def load_quality_trend(self) -> pd.DataFrame:
+        """품질 트렌드 데이터 로드 (DataFrame, 캐시 원본 보호를 위해 복사본)"""
         try:
-            df = pd.read_csv(f"{self.data_dir}/weekly_quality_trend.csv")
-            return df.to_dict('records')
+            return self._load_csv("weekly_quality_trend.csv").copy()
         except FileNotFoundError:
             print("주간 품질 트렌드 데이터 파일을 찾을 수 없습니다.")
-            return []
+            return pd.DataFrame()
     
     def load_production_kpi(self):
         """생산 KPI 데이터 로드"""
         try:
-            with open(f"{self.data_dir}/weekly_production_kpi.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data
+            data = self._load_json("weekly_production_kpi.json")
+            return list(data)
         except FileNotFoundError:
             print("주간 생산 KPI 데이터 파일을 찾을 수 없습니다.")
             return []
@@ -122,9 +206,8 @@ class WeeklyDataLoader:
     def load_users_data(self):
         """사용자 데이터 로드"""
         try:
-            with open(f"{self.data_dir}/weekly_users_data.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data
+            data = self._load_json("weekly_users_data.json")
+            return list(data)
         except FileNotFoundError:
             print("주간 사용자 데이터 파일을 찾을 수 없습니다.")
             return []
@@ -132,13 +215,12 @@ class WeeklyDataLoader:
     def load_equipment_users_data(self, equipment_id=None):
         """설비별 사용자 할당 데이터 로드"""
         try:
-            with open(f"{self.data_dir}/weekly_equipment_users_data.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data, by_equipment = self._load_equipment_users_index()
             
             if equipment_id:
-                data = [item for item in data if item.get('equipment_id') == equipment_id]
+                return list(by_equipment.get(equipment_id, []))
             
-            return data
+            return list(data)
         except FileNotFoundError:
             print("주간 설비별 사용자 할당 데이터 파일을 찾을 수 없습니다.")
             return []
@@ -180,7 +262,7 @@ if __name__ == "__main__":
     # 샘플 데이터 출력
     print("\n=== 샘플 센서 데이터 (최근 6시간) ===")
     sensor_data = loader.load_sensor_data(hours=6)
-    for i, record in enumerate(sensor_data[:5]):
+    for i, record in enumerate(sensor_data.head(5).to_dict('records')):
         print(f"{i+1}. {record}")
     
     print("\n=== 샘플 설비 상태 데이터 ===")
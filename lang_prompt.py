@@ -3,8 +3,10 @@ POSCO IoT AI 서비스 - Gemini 버전 (개선됨)
 """
 import os
 import json
+import math
 import random
 import re
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
@@ -111,6 +113,29 @@ class MockData:
         "정상": "지난 1시간 동안 안정적 유지 (±2% 이내)"
     }
     
+    # 측정값/임계값 비율 → 트렌드 구간 (bisect 인덱스 순서)
+    # idx = bisect_right(TREND_INCLUSIVE_BOUNDS) + bisect_left(TREND_EXCLUSIVE_BOUNDS)
+    #   < 0.8 | 0.8~0.9 | 0.9 초과~1.1 미만 | 1.1 | 1.1 초과~1.2 | 1.2 초과
+    TREND_INCLUSIVE_BOUNDS = (0.8, 1.1)
+    TREND_EXCLUSIVE_BOUNDS = (0.9, 1.1, 1.2)
+    TREND_BUCKETS = (
+        ("급하락", (10, 25)),
+        ("불안정", (5, 15)),
+        ("정상", None),
+        ("불안정", (5, 15)),
+        ("점진상승", (5, 15)),
+        ("급상승", (15, 30)),
+    )
+    
+    @classmethod
+    def classify_trend(cls, ratio: float) -> Tuple[str, Optional[Tuple[int, int]]]:
+        """측정값/임계값 비율 → (트렌드, 변동률 범위) - NaN은 비교가 모두 거짓이므로 따로 '불안정' 처리"""
+        if math.isnan(ratio):
+            return cls.TREND_BUCKETS[1]
+        bucket = (bisect_right(cls.TREND_INCLUSIVE_BOUNDS, ratio)
+                  + bisect_left(cls.TREND_EXCLUSIVE_BOUNDS, ratio))
+        return cls.TREND_BUCKETS[bucket]
+    
     # 과거 사례
     HISTORICAL_CASES = [
         {
@@ -214,6 +239,16 @@ class Prompts:
 예상_결과: 설비 정지 후 15-20분 냉각 시간을 거쳐 정상 가동 가능합니다
 과거_비교: 지난 3개월간 유사 상황 5건 중 4건이 인터락으로 2시간 내 해결되었습니다"""
 
+class _LazyContext(dict):
+    """format_map용 지연 평가 매핑 - 템플릿이 참조하는 값만 계산"""
+    
+    def __missing__(self, key):
+        return ""
+    
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        return value() if callable(value) else value
+
 # ===== 응답 파서 클래스 =====
 class ResponseParser:
     """AI 응답을 안정적으로 파싱하는 헬퍼 클래스"""
@@ -292,7 +327,7 @@ class ResponseParser:
             elif any(word in content.lower() for word in ["바이패스", "bypass", "계속", "무시"]):
                 result["action"] = "bypass"
         
-        # 파싱 결과: {result}
+        logger.debug("파싱 결과: %s", result)
         return result
 
 # ===== 메인 AI 서비스 클래스 =====
@@ -329,10 +364,10 @@ class AIService:
                 safety_settings=AIConfig.SAFETY_SETTINGS
             )
             
-            logger.info(f"Google Gemini 초기화 완료: {AIConfig.MODEL}")
+            logger.info("Google Gemini 초기화 완료: %s", AIConfig.MODEL)
             
         except Exception as e:
-            logger.error(f"Gemini 초기화 실패: {e}")
+            logger.error("Gemini 초기화 실패: %s", e)
             self.enabled = False
     
     def _get_cache_key(self, prefix: str, data: dict) -> str:
@@ -350,7 +385,8 @@ class AIService:
         
         cached = self.cache.get(key)
         if cached and datetime.now() < cached['expires']:
-            logger.info(f"캐시 히트: {key}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("캐시 히트: %s", key)
             return cached['value']
         return None
     
@@ -361,7 +397,8 @@ class AIService:
                 'value': value,
                 'expires': datetime.now() + timedelta(seconds=AIConfig.CACHE_TTL)
             }
-            logger.info(f"캐시 저장: {key}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("캐시 저장: %s", key)
     
     def _clean_expired_cache(self):
         """만료된 캐시 정리"""
@@ -370,7 +407,7 @@ class AIService:
         for key in expired_keys:
             del self.cache[key]
         if expired_keys:
-            logger.info(f"캐시 정리: {len(expired_keys)}개 항목 삭제")
+            logger.info("캐시 정리: %d개 항목 삭제", len(expired_keys))
     
     def _generate_mock_context(self, alert_data: dict) -> dict:
         """Mock 데이터로 컨텍스트 생성"""
@@ -391,16 +428,10 @@ class AIService:
         
         # 센서 트렌드 (측정값/임계값 비율에 따라)
         ratio = alert_data['value'] / alert_data['threshold']
-        if ratio > 1.2:
-            trend = MockData.SENSOR_TRENDS["급상승"].format(percent=random.randint(15, 30))
-        elif ratio > 1.1:
-            trend = MockData.SENSOR_TRENDS["점진상승"].format(percent=random.randint(5, 15))
-        elif ratio < 0.8:
-            trend = MockData.SENSOR_TRENDS["급하락"].format(percent=random.randint(10, 25))
-        elif 0.9 < ratio < 1.1:
-            trend = MockData.SENSOR_TRENDS["정상"]
-        else:
-            trend = MockData.SENSOR_TRENDS["불안정"].format(percent=random.randint(5, 15))
+        trend_name, percent_range = MockData.classify_trend(ratio)
+        trend = MockData.SENSOR_TRENDS[trend_name]
+        if percent_range:
+            trend = trend.format(percent=random.randint(*percent_range))
         
         # 최근 이력 (랜덤)
         recent_history = {
@@ -446,20 +477,22 @@ class AIService:
             context = self._generate_mock_context(alert_data)
             
             # 프롬프트 생성
-            prompt = Prompts.ALERT_ANALYSIS.format(
+            characteristics = context['characteristics']
+            recent_history = context['recent_history']
+            prompt = Prompts.ALERT_ANALYSIS.format_map(_LazyContext(
                 equipment=alert_data['equipment'],
                 sensor_type=alert_data['sensor_type'],
                 value=alert_data['value'],
                 threshold=alert_data['threshold'],
                 trend=context['trend'],
                 equipment_type=context['equipment_type'],
-                critical_sensors=", ".join(context['characteristics']['critical_sensors']),
-                typical_issues=", ".join(context['characteristics']['typical_issues']),
-                downtime_cost=context['characteristics']['downtime_cost'],
-                alerts_24h=context['recent_history']['alerts_24h'],
-                recent_issues=", ".join(context['recent_history']['recent_issues']),
-                last_maintenance=context['recent_history']['last_maintenance']
-            )
+                critical_sensors=lambda: ", ".join(characteristics['critical_sensors']),
+                typical_issues=lambda: ", ".join(characteristics['typical_issues']),
+                downtime_cost=characteristics['downtime_cost'],
+                alerts_24h=recent_history['alerts_24h'],
+                recent_issues=lambda: ", ".join(recent_history['recent_issues']),
+                last_maintenance=recent_history['last_maintenance']
+            ))
             
             # Gemini 호출
             response = self.model.generate_content(prompt)
@@ -472,11 +505,11 @@ class AIService:
             # 캐시 저장
             self._save_to_cache(cache_key, result)
             
-            logger.info(f"AI 알림 분석 완료: {alert_data['equipment']}")
+            logger.info("AI 알림 분석 완료: %s", alert_data['equipment'])
             return result
             
         except Exception as e:
-            logger.error(f"AI 알림 분석 실패: {e}")
+            logger.error("AI 알림 분석 실패: %s", e)
             return self._get_fallback_message(alert_data)
     
     async def recommend_action(self, alert_data: dict) -> dict:
@@ -567,7 +600,7 @@ class AIService:
             }
             
         except Exception as e:
-            logger.error(f"AI 조치 추천 실패: {e}")
+            logger.error("AI 조치 추천 실패: %s", e)
             return self._get_fallback_recommendation()
     
     def _get_fallback_message(self, alert_data: dict) -> str:
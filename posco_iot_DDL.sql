@@ -23,6 +23,21 @@ CREATE TABLE IF NOT EXISTS sensor_data (
     timestamp TEXT DEFAULT CURRENT_TIMESTAMP -- 기록 시각
 );
 
+-- ======================
+-- 센서 데이터 시간별 집계 테이블
+-- (보존 기간이 지난 원본 센서 데이터를 시간 단위로 요약 보관)
+-- ======================
+CREATE TABLE IF NOT EXISTS hourly_sensor_data (
+    equipment TEXT NOT NULL,              -- 설비명
+    sensor_type TEXT NOT NULL,            -- 센서종류 (없으면 빈 문자열)
+    hour TEXT NOT NULL,                   -- 집계 시각(YYYY-MM-DDTHH:00:00)
+    avg_value REAL NOT NULL,              -- 평균값
+    min_value REAL NOT NULL,              -- 최솟값
+    max_value REAL NOT NULL,              -- 최댓값
+    sample_count INTEGER NOT NULL,        -- 원본 데이터 개수
+    PRIMARY KEY (equipment, sensor_type, hour)
+);
+
 -- ======================
 -- 알림/이상 이력 테이블
 -- (AI/운영자 알림, 이상징후 기록)
@@ -172,6 +187,23 @@ CREATE TABLE IF NOT EXISTS sms_history (
     FOREIGN KEY (alert_id) REFERENCES alerts(id)
 );
 
+-- ======================
+-- 조회용 인덱스
+-- (설비/센서별 최신순 조회, 시간 범위 조회)
+-- ======================
+CREATE INDEX IF NOT EXISTS idx_sensor_eq_ts ON sensor_data(equipment, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_sensor_eq_type_ts ON sensor_data(equipment, sensor_type, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_sensor_ts ON sensor_data(timestamp DESC);
+-- 전체 설비 차트: 센서 종류별로 시간 범위만 읽음
+CREATE INDEX IF NOT EXISTS idx_sensor_type_ts ON sensor_data(sensor_type, timestamp);
+-- 설비(+심각도) 필터 후 최신순 정렬을 인덱스 순서로 처리 (status가 중간에 있으면 정렬이 따로 필요)
+DROP INDEX IF EXISTS idx_alerts_eq_ts;
+CREATE INDEX IF NOT EXISTS idx_alerts_eq_ts ON alerts(equipment, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_eq_sev_ts ON alerts(equipment, severity, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts(timestamp DESC);
+-- 알림 키(설비, 센서, timestamp) 단위 조회
+CREATE INDEX IF NOT EXISTS idx_alerts_eq_sensor_ts ON alerts(equipment, sensor_type, timestamp);
+
 -- 기본 관리자 계정 생성
 INSERT OR IGNORE INTO users (phone_number, name, department, role) 
 VALUES ('01074884038', '시스템 관리자', 'IT', 'admin');
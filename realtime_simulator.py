@@ -2,7 +2,7 @@ import requests
 import time
 import logging
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 import random
 from dataclasses import dataclass
 
@@ -16,6 +16,7 @@ logger = logging.getLogger(__name__)
 # API 엔드포인트
 API_BASE_URL = "http://localhost:8000"
 SENSOR_API = f"{API_BASE_URL}/sensors"
+SENSOR_BATCH_API = f"{API_BASE_URL}/sensors/batch"
 ALERT_API = f"{API_BASE_URL}/alerts"
 EQUIPMENT_STATUS_API = f"{API_BASE_URL}/equipment"
 
@@ -256,11 +257,23 @@ class MultiEquipmentSimulator:
         
         try:
             response = requests.post(SENSOR_API, json=data, timeout=5)
-            if response.status_code == 200:
+            if response.status_code == 202:
                 logger.info(f"[센서] {equipment.id} {sensor_type}={value}")
         except Exception as e:
             logger.error(f"[센서] 데이터 전송 오류: {e}")
     
+    def send_sensor_batch(self, readings: List[dict]):
+        """센서 데이터 일괄 전송 (루프당 1회 요청)"""
+        if not readings:
+            return
+        
+        try:
+            response = requests.post(SENSOR_BATCH_API, json=readings, timeout=5)
+            if response.status_code == 202:
+                logger.info(f"[센서] {len(readings)}건 일괄 전송")
+        except Exception as e:
+            logger.error(f"[센서] 일괄 전송 오류: {e}")
+    
     def send_system_alert(self, equipment: Equipment, efficiency: float):
         """시스템 알림 전송 (가동률 0% 등)"""
         alert_data = {
@@ -275,7 +288,7 @@ class MultiEquipmentSimulator:
         
         try:
             response = requests.post(ALERT_API, json=alert_data, timeout=5)
-            if response.status_code == 200:
+            if response.status_code in (200, 202):
                 logger.info(f"🚨 [SYSTEM] {equipment.name} 가동률 {efficiency:.1f}% - 시스템 알림 발생")
                 self.alert_count["error"] += 1
         except Exception as e:
@@ -307,7 +320,7 @@ class MultiEquipmentSimulator:
         
         try:
             response = requests.post(ALERT_API, json=alert_data, timeout=5)
-            if response.status_code == 200:
+            if response.status_code in (200, 202):
                 logger.info(f"🚨 [{severity.upper()}] {equipment.name} "
                            f"{sensor_type} = {value}{threshold.unit}")
                 self.alert_count[severity] += 1
@@ -395,6 +408,7 @@ class MultiEquipmentSimulator:
             
             # 센서 데이터 생성은 알림 생성 후에 처리 (더 많은 빈도로)
             # 매 루프마다 모든 설비에서 센서 데이터 생성 (확률 제거)
+            readings = []
             for equipment in self.equipments:
                 # 설비 상태 업데이트 (랜덤 간격)
                 if random.random() < 0.3:  # 30% 확률로 설비 상태 업데이트
@@ -406,7 +420,13 @@ class MultiEquipmentSimulator:
                 # 센서 데이터 생성 및 전송 (매번 전송)
                 sensor_type = random.choice(["temperature", "pressure", "vibration"])
                 value = self.generate_sensor_value(equipment, sensor_type)
-                self.send_sensor_data(equipment, sensor_type, value)
+                readings.append({
+                    "equipment": equipment.id,
+                    "sensor_type": sensor_type,
+                    "value": value,
+                    "timestamp": datetime.now().isoformat()
+                })
+            self.send_sensor_batch(readings)
             
             time.sleep(interval)
         
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+import api_server
+
+
+ALERT = {
+    "equipment": "press_001",
+    "sensor_type": "temperature",
+    "value": 95.0,
+    "threshold": 80.0,
+    "severity": "error",
+    "timestamp": "2024-01-15T10:00:00",
+}
+
+
+@pytest.fixture(autouse=True)
+def clean_memory_state():
+    api_server.reset_memory_state()
+    yield
+    api_server.reset_memory_state()
+
+
+def _issue_token():
+    return api_server.generate_action_link(dict(ALERT)).rsplit("/", 1)[-1]
+
+
+def _assert_processed_once(action):
+    assert len(api_server.action_history) == 1
+    assert api_server.link_stats["active"] == 0
+    assert api_server.link_stats["processed"] == 1
+    assert api_server.link_action_counts[action] == 1
+    assert api_server.action_type_counts[action] == 1
+
+
+def test_process_action_twice_records_once():
+    token = _issue_token()
+
+    api_server.process_action(token, "bypass")
+    api_server.process_action(token, "bypass")
+
+    _assert_processed_once("bypass")
+
+
+def test_process_action_concurrent_clicks_record_once(monkeypatch):
+    # 조치(DB 작업) 중에 두 번째 요청이 들어오는 상황 재현
+    def slow_apply(alert):
+        time.sleep(0.05)
+        return True
+
+    monkeypatch.setitem(api_server.WEB_LINK_ACTIONS, "interlock",
+                        (slow_apply,) + api_server.WEB_LINK_ACTIONS["interlock"][1:])
+    token = _issue_token()
+
+    threads = [threading.Thread(target=api_server.process_action, args=(token, "interlock"))
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    _assert_processed_once("interlock")
+
+
+def test_process_action_failure_releases_token(monkeypatch):
+    def failing_apply(alert):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setitem(api_server.WEB_LINK_ACTIONS, "interlock",
+                        (failing_apply,) + api_server.WEB_LINK_ACTIONS["interlock"][1:])
+    token = _issue_token()
+
+    with pytest.raises(RuntimeError):
+        api_server.process_action(token, "interlock")
+
+    assert len(api_server.action_history) == 0
+    assert api_server.link_stats["active"] == 1
+    assert api_server.link_stats["processed"] == 0
+    assert api_server.link_action_counts["interlock"] == 0
+    assert not api_server.action_tokens[token]["processed"]
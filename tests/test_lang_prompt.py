@@ -0,0 +1,25 @@
+import math
+
+import pytest
+
+from lang_prompt import MockData
+
+
+@pytest.mark.parametrize("ratio, expected", [
+    (0.5, "급하락"),
+    (0.8, "불안정"),
+    (0.9, "불안정"),
+    (1.0, "정상"),
+    (1.1, "불안정"),
+    (1.15, "점진상승"),
+    (1.2, "점진상승"),
+    (1.5, "급상승"),
+])
+def test_classify_trend_boundaries(ratio, expected):
+    assert MockData.classify_trend(ratio)[0] == expected
+
+
+def test_classify_trend_nan_is_unstable():
+    trend_name, percent_range = MockData.classify_trend(math.nan)
+    assert trend_name == "불안정"
+    assert percent_range == (5, 15)